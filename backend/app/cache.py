@@ -0,0 +1,331 @@
+"""翻译结果缓存。
+
+对“同一模型 + 同一最终 system prompt + 同一原文”的请求直接复用上次的译文：
+- `MemoryTranslationCache`：进程内 LRU，支持 TTL 与总字节数上限
+- `SqliteTranslationCache`：可选的磁盘缓存，进程重启后仍然有效
+- 缓存键由 `build_translation_cache_key` 生成（内容哈希，不含明文凭据）
+- Spec 蓝图的理论分析另有独立的 `analysis_cache`（键见 `build_analysis_cache_key`）
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Protocol, Sequence
+
+from app.config import settings
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    sets: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class TranslationCache(Protocol):
+    """翻译缓存协议（可替换为 Redis 等实现）"""
+
+    stats: CacheStats
+
+    async def get(self, key: str) -> str | None:
+        ...
+
+    async def get_first(self, keys: Sequence[str]) -> str | None:
+        ...
+
+    async def set(self, key: str, value: str) -> None:
+        ...
+
+    async def clear(self) -> None:
+        ...
+
+    def snapshot(self) -> dict[str, Any]:
+        ...
+
+
+def build_translation_cache_key(
+    *,
+    channel: str,
+    model: str,
+    base_url: str | None,
+    system_prompt: str,
+    text: str,
+) -> str:
+    """根据请求内容生成缓存键（sha256）"""
+    raw = json.dumps(
+        [channel, model, (base_url or "").rstrip("/"), system_prompt, text],
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def build_analysis_cache_key(
+    *,
+    theory_id: str,
+    channel: str,
+    model: str,
+    base_url: str | None,
+    system_prompt: str,
+    user_content: str,
+) -> str:
+    """蓝图理论分析的缓存键（sha256）
+
+    提示词已包含理论定义、参考原文/译文、待译原文与语言对，因此按最终提示词寻址即可。
+    """
+    raw = json.dumps(
+        ["analysis", theory_id, channel, model, (base_url or "").rstrip("/"), system_prompt, user_content],
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class MemoryTranslationCache:
+    """进程内 LRU 缓存（条目数、总字节数与 TTL 三重限制）"""
+
+    def __init__(self, *, max_entries: int = 10000, max_bytes: int = 64 * 1024 * 1024, ttl: float = 86400.0):
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._ttl = ttl
+        self._entries: OrderedDict[str, tuple[str, float, int]] = OrderedDict()
+        self._bytes = 0
+        self.stats = CacheStats()
+
+    async def get(self, key: str) -> str | None:
+        return await self.get_first((key,))
+
+    async def get_first(self, keys: Sequence[str]) -> str | None:
+        """按顺序查找多个候选键，返回第一个命中的值（整体只计一次命中或未命中）"""
+        for key in keys:
+            value = self._lookup(key)
+            if value is not None:
+                self.stats.hits += 1
+                return value
+        self.stats.misses += 1
+        return None
+
+    def _lookup(self, key: str) -> str | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at, _ = entry
+        if expires_at < time.monotonic():
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: str) -> None:
+        size = len(key) + len(value.encode("utf-8"))
+        if size > self._max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (value, time.monotonic() + self._ttl, size)
+        self._bytes += size
+        self.stats.sets += 1
+        while len(self._entries) > self._max_entries or self._bytes > self._max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.stats.evictions += 1
+
+    async def clear(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
+
+    def _remove(self, key: str) -> None:
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "backend": "memory",
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            **asdict(self.stats),
+            "hit_ratio": self.stats.hit_ratio,
+        }
+
+
+class SqliteTranslationCache:
+    """SQLite 磁盘缓存（读写放到线程池执行，不阻塞事件循环）
+
+    读取是只读的：每个线程使用各自的连接，WAL 模式下可并发读取；命中时的访问时间先记在内存中，
+    下次写入（或积累到 `_TOUCH_BATCH` 条）时再批量更新，供淘汰时按最近最少使用排序。
+    过期条目读取时视为未命中，在写入触发淘汰时一并删除。
+    """
+
+    _TOUCH_BATCH = 256
+
+    def __init__(self, path: str, *, max_entries: int = 100000, ttl: float = 86400.0):
+        self._path = path
+        self._max_entries = max_entries
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        self._readers = threading.local()
+        self._touched: dict[str, float] = {}
+        self._touched_lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS translation_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_translation_cache_accessed "
+                "ON translation_cache (accessed_at)"
+            )
+            self._conn.commit()
+        self.stats = CacheStats()
+
+    async def get(self, key: str) -> str | None:
+        return await self.get_first((key,))
+
+    async def get_first(self, keys: Sequence[str]) -> str | None:
+        """按顺序查找多个候选键，返回第一个命中的值（整体只计一次命中或未命中）"""
+        value = await asyncio.to_thread(self._get_first_sync, keys)
+        if value is None:
+            self.stats.misses += 1
+        else:
+            self.stats.hits += 1
+        return value
+
+    async def set(self, key: str, value: str) -> None:
+        evicted = await asyncio.to_thread(self._set_sync, key, value)
+        self.stats.sets += 1
+        self.stats.evictions += evicted
+
+    async def clear(self) -> None:
+        await asyncio.to_thread(self._execute, "DELETE FROM translation_cache")
+
+    def _reader(self) -> sqlite3.Connection:
+        conn = getattr(self._readers, "conn", None)
+        if conn is None:
+            uri = f"{Path(self._path).resolve().as_uri()}?mode=ro"
+            conn = self._readers.conn = sqlite3.connect(uri, uri=True)
+        return conn
+
+    def _get_first_sync(self, keys: Sequence[str]) -> str | None:
+        for key in keys:
+            value = self._get_sync(key)
+            if value is not None:
+                return value
+        return None
+
+    def _get_sync(self, key: str) -> str | None:
+        now = time.time()
+        row = self._reader().execute(
+            "SELECT value FROM translation_cache WHERE key = ? AND expires_at >= ?", (key, now)
+        ).fetchone()
+        if row is None:
+            return None
+        with self._touched_lock:
+            self._touched[key] = now
+            flush = len(self._touched) >= self._TOUCH_BATCH
+        if flush:
+            with self._lock:
+                self._flush_touched()
+                self._conn.commit()
+        return row[0]
+
+    def _flush_touched(self) -> None:
+        """把内存中记下的访问时间写回（调用方持有写锁并负责提交）"""
+        with self._touched_lock:
+            touched, self._touched = self._touched, {}
+        if touched:
+            self._conn.executemany(
+                "UPDATE translation_cache SET accessed_at = ? WHERE key = ?",
+                [(at, key) for key, at in touched.items()],
+            )
+
+    def _set_sync(self, key: str, value: str) -> int:
+        now = time.time()
+        with self._lock:
+            self._flush_touched()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO translation_cache (key, value, expires_at, accessed_at) "
+                "VALUES (?, ?, ?, ?)",
+                (key, value, now + self._ttl, now),
+            )
+            count = self._conn.execute("SELECT COUNT(*) FROM translation_cache").fetchone()[0]
+            evicted = 0
+            if count > self._max_entries:
+                # 先删过期条目，仍超出上限时再按最近最少使用淘汰
+                evicted = self._conn.execute(
+                    "DELETE FROM translation_cache WHERE expires_at < ?", (now,)
+                ).rowcount
+                overflow = count - evicted - self._max_entries
+                if overflow > 0:
+                    self._conn.execute(
+                        "DELETE FROM translation_cache WHERE key IN ("
+                        "SELECT key FROM translation_cache ORDER BY accessed_at LIMIT ?)",
+                        (overflow,),
+                    )
+                    evicted += overflow
+            self._conn.commit()
+            return evicted
+
+    def _execute(self, sql: str) -> None:
+        with self._lock:
+            self._conn.execute(sql)
+            self._conn.commit()
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "backend": "sqlite",
+            "path": self._path,
+            **asdict(self.stats),
+            "hit_ratio": self.stats.hit_ratio,
+        }
+
+
+def create_translation_cache() -> TranslationCache | None:
+    """根据配置创建翻译缓存；backend 为 none 时返回 None（不缓存）"""
+    backend = settings.translation_cache_backend
+    if backend == "memory":
+        return MemoryTranslationCache(
+            max_entries=settings.translation_cache_max_entries,
+            max_bytes=settings.translation_cache_max_bytes,
+            ttl=settings.translation_cache_ttl,
+        )
+    if backend == "sqlite":
+        return SqliteTranslationCache(
+            settings.translation_cache_sqlite_path,
+            max_entries=settings.translation_cache_max_entries,
+            ttl=settings.translation_cache_ttl,
+        )
+    return None
+
+
+def create_analysis_cache() -> MemoryTranslationCache | None:
+    """蓝图理论分析缓存（进程内 LRU）；条目上限为 0 时返回 None（不缓存）"""
+    if settings.analysis_cache_max_entries <= 0:
+        return None
+    return MemoryTranslationCache(
+        max_entries=settings.analysis_cache_max_entries,
+        max_bytes=settings.analysis_cache_max_bytes,
+        ttl=settings.analysis_cache_ttl,
+    )
+
+
+# 全局翻译缓存实例（可能为 None）
+translation_cache = create_translation_cache()
+# 全局蓝图理论分析缓存实例（可能为 None）
+analysis_cache = create_analysis_cache()
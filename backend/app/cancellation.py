@@ -0,0 +1,72 @@
+"""客户端断开后的取消记账。
+
+SSE 端点在客户端断开时会取消整条事件生成链（见 `app/sse.py`）。为了知道省下了多少工作，
+每个流式请求在自己的上下文里挂一个 RequestWork，所有上游调用（`app/engines/resilience.py`）
+开始/结束时更新其中的计数；断开时仍在进行的调用数即被取消的上游调用数。
+"""
+
+from __future__ import annotations
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Iterator
+
+
+@dataclass
+class RequestWork:
+    """单个请求的上游调用记账（子任务复制上下文后共享同一个对象）"""
+
+    in_flight: int = 0
+    started: int = 0
+
+
+current_work: ContextVar[RequestWork | None] = ContextVar("current_work", default=None)
+
+
+@contextmanager
+def track_upstream_call() -> Iterator[None]:
+    """在当前请求的记账中登记一次进行中的上游调用（未挂记账时什么也不做）"""
+    work = current_work.get()
+    if work is None:
+        yield
+        return
+    work.in_flight += 1
+    work.started += 1
+    try:
+        yield
+    finally:
+        work.in_flight -= 1
+
+
+@dataclass
+class CancellationStats:
+    streams: int = 0
+    disconnects: int = 0
+    upstream_calls_cancelled: int = 0
+    upstream_calls_completed: int = 0
+    by_endpoint: dict[str, int] = field(default_factory=dict)
+
+    def record_finished(self) -> None:
+        self.streams += 1
+
+    def record_disconnect(self, endpoint: str, work: RequestWork) -> None:
+        self.streams += 1
+        self.disconnects += 1
+        self.upstream_calls_cancelled += work.in_flight
+        self.upstream_calls_completed += work.started - work.in_flight
+        self.by_endpoint[endpoint] = self.by_endpoint.get(endpoint, 0) + 1
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "streams": self.streams,
+            "disconnects": self.disconnects,
+            "disconnect_rate": self.disconnects / self.streams if self.streams else 0.0,
+            "upstream_calls_cancelled": self.upstream_calls_cancelled,
+            "upstream_calls_completed": self.upstream_calls_completed,
+            "by_endpoint": dict(self.by_endpoint),
+        }
+
+
+# 全局取消统计
+cancellation_stats = CancellationStats()
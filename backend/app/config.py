@@ -15,6 +15,116 @@ class Settings(BaseSettings):
     # API 配置
     api_prefix: str = "/api"
 
+    # 上游请求参数调试日志（仅 debug 模式下 app.llm 日志启用时生效；后台线程格式化写出）
+    llm_log_enabled: bool = True
+    llm_log_sample_rate: float = 1.0
+    llm_log_max_chars: int = 4000
+    llm_log_max_bytes: int = 64 * 1024
+    llm_log_queue_size: int = 1000
+
+    # 上游客户端池配置
+    client_pool_max_connections: int = 100
+    client_pool_max_keepalive_connections: int = 20
+    client_pool_keepalive_expiry: float = 30.0
+    client_pool_idle_ttl: float = 600.0
+    client_pool_max_clients: int = 64
+    client_pool_sweep_interval: float = 60.0
+
+    # 上游连接预热：启动时及每隔 interval 秒（0 表示只在启动时）对池中各客户端的 base_url
+    # 预先建立 connections 个连接；interval 应小于 keepalive_expiry 才能保持连接常驻
+    warmup_enabled: bool = True
+    warmup_connections: int = 2
+    warmup_interval: float = 20.0
+    warmup_timeout: float = 5.0
+
+    # 管理接口令牌：修改服务端状态的接口（引擎配置档、术语表）需带 X-Admin-Token 请求头；
+    # 为空时这些接口一律拒绝
+    admin_token: str = ""
+
+    # 服务端引擎配置档：启动时从 JSON 文件加载（为空则不加载）；
+    # api_enabled 开启且配置了 admin_token 时才能通过 HTTP 接口修改，否则只读
+    # （apiKeyEnv 只在配置文件中生效，HTTP 接口不接受）。
+    # 配置档会以服务端的凭据调用上游：标记 "public": true 的配置档任何调用方都能列出和引用；
+    # 其余配置档需带与 token 一致的 X-Engine-Profile-Token 请求头（token 为空时只能使用公开配置档）
+    engine_profiles_path: str = ""
+    engine_profiles_api_enabled: bool = False
+    engine_profiles_token: str = ""
+
+    # 上游调用超时与重试配置（秒）
+    engine_max_attempts: int = 3
+    engine_attempt_timeout: float = 60.0
+    engine_total_timeout: float = 180.0
+    engine_backoff_base: float = 0.5
+    engine_backoff_max: float = 8.0
+
+    # 上游准入控制（按凭据计；0 表示不限制）
+    admission_max_in_flight: int = 32
+    admission_requests_per_minute: float = 0
+    admission_tokens_per_minute: float = 0
+    admission_queue_timeout: float = 60.0
+
+    # 对冲请求配置：主请求超过延迟百分位仍未完成（流式为未出首个增量）时再发一个请求
+    hedging_enabled: bool = False
+    hedging_percentile: float = 95.0
+    hedging_min_delay: float = 0.5
+    hedging_max_delay: float = 10.0
+    hedging_default_delay: float = 3.0
+    hedging_min_samples: int = 20
+    hedging_window: int = 200
+
+    # provider 侧提示词缓存：稳定的 system prompt 前缀达到 min_tokens 时标记缓存
+    # （Anthropic cache_control；官方 OpenAI 接口附带 prompt_cache_key）
+    prompt_cache_enabled: bool = True
+    prompt_cache_min_tokens: int = 1024
+
+    # 翻译结果缓存配置（backend: memory | sqlite | none）
+    translation_cache_backend: str = "memory"
+    translation_cache_max_entries: int = 10000
+    translation_cache_max_bytes: int = 64 * 1024 * 1024
+    translation_cache_ttl: float = 86400.0
+    translation_cache_sqlite_path: str = "translation_cache.sqlite3"
+
+    # 翻译记忆（SQLite 持久化）：原文、语言对与提示词指纹都相同的片段直接复用译文；
+    # 相似度达到 fuzzy_threshold 的至多 max_references 条作为参考译文注入提示词；
+    # 超过 max_chars 的片段不查询也不写入
+    translation_memory_enabled: bool = False
+    translation_memory_path: str = "translation_memory.sqlite3"
+    translation_memory_fuzzy_threshold: float = 0.75
+    translation_memory_max_references: int = 3
+    translation_memory_max_chars: int = 4000
+
+    # 术语表：启动时加载 glossary_dir 下的 *.csv / *.tbx（文件名即 id，为空则不加载）；
+    # 每个片段只注入原文中出现的术语，至多 max_prompt_terms 条；
+    # api_enabled 开启且配置了 admin_token 时才能通过 HTTP 接口上传/删除，上传体积至多 max_upload_bytes
+    glossary_dir: str = ""
+    glossary_max_prompt_terms: int = 200
+    glossaries_api_enabled: bool = False
+    glossary_max_upload_bytes: int = 16 * 1024 * 1024
+
+    # 蓝图理论分析缓存配置（max_entries 为 0 时不缓存）
+    analysis_cache_max_entries: int = 2000
+    analysis_cache_max_bytes: int = 16 * 1024 * 1024
+    analysis_cache_ttl: float = 86400.0
+
+    # 长文本分段翻译配置
+    segment_max_tokens: int = 1500
+    segment_concurrency: int = 4
+    segment_context_chars: int = 400
+
+    # Vibe 候选等待策略：成功候选达到 quorum 个、或自开始起超过 deadline 秒即开始评分，
+    # 其余候选取消并标记为超时（0 表示不限制：quorum=0 即等待全部候选）；
+    # 默认都不启用，候选只受 engine_total_timeout 约束，开启 deadline 时应不小于单个候选的正常耗时
+    vibe_quorum: int = 0
+    vibe_candidate_deadline: float = 0.0
+
+    # SSE 客户端断开检测的轮询间隔（秒）
+    sse_disconnect_poll_interval: float = 0.5
+
+    # 批量翻译配置
+    batch_max_tokens: int = 2000
+    batch_max_items: int = 50
+    batch_concurrency: int = 4
+
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
@@ -1,9 +1,11 @@
 """依赖注入"""
 
+import hmac
 import json
 from fastapi import Header
 from dataclasses import dataclass
 
+from app.config import settings
 from app.errors import ApiError
 
 
@@ -17,7 +19,8 @@ class EngineConfig:
     model: str | None = None
 
 
-def _parse_single_engine_config(data: object) -> EngineConfig:
+def engine_config_from_dict(data: object) -> EngineConfig:
+    """校验并构建引擎配置（请求头 JSON 与服务端配置档共用）"""
     if not isinstance(data, dict):
         raise ApiError(400, "invalid_engine_config", "引擎配置必须是 JSON 对象")
 
@@ -45,7 +48,7 @@ def parse_engine_config(config_json: str) -> EngineConfig:
     """解析单个引擎配置 JSON"""
     try:
         data = json.loads(config_json)
-        return _parse_single_engine_config(data)
+        return engine_config_from_dict(data)
     except json.JSONDecodeError as e:
         raise ApiError(400, "invalid_json", f"无效的引擎配置 JSON：{e}")
 
@@ -57,49 +60,143 @@ def parse_engine_configs(configs_json: str) -> list[EngineConfig]:
         if not isinstance(data_list, list):
             raise ApiError(400, "invalid_engine_configs", "引擎配置列表必须是 JSON 数组")
 
-        return [_parse_single_engine_config(item) for item in data_list]
+        return [engine_config_from_dict(item) for item in data_list]
     except json.JSONDecodeError as e:
         raise ApiError(400, "invalid_json", f"无效的引擎配置列表 JSON：{e}")
 
 
+def profile_token_valid(token: str | None) -> bool:
+    """请求头 `X-Engine-Profile-Token` 是否与 `engine_profiles_token` 一致（未配置令牌时一律无效）"""
+    expected = settings.engine_profiles_token
+    if not expected or not isinstance(token, str) or not token:
+        return False
+    return hmac.compare_digest(token.encode(), expected.encode())
+
+
+def resolve_engine_profile(profile_id: str, token: str | None = None) -> EngineConfig:
+    """按 id 取服务端引擎配置档中预先构建的引擎配置
+
+    非公开的配置档需要有效的配置档令牌，否则与不存在的配置档一样返回 404。
+    """
+    # 延迟导入：profiles 模块依赖本模块的 EngineConfig
+    from app.engines.profiles import engine_profiles
+
+    return engine_profiles.resolve(profile_id.strip(), authorized=profile_token_valid(token)).config
+
+
 async def get_engine_config(
     x_engine_config: str | None = Header(default=None, alias="X-Engine-Config"),
+    x_engine_profile: str | None = Header(default=None, alias="X-Engine-Profile"),
+    x_engine_profile_token: str | None = Header(default=None, alias="X-Engine-Profile-Token"),
 ) -> EngineConfig:
     """从请求头获取单个引擎配置
 
-    用于 Easy 和 Spec 翻译模式
+    用于 Easy 和 Spec 翻译模式；同时提供时配置档优先
 
     Header 格式:
     X-Engine-Config: {"apiKey": "sk-...", "baseUrl": "https://api.openai.com/v1", "channel": "openai", "model": "gpt-4o"}
+    X-Engine-Profile: gpt4o
+    X-Engine-Profile-Token: ...（引用非公开配置档时需要，裁判、对冲配置档同样适用）
     """
+    if x_engine_profile:
+        return resolve_engine_profile(x_engine_profile, x_engine_profile_token)
     if not x_engine_config:
-        raise ApiError(400, "missing_engine_config", "缺少请求头 X-Engine-Config")
+        raise ApiError(400, "missing_engine_config", "缺少请求头 X-Engine-Config 或 X-Engine-Profile")
     return parse_engine_config(x_engine_config)
 
 
 async def get_engine_configs(
     x_engine_configs: str | None = Header(default=None, alias="X-Engine-Configs"),
+    x_engine_profiles: str | None = Header(default=None, alias="X-Engine-Profiles"),
+    x_engine_profile_token: str | None = Header(default=None, alias="X-Engine-Profile-Token"),
 ) -> list[EngineConfig]:
     """从请求头获取多个引擎配置
 
-    用于 Vibe 翻译模式
+    用于 Vibe 翻译模式；同时提供时配置档优先
 
     Header 格式:
     X-Engine-Configs: [{"apiKey": "sk-...", "channel": "openai", "model": "gpt-4o"}, {"apiKey": "sk-ant-...", "channel": "anthropic", "model": "claude-sonnet-4-20250514"}]
+    X-Engine-Profiles: gpt4o, claude-sonnet
     """
+    if x_engine_profiles:
+        profile_ids = [p for p in x_engine_profiles.split(",") if p.strip()]
+        if profile_ids:
+            return [resolve_engine_profile(p, x_engine_profile_token) for p in profile_ids]
     if not x_engine_configs:
-        raise ApiError(400, "missing_engine_configs", "缺少请求头 X-Engine-Configs")
+        raise ApiError(400, "missing_engine_configs", "缺少请求头 X-Engine-Configs 或 X-Engine-Profiles")
     return parse_engine_configs(x_engine_configs)
 
 
 async def get_optional_judge_engine_config(
     x_judge_engine_config: str | None = Header(default=None, alias="X-Judge-Engine-Config"),
+    x_judge_engine_profile: str | None = Header(default=None, alias="X-Judge-Engine-Profile"),
+    x_engine_profile_token: str | None = Header(default=None, alias="X-Engine-Profile-Token"),
 ) -> EngineConfig | None:
     """可选：从请求头获取裁判引擎配置
 
     Header 格式:
     X-Judge-Engine-Config: {"apiKey": "...", "baseUrl": "...", "channel": "openai|anthropic", "model": "..."}
+    X-Judge-Engine-Profile: gpt4o
     """
+    if x_judge_engine_profile:
+        return resolve_engine_profile(x_judge_engine_profile, x_engine_profile_token)
     if not x_judge_engine_config:
         return None
     return parse_engine_config(x_judge_engine_config)
+
+
+async def get_optional_hedge_engine_config(
+    x_hedge_engine_config: str | None = Header(default=None, alias="X-Hedge-Engine-Config"),
+    x_hedge_engine_profile: str | None = Header(default=None, alias="X-Hedge-Engine-Profile"),
+    x_engine_profile_token: str | None = Header(default=None, alias="X-Engine-Profile-Token"),
+) -> EngineConfig | None:
+    """可选：从请求头获取对冲请求使用的备用引擎配置（未提供时对冲请求发往主引擎）
+
+    仅在开启 `hedging_enabled` 时生效。
+
+    Header 格式:
+    X-Hedge-Engine-Config: {"apiKey": "...", "baseUrl": "...", "channel": "openai|anthropic", "model": "..."}
+    X-Hedge-Engine-Profile: gpt4o-mini
+    """
+    if x_hedge_engine_profile:
+        return resolve_engine_profile(x_hedge_engine_profile, x_engine_profile_token)
+    if not x_hedge_engine_config:
+        return None
+    return parse_engine_config(x_hedge_engine_config)
+
+
+@dataclass
+class CachePolicy:
+    """单次请求的缓存策略（由 Cache-Control 请求头决定）"""
+
+    read: bool = True
+    write: bool = True
+
+
+async def get_cache_policy(
+    cache_control: str | None = Header(default=None, alias="Cache-Control"),
+) -> CachePolicy:
+    """从 Cache-Control 请求头解析缓存策略
+
+    - `no-cache`：跳过缓存读取，强制请求上游（新结果仍会写入缓存）
+    - `no-store`：既不读取也不写入缓存
+    """
+    directives = {d.strip().lower() for d in (cache_control or "").split(",")}
+    if "no-store" in directives:
+        return CachePolicy(read=False, write=False)
+    if "no-cache" in directives:
+        return CachePolicy(read=False, write=True)
+    return CachePolicy()
+
+
+async def require_admin_token(
+    x_admin_token: str | None = Header(default=None, alias="X-Admin-Token"),
+) -> None:
+    """管理接口（修改服务端状态的接口）鉴权
+
+    必须配置 `admin_token`，且请求头 `X-Admin-Token` 与之一致；未配置时管理接口一律拒绝。
+    """
+    if not settings.admin_token:
+        raise ApiError(403, "admin_api_disabled", "未配置 admin_token，管理接口不可用")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token.encode(), settings.admin_token.encode()):
+        raise ApiError(401, "invalid_admin_token", "缺少或无效的 X-Admin-Token")
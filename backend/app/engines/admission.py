@@ -0,0 +1,240 @@
+"""上游调用准入控制。
+
+按 (channel, base_url, api_key 哈希) 限制同时进行的上游调用：
+- 最大并发数（in-flight）
+- 每分钟请求数（RPM）与每分钟 token 数（TPM）令牌桶
+- 名额不足时按 FIFO 排队等待，超过排队截止时间才失败（而不是直接打到上游触发 429）
+
+限制值为 0 表示不限制；三项全为 0 时直接放行，不做任何记账。
+服务端引擎配置档（`app/engines/profiles.py`）可通过 `configure()` 为自己的凭据单独设定限制。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator
+
+from app.config import settings
+from app.engines.base import estimate_tokens
+from app.engines.client_pool import ClientKey
+
+
+class AdmissionTimeoutError(Exception):
+    """排队等待上游调用名额超时"""
+
+
+def call_tokens(prompt: str, text: str) -> int:
+    """估算一次翻译调用消耗的 token：输入（提示词 + 原文）+ 预计输出（与原文相当）"""
+    return estimate_tokens(prompt) + 2 * estimate_tokens(text)
+
+
+@dataclass(frozen=True)
+class AdmissionLimits:
+    max_in_flight: int = 0
+    requests_per_minute: float = 0
+    tokens_per_minute: float = 0
+    queue_timeout: float = 60.0
+
+    @property
+    def unlimited(self) -> bool:
+        return not (self.max_in_flight or self.requests_per_minute or self.tokens_per_minute)
+
+    @classmethod
+    def from_settings(cls) -> AdmissionLimits:
+        return cls(
+            max_in_flight=settings.admission_max_in_flight,
+            requests_per_minute=settings.admission_requests_per_minute,
+            tokens_per_minute=settings.admission_tokens_per_minute,
+            queue_timeout=settings.admission_queue_timeout,
+        )
+
+
+class TokenBucket:
+    """令牌桶：容量为每分钟额度，按秒匀速补充；per_minute 为 0 表示不限制"""
+
+    def __init__(self, per_minute: float):
+        self.capacity = per_minute
+        self.tokens = per_minute
+        self._rate = per_minute / 60
+        self._updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self._rate)
+        self._updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """还需等待多久才能取出 amount 个令牌（超过容量的请求按容量计）"""
+        if not self.capacity:
+            return 0.0
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        return 0.0 if self.tokens >= amount else (amount - self.tokens) / self._rate
+
+    def take(self, amount: float) -> None:
+        if self.capacity:
+            self.tokens -= min(amount, self.capacity)
+
+    @property
+    def full(self) -> bool:
+        self._refill(time.monotonic())
+        return self.tokens >= self.capacity
+
+
+@dataclass
+class _Gate:
+    limits: AdmissionLimits
+    requests: TokenBucket
+    tokens: TokenBucket
+    waiters: deque[tuple[asyncio.Future, int]] = field(default_factory=deque)
+    in_flight: int = 0
+    timer: asyncio.TimerHandle | None = None
+    admitted: int = 0
+    timeouts: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+
+    @property
+    def idle(self) -> bool:
+        return not self.in_flight and not self.waiters and self.requests.full and self.tokens.full
+
+
+class AdmissionController:
+    """全局准入控制器（单事件循环内使用）"""
+
+    def __init__(self, limits: AdmissionLimits | None = None, *, max_gates: int = 1024):
+        self.limits = limits or AdmissionLimits()
+        self._max_gates = max_gates
+        self._gates: dict[ClientKey, _Gate] = {}
+        self._overrides: dict[ClientKey, AdmissionLimits] = {}
+
+    def configure(self, key: ClientKey, limits: AdmissionLimits | None) -> None:
+        """为指定凭据设置单独的限制（None 表示恢复全局限制）"""
+        if limits is None:
+            self._overrides.pop(key, None)
+        else:
+            self._overrides[key] = limits
+        gate = self._gates.pop(key, None)
+        if gate is not None and not gate.idle:
+            # 仍有调用在进行或排队：沿用原计数，换上新限制后重新放行
+            gate.limits = self.limits_for(key)
+            gate.requests = TokenBucket(gate.limits.requests_per_minute)
+            gate.tokens = TokenBucket(gate.limits.tokens_per_minute)
+            self._gates[key] = gate
+            self._dispatch(gate)
+
+    def limits_for(self, key: ClientKey) -> AdmissionLimits:
+        return self._overrides.get(key, self.limits)
+
+    @asynccontextmanager
+    async def acquire(self, key: ClientKey, tokens: int = 0) -> AsyncIterator[None]:
+        """取得一个上游调用名额，退出上下文时归还
+
+        名额不足时排队；超过 `queue_timeout` 仍未轮到则抛出 AdmissionTimeoutError。
+        """
+        limits = self.limits_for(key)
+        if limits.unlimited:
+            yield
+            return
+
+        gate = self._gate(key)
+        waiter = (asyncio.get_running_loop().create_future(), tokens)
+        started = time.monotonic()
+        gate.waiters.append(waiter)
+        self._dispatch(gate)
+        try:
+            async with asyncio.timeout(limits.queue_timeout or None):
+                await waiter[0]
+        except BaseException as e:
+            if waiter[0].done() and not waiter[0].cancelled():
+                # 恰好在超时/取消的同时被放行：归还名额
+                self._release(gate)
+            elif waiter in gate.waiters:
+                gate.waiters.remove(waiter)
+                self._dispatch(gate)
+            if isinstance(e, TimeoutError):
+                gate.timeouts += 1
+                raise AdmissionTimeoutError(
+                    f"等待上游调用名额超时（{limits.queue_timeout:g}s）"
+                ) from e
+            raise
+
+        waited = time.monotonic() - started
+        gate.admitted += 1
+        gate.total_wait += waited
+        gate.max_wait = max(gate.max_wait, waited)
+        try:
+            yield
+        finally:
+            self._release(gate)
+
+    def _gate(self, key: ClientKey) -> _Gate:
+        gate = self._gates.get(key)
+        if gate is None:
+            if len(self._gates) >= self._max_gates:
+                for stale in [k for k, g in self._gates.items() if g.idle]:
+                    del self._gates[stale]
+            limits = self.limits_for(key)
+            gate = self._gates[key] = _Gate(
+                limits=limits,
+                requests=TokenBucket(limits.requests_per_minute),
+                tokens=TokenBucket(limits.tokens_per_minute),
+            )
+        return gate
+
+    def _release(self, gate: _Gate) -> None:
+        gate.in_flight -= 1
+        self._dispatch(gate)
+
+    def _dispatch(self, gate: _Gate) -> None:
+        """按 FIFO 放行队首请求，直到并发或令牌不足"""
+        limits = gate.limits
+        while gate.waiters:
+            future, tokens = gate.waiters[0]
+            if future.done():
+                gate.waiters.popleft()
+                continue
+            if limits.max_in_flight and gate.in_flight >= limits.max_in_flight:
+                return  # 等待某个调用结束后 _release 再次放行
+            now = time.monotonic()
+            wait = max(gate.requests.wait_time(1, now), gate.tokens.wait_time(tokens, now))
+            if wait > 0:
+                if gate.timer is None:
+                    gate.timer = asyncio.get_running_loop().call_later(wait, self._on_timer, gate)
+                return
+            gate.waiters.popleft()
+            gate.requests.take(1)
+            gate.tokens.take(tokens)
+            gate.in_flight += 1
+            future.set_result(None)
+
+    def _on_timer(self, gate: _Gate) -> None:
+        gate.timer = None
+        self._dispatch(gate)
+
+    def snapshot(self) -> dict[str, Any]:
+        gates = self._gates.values()
+        admitted = sum(g.admitted for g in gates)
+        return {
+            "limits": {
+                "max_in_flight": self.limits.max_in_flight,
+                "requests_per_minute": self.limits.requests_per_minute,
+                "tokens_per_minute": self.limits.tokens_per_minute,
+                "queue_timeout": self.limits.queue_timeout,
+            },
+            "providers": len(self._gates),
+            "configured": len(self._overrides),
+            "in_flight": sum(g.in_flight for g in gates),
+            "queue_depth": sum(len(g.waiters) for g in gates),
+            "admitted": admitted,
+            "timeouts": sum(g.timeouts for g in gates),
+            "avg_wait": sum(g.total_wait for g in gates) / admitted if admitted else 0.0,
+            "max_wait": max((g.max_wait for g in gates), default=0.0),
+        }
+
+
+# 全局准入控制器
+admission = AdmissionController(AdmissionLimits.from_settings())
@@ -1,6 +1,18 @@
+from contextlib import nullcontext
+from typing import AsyncIterator, ContextManager
+
 from anthropic import AsyncAnthropic
 
-from app.engines.base import TranslationResult
+from app.engines.admission import admission, call_tokens
+from app.engines.base import (
+    TranslationResult,
+    collect_usage,
+    prompt_cacheable,
+    resolve_system_parts,
+)
+from app.engines.client_pool import ClientPool, client_key
+from app.engines.resilience import call_with_retry, stream_with_retry
+from app.engines.usage import TokenUsage, usage_stats
 from app.llm_debug import log_ai_sdk_params
 from app.prompts.system import build_translation_system_prompt
 
@@ -16,6 +28,8 @@ class AnthropicEngine:
         api_key: str,
         base_url: str | None = None,
         model: str | None = None,
+        client: AsyncAnthropic | None = None,
+        pool: ClientPool | None = None,
     ):
         """初始化引擎
 
@@ -23,13 +37,21 @@ class AnthropicEngine:
             api_key: API 密钥
             base_url: API 基础 URL（可选，用于代理或兼容服务）
             model: 默认模型名称（可选）
+            client: 复用的 SDK 客户端（可选）
+            pool: 客户端池（可选；给出时每次调用从池中借出客户端，优先于 client）
         """
-        self.client = AsyncAnthropic(
-            api_key=api_key,
-            base_url=base_url if base_url else None,
-        )
+        self._pool = pool
+        self._api_key = api_key
+        self._base_url = base_url
+        self.client = client
+        if pool is None and client is None:
+            self.client = AsyncAnthropic(
+                api_key=api_key,
+                base_url=base_url if base_url else None,
+            )
         self._default_model = model or "claude-sonnet-4-20250514"
         self._id = "anthropic"
+        self._admission_key = client_key("anthropic", base_url, api_key)
         self._name = "Anthropic Claude"
         self._engine_type = "llm"
         self._supported_languages = [
@@ -53,6 +75,10 @@ class AnthropicEngine:
     def supported_languages(self) -> list[str]:
         return self._supported_languages
 
+    @property
+    def default_model(self) -> str:
+        return self._default_model
+
     async def translate(
         self,
         text: str,
@@ -73,36 +99,27 @@ class AnthropicEngine:
         Returns:
             翻译结果
         """
-        options = options or {}
-        custom_prompt = options.get("prompt", "")
-        system_prompt = options.get("system_prompt")
-        model = options.get("model", self._default_model)
-
-        if not system_prompt:
-            system_prompt = build_translation_system_prompt(
-                source_lang=source_lang,
-                target_lang=target_lang,
-                additional_instructions=custom_prompt,
-            )
-
         try:
-            params = {
-                "model": model,
-                "max_tokens": 4096,
-                "system": system_prompt,
-                "messages": [{"role": "user", "content": text}],
-            }
+            params = self._build_params(text, source_lang, target_lang, options)
             # 这里打印的 params 与下一行实际传给 SDK 的 kwargs 完全一致
             log_ai_sdk_params("anthropic", params)
-            response = await self.client.messages.create(**params)
+            with self._lease() as client:
+                response = await call_with_retry(
+                    lambda: client.messages.create(**params),
+                    admit=self._admit(params, text),
+                    metric_labels=("anthropic", params["model"]),
+                )
 
             translated_text = response.content[0].text if response.content else ""
+            usage = TokenUsage.from_anthropic(response.usage)
+            usage_stats.record("anthropic", usage)
 
             return TranslationResult(
                 text=translated_text.strip(),
                 source_lang=source_lang,
                 target_lang=target_lang,
                 success=True,
+                usage=usage,
             )
         except Exception as e:
             return TranslationResult(
@@ -113,6 +130,93 @@ class AnthropicEngine:
                 error=str(e),
             )
 
+    async def translate_stream(
+        self,
+        text: str,
+        source_lang: str,
+        target_lang: str,
+        options: dict | None = None,
+    ) -> AsyncIterator[str]:
+        """使用 Anthropic 流式接口翻译，逐段产出增量译文
+
+        与 `translate` 不同，上游异常会直接抛出，由调用方决定如何上报。
+        用量（message_start / message_delta 事件上报）累加到 options["usage"]（如有）。
+        """
+        params = self._build_params(text, source_lang, target_lang, options)
+        params["stream"] = True
+        log_ai_sdk_params("anthropic", params)
+
+        usage = TokenUsage()
+        started = False
+        with self._lease() as client:
+            async for delta in stream_with_retry(
+                lambda: self._iter_stream(client, params, usage),
+                admit=self._admit(params, text),
+                metric_labels=("anthropic", params["model"]),
+            ):
+                if not started:
+                    # 与非流式结果的 strip() 保持一致：去掉开头的空白
+                    delta = delta.lstrip()
+                if delta:
+                    started = True
+                    yield delta
+        usage_stats.record("anthropic", usage)
+        collect_usage(options, usage)
+
+    async def _iter_stream(self, client, params: dict, usage: TokenUsage) -> AsyncIterator[str]:
+        stream = await client.messages.create(**params)
+        async with stream:
+            async for event in stream:
+                if event.type == "message_start":
+                    usage.add(TokenUsage.from_anthropic(event.message.usage))
+                elif event.type == "message_delta":
+                    # message_delta 中的 output_tokens 为累计值
+                    usage.output_tokens = event.usage.output_tokens or usage.output_tokens
+                elif event.type == "content_block_delta" and getattr(event.delta, "text", None):
+                    yield event.delta.text
+
+    def _lease(self) -> ContextManager[AsyncAnthropic]:
+        """借用 SDK 客户端；来自客户端池时，调用期间客户端不会被回收关闭"""
+        if self._pool is None:
+            return nullcontext(self.client)
+        return self._pool.lease_client("anthropic", self._api_key, self._base_url)
+
+    def _admit(self, params: dict, text: str):
+        """准入控制：按凭据限制并发与 RPM/TPM（见 app/engines/admission.py）"""
+        system = params["system"]
+        if isinstance(system, list):
+            system = "".join(block["text"] for block in system)
+        tokens = call_tokens(system, text)
+        return lambda: admission.acquire(self._admission_key, tokens)
+
+    def _build_params(
+        self,
+        text: str,
+        source_lang: str,
+        target_lang: str,
+        options: dict | None,
+    ) -> dict:
+        options = options or {}
+        stable, volatile = resolve_system_parts(source_lang, target_lang, options)
+        model = options.get("model", self._default_model)
+
+        if prompt_cacheable(stable):
+            # 稳定前缀单独成块并打上缓存断点，易变的上文放在断点之后
+            system: str | list[dict] = [
+                {"type": "text", "text": stable, "cache_control": {"type": "ephemeral"}}
+            ]
+            if volatile:
+                system.append({"type": "text", "text": volatile})
+        else:
+            system = f"{stable}\n\n{volatile}" if volatile else stable
+
+        return {
+            "model": model,
+            "max_tokens": 4096,
+            "system": system,
+            "messages": [{"role": "user", "content": text}],
+        }
+
     def _build_system_prompt(self, source_lang: str, target_lang: str, custom_prompt: str) -> str:
         return build_translation_system_prompt(
             source_lang=source_lang,
@@ -1,6 +1,27 @@
-from typing import Protocol, runtime_checkable
+import re
+from typing import AsyncIterator, Protocol, runtime_checkable
 from dataclasses import dataclass
 
+from app.config import settings
+from app.engines.usage import TokenUsage
+from app.prompts.system import (
+    build_glossary_block,
+    build_segment_context_block,
+    build_translation_memory_block,
+    build_translation_system_prompt,
+)
+
+
+_CJK = re.compile(r"[぀-ヿ㐀-鿿가-힯豈-﫿]")
+
+
+def estimate_tokens(text: str) -> int:
+    """粗略估算 token 数：CJK 字符约 1 token/字，其余约 4 字符/token"""
+    if not text:
+        return 0
+    cjk = len(_CJK.findall(text))
+    return cjk + (len(text) - cjk + 3) // 4
+
 
 @dataclass
 class TranslationResult:
@@ -11,6 +32,57 @@ class TranslationResult:
     target_lang: str
     success: bool = True
     error: str | None = None
+    usage: TokenUsage | None = None
+
+
+def resolve_system_parts(source_lang: str, target_lang: str, options: dict | None) -> tuple[str, str]:
+    """把 system prompt 拆成（稳定前缀, 易变后缀）
+
+    稳定前缀在同一配置的多次调用之间逐字不变，可作为 provider 提示词缓存的前缀；
+    易变后缀包括本片段命中的术语（`terms`）、翻译记忆参考译文（`references`）
+    与分段翻译时的上文（`context`），没有时为空字符串。
+    """
+    options = options or {}
+    stable = options.get("system_prompt")
+    if not stable:
+        stable = build_translation_system_prompt(
+            source_lang=source_lang,
+            target_lang=target_lang,
+            additional_instructions=options.get("prompt", ""),
+        )
+    volatile: list[str] = []
+    terms = options.get("terms")
+    if terms:
+        volatile.append(build_glossary_block(terms))
+    references = options.get("references")
+    if references:
+        volatile.append(build_translation_memory_block(references))
+    context = options.get("context")
+    if context:
+        volatile.append(build_segment_context_block(context))
+    return stable, "\n\n".join(volatile)
+
+
+def resolve_system_prompt(source_lang: str, target_lang: str, options: dict | None) -> str:
+    """得到实际发送给模型的 system prompt
+
+    options 中显式给出 `system_prompt` 时直接使用，否则由 `prompt` 追加到通用翻译提示词；
+    `terms`（命中的术语）、`references`（翻译记忆参考译文）与 `context`（分段翻译时的上文）总是追加在最后。
+    """
+    stable, volatile = resolve_system_parts(source_lang, target_lang, options)
+    return f"{stable}\n\n{volatile}" if volatile else stable
+
+
+def prompt_cacheable(stable_prompt: str) -> bool:
+    """稳定前缀是否值得标记为 provider 提示词缓存（过短的前缀 provider 不会缓存）"""
+    return settings.prompt_cache_enabled and estimate_tokens(stable_prompt) >= settings.prompt_cache_min_tokens
+
+
+def collect_usage(options: dict | None, usage: TokenUsage | None) -> None:
+    """把流式调用的用量累加到调用方通过 options["usage"] 传入的收集器"""
+    collector = (options or {}).get("usage")
+    if collector is not None:
+        collector.add(usage)
 
 
 @runtime_checkable
@@ -37,6 +109,11 @@ class TranslationEngine(Protocol):
         """支持的语言列表"""
         ...
 
+    @property
+    def default_model(self) -> str:
+        """未在 options 中指定 model 时使用的模型"""
+        ...
+
     async def translate(
         self,
         text: str,
@@ -46,3 +123,13 @@ class TranslationEngine(Protocol):
     ) -> TranslationResult:
         """执行翻译"""
         ...
+
+    def translate_stream(
+        self,
+        text: str,
+        source_lang: str,
+        target_lang: str,
+        options: dict | None = None,
+    ) -> AsyncIterator[str]:
+        """流式翻译：逐段产出增量译文，上游异常直接抛出"""
+        ...
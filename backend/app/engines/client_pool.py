@@ -0,0 +1,269 @@
+"""上游 SDK 客户端池。
+
+进程级复用 `AsyncOpenAI` / `AsyncAnthropic` 客户端及其底层 httpx 连接池，
+避免每次翻译都重新建立 TLS 连接：
+- 以 (channel, base_url, api_key 哈希) 为键，同一组凭据共享一个客户端
+- 连接池参数（最大连接数、keep-alive）来自 `Settings`
+- 空闲超过 `client_pool_idle_ttl` 的客户端由后台任务关闭回收
+- 引擎每次调用通过 `lease()` 借出客户端：借出中的客户端不算空闲；被容量淘汰时
+  先移出池，等最后一次归还后再关闭，不会关掉正在进行的请求
+- 服务端引擎配置档的客户端通过 `pin()` 预先创建并常驻，不参与空闲回收与容量淘汰
+- 应用关闭时通过 `aclose()` 统一释放所有连接
+- SDK 自带重试被关闭，统一由 `app/engines/resilience.py` 负责
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Iterator
+
+import anthropic
+import httpx
+import openai
+
+from app.config import settings
+from app.dependencies import EngineConfig
+from app.errors import ApiError
+
+
+logger = logging.getLogger(__name__)
+
+ClientKey = tuple[str, str, str]
+
+
+def client_key(channel: str, base_url: str | None, api_key: str) -> ClientKey:
+    """生成客户端池键；api_key 只保留哈希，避免明文常驻在键里。"""
+    key_hash = hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+    return (channel, (base_url or "").rstrip("/"), key_hash)
+
+
+def engine_client_key(config: EngineConfig) -> ClientKey:
+    return client_key(config.channel, config.base_url, config.api_key)
+
+
+@dataclass
+class _PooledClient:
+    client: Any
+    http_client: httpx.AsyncClient
+    created_at: float = field(default_factory=time.monotonic)
+    last_used: float = field(default_factory=time.monotonic)
+    leases: int = 0
+    retired: bool = False
+
+
+class ClientPool:
+    """按凭据复用的 SDK 客户端池"""
+
+    def __init__(
+        self,
+        *,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 30.0,
+        idle_ttl: float = 600.0,
+        max_clients: int = 64,
+        sweep_interval: float = 60.0,
+    ):
+        self._limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self._idle_ttl = idle_ttl
+        self._max_clients = max_clients
+        self._sweep_interval = sweep_interval
+        self._clients: dict[ClientKey, _PooledClient] = {}
+        self._pinned: set[ClientKey] = set()
+        self._retired: list[_PooledClient] = []
+        self._closing: set[asyncio.Task] = set()
+        self._sweeper: asyncio.Task | None = None
+        self._created = 0
+        self._evicted = 0
+
+    def get(self, config: EngineConfig) -> Any:
+        """获取（或创建）与配置对应的 SDK 客户端"""
+        return self.get_client(config.channel, config.api_key, config.base_url)
+
+    def get_client(self, channel: str, api_key: str, base_url: str | None = None) -> Any:
+        return self._entry(channel, api_key, base_url).client
+
+    def lease(self, config: EngineConfig) -> Iterator[Any]:
+        """借出与配置对应的 SDK 客户端（用法同 `lease_client`）"""
+        return self.lease_client(config.channel, config.api_key, config.base_url)
+
+    @contextmanager
+    def lease_client(self, channel: str, api_key: str, base_url: str | None = None) -> Iterator[Any]:
+        """借出 SDK 客户端，覆盖一次上游调用（含重试）的全过程
+
+        借出期间客户端不参与空闲回收；若被容量淘汰，则在最后一次归还时才关闭。
+        """
+        entry = self._entry(channel, api_key, base_url)
+        entry.leases += 1
+        try:
+            yield entry.client
+        finally:
+            entry.leases -= 1
+            entry.last_used = time.monotonic()
+            if entry.retired and entry.leases == 0:
+                self._retired.remove(entry)
+                self._close(entry)
+
+    def _entry(self, channel: str, api_key: str, base_url: str | None) -> _PooledClient:
+        key = client_key(channel, base_url, api_key)
+        entry = self._clients.get(key)
+        if entry is None:
+            entry = self._create(channel, api_key, base_url)
+            self._clients[key] = entry
+            self._created += 1
+            self._enforce_capacity(exclude=key)
+        entry.last_used = time.monotonic()
+        return entry
+
+    def pin(self, config: EngineConfig) -> ClientKey:
+        """预先创建配置对应的客户端并常驻池中，返回其池键"""
+        self.get(config)
+        key = engine_client_key(config)
+        self._pinned.add(key)
+        return key
+
+    def unpin(self, key: ClientKey) -> None:
+        """取消常驻，之后按普通客户端参与空闲回收"""
+        self._pinned.discard(key)
+
+    def warm_targets(self) -> list[tuple[ClientKey, str, httpx.AsyncClient]]:
+        """常驻客户端的 (池键, 实际 base_url, httpx 客户端)，供连接预热使用（不更新 last_used）
+
+        只包含服务端配置档预建的常驻客户端；按请求头临时创建的客户端（base_url 由调用方指定）
+        不预热，也不出现在就绪报告中。
+        """
+        return [
+            (k, str(e.client.base_url), e.http_client) for k, e in self._clients.items() if k in self._pinned
+        ]
+
+    def _create(self, channel: str, api_key: str, base_url: str | None) -> _PooledClient:
+        if channel == "openai":
+            http_client = openai.DefaultAsyncHttpxClient(limits=self._limits)
+            client = openai.AsyncOpenAI(
+                api_key=api_key,
+                base_url=base_url if base_url else None,
+                http_client=http_client,
+                max_retries=0,
+            )
+        elif channel == "anthropic":
+            http_client = anthropic.DefaultAsyncHttpxClient(limits=self._limits)
+            client = anthropic.AsyncAnthropic(
+                api_key=api_key,
+                base_url=base_url if base_url else None,
+                http_client=http_client,
+                max_retries=0,
+            )
+        else:
+            raise ApiError(
+                400,
+                "unsupported_channel",
+                f"不支持的引擎渠道：{channel}",
+                {"supported": ["openai", "anthropic"]},
+            )
+        return _PooledClient(client=client, http_client=http_client)
+
+    def _enforce_capacity(self, *, exclude: ClientKey) -> None:
+        """超过容量时按最近最少使用淘汰（新建的客户端不参与淘汰，优先淘汰未借出的客户端）"""
+        while len(self._clients) > self._max_clients:
+            candidates = [
+                (e.leases > 0, e.last_used, k)
+                for k, e in self._clients.items()
+                if k != exclude and k not in self._pinned
+            ]
+            if not candidates:
+                return
+            *_, oldest = min(candidates)
+            self._discard(oldest)
+
+    def _discard(self, key: ClientKey) -> None:
+        """移出池；仍有借出时推迟到最后一次归还再关闭"""
+        entry = self._clients.pop(key, None)
+        if entry is None:
+            return
+        self._evicted += 1
+        if entry.leases:
+            entry.retired = True
+            self._retired.append(entry)
+        else:
+            self._close(entry)
+
+    def _close(self, entry: _PooledClient) -> None:
+        try:
+            task = asyncio.get_running_loop().create_task(entry.http_client.aclose())
+        except RuntimeError:
+            return
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    def evict_idle(self, now: float | None = None) -> int:
+        """关闭空闲超时的客户端（借出中的不算空闲），返回淘汰数量"""
+        now = time.monotonic() if now is None else now
+        stale = [
+            k
+            for k, e in self._clients.items()
+            if k not in self._pinned and not e.leases and now - e.last_used > self._idle_ttl
+        ]
+        for key in stale:
+            self._discard(key)
+        return len(stale)
+
+    def start(self) -> None:
+        """启动后台空闲回收任务（需在事件循环内调用）"""
+        if self._sweeper is None or self._sweeper.done():
+            self._sweeper = asyncio.get_running_loop().create_task(self._sweep_forever())
+
+    async def _sweep_forever(self) -> None:
+        while True:
+            await asyncio.sleep(self._sweep_interval)
+            evicted = self.evict_idle()
+            if evicted:
+                logger.debug("client pool evicted %d idle clients", evicted)
+
+    async def aclose(self) -> None:
+        """关闭回收任务与所有客户端连接"""
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            try:
+                await self._sweeper
+            except asyncio.CancelledError:
+                pass
+            self._sweeper = None
+
+        entries = [*self._clients.values(), *self._retired]
+        self._clients.clear()
+        self._retired.clear()
+        await asyncio.gather(
+            *(e.http_client.aclose() for e in entries),
+            *self._closing,
+            return_exceptions=True,
+        )
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "clients": len(self._clients),
+            "pinned": len(self._pinned),
+            "leased": sum(e.leases for e in self._clients.values()) + sum(e.leases for e in self._retired),
+            "retiring": len(self._retired),
+            "created": self._created,
+            "evicted": self._evicted,
+        }
+
+
+# 全局客户端池实例
+client_pool = ClientPool(
+    max_connections=settings.client_pool_max_connections,
+    max_keepalive_connections=settings.client_pool_max_keepalive_connections,
+    keepalive_expiry=settings.client_pool_keepalive_expiry,
+    idle_ttl=settings.client_pool_idle_ttl,
+    max_clients=settings.client_pool_max_clients,
+    sweep_interval=settings.client_pool_sweep_interval,
+)
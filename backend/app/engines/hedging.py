@@ -0,0 +1,214 @@
+"""对冲请求（hedged requests）。
+
+上游延迟长尾明显：首次调用在“历史 p95 延迟”内仍未完成（流式则是未产出首个增量）时，
+再发出一个相同的请求（可发往备用引擎），先成功者胜出，另一个立即取消。
+
+- 触发延迟取该 (channel, model) 最近成功调用耗时的百分位数，样本不足时用默认值
+- 默认关闭，由 `hedging_enabled` 开启；备用引擎来自请求头 X-Hedge-Engine-Config
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, AsyncIterator
+
+from app.config import settings
+from app.engines.base import TranslationResult
+from app.engines.latency import LatencyKey, LatencyTracker
+
+
+@dataclass
+class HedgeStats:
+    requests: int = 0
+    hedged: int = 0
+    primary_wins: int = 0
+    hedge_wins: int = 0
+    cancelled: int = 0
+
+    @property
+    def hedge_rate(self) -> float:
+        return self.hedged / self.requests if self.requests else 0.0
+
+    def snapshot(self) -> dict[str, Any]:
+        return {**asdict(self), "hedge_rate": self.hedge_rate}
+
+
+# 全局对冲统计与延迟样本
+hedge_stats = HedgeStats()
+latency_tracker = LatencyTracker(window=settings.hedging_window)
+
+
+def hedge_delay(key: LatencyKey, kind: str) -> float:
+    """计算对冲触发延迟（秒）"""
+    if latency_tracker.count(key, kind) < settings.hedging_min_samples:
+        return settings.hedging_default_delay
+    delay = latency_tracker.percentile(key, kind, settings.hedging_percentile)
+    return min(settings.hedging_max_delay, max(settings.hedging_min_delay, delay or 0.0))
+
+
+def _latency_key(engine) -> LatencyKey:
+    return (engine.id, engine.default_model)
+
+
+_EXHAUSTED = object()
+
+
+async def _first_item(stream: AsyncIterator[str]) -> Any:
+    """取流的第一个增量；空流返回 _EXHAUSTED"""
+    async for item in stream:
+        return item
+    return _EXHAUSTED
+
+
+class HedgedEngine:
+    """为引擎加上对冲请求；对外表现与被包装的主引擎一致"""
+
+    def __init__(self, primary, fallback=None):
+        self._primary = primary
+        self._fallback = fallback or primary
+
+    @property
+    def id(self) -> str:
+        return self._primary.id
+
+    @property
+    def name(self) -> str:
+        return self._primary.name
+
+    @property
+    def engine_type(self) -> str:
+        return self._primary.engine_type
+
+    @property
+    def supported_languages(self) -> list[str]:
+        return self._primary.supported_languages
+
+    @property
+    def default_model(self) -> str:
+        return self._primary.default_model
+
+    async def translate(
+        self,
+        text: str,
+        source_lang: str,
+        target_lang: str,
+        options: dict | None = None,
+    ) -> TranslationResult:
+        """先调用主引擎，超过触发延迟仍未完成时发出对冲请求，取先成功者"""
+        hedge_stats.requests += 1
+
+        async def attempt(engine) -> TranslationResult:
+            started = time.monotonic()
+            result = await engine.translate(
+                text=text, source_lang=source_lang, target_lang=target_lang, options=options
+            )
+            if result.success:
+                latency_tracker.record(_latency_key(engine), "total", time.monotonic() - started)
+            return result
+
+        primary = asyncio.create_task(attempt(self._primary))
+        tasks = {primary}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=hedge_delay(_latency_key(self._primary), "total"))
+            if done:
+                return primary.result()
+
+            hedge_stats.hedged += 1
+            tasks.add(asyncio.create_task(attempt(self._fallback)))
+            result: TranslationResult | None = None
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    result = task.result()
+                    if result.success:
+                        self._count_win(task is primary)
+                        return result
+            return result
+        finally:
+            await self._cancel(tasks)
+
+    async def translate_stream(
+        self,
+        text: str,
+        source_lang: str,
+        target_lang: str,
+        options: dict | None = None,
+    ) -> AsyncIterator[str]:
+        """流式对冲：以首个增量为准，超过触发延迟仍无增量时发出对冲请求
+
+        一旦某个请求产出首个增量就只转发它的流，另一个立即关闭。
+        """
+        hedge_stats.requests += 1
+        streams: dict[str, AsyncIterator[str]] = {}
+        pending: dict[asyncio.Task, str] = {}
+        started_at: dict[str, float] = {}
+
+        def start(name: str, engine) -> None:
+            streams[name] = engine.translate_stream(
+                text=text, source_lang=source_lang, target_lang=target_lang, options=options
+            )
+            started_at[name] = time.monotonic()
+            pending[asyncio.create_task(_first_item(streams[name]))] = name
+
+        engines = {"primary": self._primary, "hedge": self._fallback}
+        start("primary", self._primary)
+        try:
+            done, _ = await asyncio.wait(
+                pending, timeout=hedge_delay(_latency_key(self._primary), "ttft")
+            )
+            if not done:
+                hedge_stats.hedged += 1
+                start("hedge", self._fallback)
+
+            winner: str | None = None
+            first: Any = _EXHAUSTED
+            error: BaseException | None = None
+            while pending and winner is None:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    name = pending.pop(task)
+                    if task.exception() is None:
+                        winner, first = name, task.result()
+                        break
+                    error = task.exception()
+            if winner is None:
+                raise error
+
+            if "hedge" in streams:
+                self._count_win(winner == "primary")
+            await self._cancel(pending)
+            pending.clear()
+            for name in list(streams):
+                if name != winner:
+                    await streams.pop(name).aclose()
+
+            if first is _EXHAUSTED:
+                return
+            latency_tracker.record(
+                _latency_key(engines[winner]), "ttft", time.monotonic() - started_at[winner]
+            )
+            yield first
+            async for delta in streams[winner]:
+                yield delta
+        finally:
+            await self._cancel(pending)
+            for stream in streams.values():
+                await stream.aclose()
+
+    @staticmethod
+    def _count_win(primary_won: bool) -> None:
+        if primary_won:
+            hedge_stats.primary_wins += 1
+        else:
+            hedge_stats.hedge_wins += 1
+
+    @staticmethod
+    async def _cancel(tasks) -> None:
+        """取消落败（或被放弃）的请求并等待其清理完毕"""
+        tasks = [t for t in tasks if not t.done()]
+        for task in tasks:
+            task.cancel()
+        hedge_stats.cancelled += len(tasks)
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,56 @@
+"""上游调用延迟记录。
+
+按 (channel, model) 保留最近 N 次成功调用的耗时（完成耗时与首个增量耗时），
+用于计算百分位数（例如对冲请求的触发延迟）。
+"""
+
+from __future__ import annotations
+
+import math
+from collections import deque
+from typing import Any
+
+LatencyKey = tuple[str, str]
+
+
+def percentile(samples: list[float], p: float) -> float:
+    """最近秩法百分位数（samples 需非空）"""
+    ordered = sorted(samples)
+    rank = math.ceil(p / 100 * len(ordered))
+    return ordered[min(len(ordered), max(1, rank)) - 1]
+
+
+class LatencyTracker:
+    """按键维护固定窗口的延迟样本"""
+
+    def __init__(self, window: int = 200):
+        self._window = max(1, window)
+        self._samples: dict[tuple[LatencyKey, str], deque[float]] = {}
+
+    def record(self, key: LatencyKey, kind: str, seconds: float) -> None:
+        """记录一次耗时；kind 为 "total"（完成）或 "ttft"（首个增量）"""
+        samples = self._samples.get((key, kind))
+        if samples is None:
+            samples = self._samples[(key, kind)] = deque(maxlen=self._window)
+        samples.append(seconds)
+
+    def count(self, key: LatencyKey, kind: str) -> int:
+        return len(self._samples.get((key, kind), ()))
+
+    def percentile(self, key: LatencyKey, kind: str, p: float) -> float | None:
+        samples = self._samples.get((key, kind))
+        if not samples:
+            return None
+        return percentile(list(samples), p)
+
+    def snapshot(self) -> dict[str, Any]:
+        result: dict[str, Any] = {}
+        for (key, kind), samples in self._samples.items():
+            values = list(samples)
+            entry = result.setdefault("/".join(key), {})
+            entry[kind] = {
+                "samples": len(values),
+                "p50": percentile(values, 50),
+                "p95": percentile(values, 95),
+            }
+        return result
@@ -1,6 +1,19 @@
+import hashlib
+from contextlib import nullcontext
+from typing import AsyncIterator, ContextManager
+
 from openai import AsyncOpenAI
 
-from app.engines.base import TranslationResult
+from app.engines.admission import admission, call_tokens
+from app.engines.base import (
+    TranslationResult,
+    collect_usage,
+    prompt_cacheable,
+    resolve_system_parts,
+)
+from app.engines.client_pool import ClientPool, client_key
+from app.engines.resilience import call_with_retry, stream_with_retry
+from app.engines.usage import TokenUsage, usage_stats
 from app.llm_debug import log_ai_sdk_params
 from app.prompts.system import build_translation_system_prompt
 
@@ -16,6 +29,8 @@ class OpenAIEngine:
         api_key: str,
         base_url: str | None = None,
         model: str | None = None,
+        client: AsyncOpenAI | None = None,
+        pool: ClientPool | None = None,
     ):
         """初始化引擎
 
@@ -23,13 +38,22 @@ class OpenAIEngine:
             api_key: API 密钥
             base_url: API 基础 URL（可选，用于代理或兼容服务）
             model: 默认模型名称（可选）
+            client: 复用的 SDK 客户端（可选）
+            pool: 客户端池（可选；给出时每次调用从池中借出客户端，优先于 client）
         """
-        self.client = AsyncOpenAI(
-            api_key=api_key,
-            base_url=base_url if base_url else None,
-        )
+        self._pool = pool
+        self._api_key = api_key
+        self._base_url = base_url
+        self.client = client
+        if pool is None and client is None:
+            self.client = AsyncOpenAI(
+                api_key=api_key,
+                base_url=base_url if base_url else None,
+            )
         self._default_model = model or "gpt-4o-mini"
         self._id = "openai"
+        self._admission_key = client_key("openai", base_url, api_key)
+        self._official_api = not base_url or "api.openai.com" in base_url
         self._name = "OpenAI GPT"
         self._engine_type = "llm"
         self._supported_languages = [
@@ -53,6 +77,10 @@ class OpenAIEngine:
     def supported_languages(self) -> list[str]:
         return self._supported_languages
 
+    @property
+    def default_model(self) -> str:
+        return self._default_model
+
     async def translate(
         self,
         text: str,
@@ -73,38 +101,27 @@ class OpenAIEngine:
         Returns:
             翻译结果
         """
-        options = options or {}
-        custom_prompt = options.get("prompt", "")
-        system_prompt = options.get("system_prompt")
-        model = options.get("model", self._default_model)
-
-        if not system_prompt:
-            system_prompt = build_translation_system_prompt(
-                source_lang=source_lang,
-                target_lang=target_lang,
-                additional_instructions=custom_prompt,
-            )
-
         try:
-            params = {
-                "model": model,
-                "messages": [
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": text},
-                ],
-                "temperature": 0.3,
-            }
+            params = self._build_params(text, source_lang, target_lang, options)
             # 这里打印的 params 与下一行实际传给 SDK 的 kwargs 完全一致
             log_ai_sdk_params("openai", params)
-            response = await self.client.chat.completions.create(**params)
+            with self._lease() as client:
+                response = await call_with_retry(
+                    lambda: client.chat.completions.create(**params),
+                    admit=self._admit(params, text),
+                    metric_labels=("openai", params["model"]),
+                )
 
             translated_text = response.choices[0].message.content or ""
+            usage = TokenUsage.from_openai(response.usage)
+            usage_stats.record("openai", usage)
 
             return TranslationResult(
                 text=translated_text.strip(),
                 source_lang=source_lang,
                 target_lang=target_lang,
                 success=True,
+                usage=usage,
             )
         except Exception as e:
             return TranslationResult(
@@ -115,6 +132,90 @@ class OpenAIEngine:
                 error=str(e),
             )
 
+    async def translate_stream(
+        self,
+        text: str,
+        source_lang: str,
+        target_lang: str,
+        options: dict | None = None,
+    ) -> AsyncIterator[str]:
+        """使用 OpenAI 流式接口翻译，逐段产出增量译文
+
+        与 `translate` 不同，上游异常会直接抛出，由调用方决定如何上报。
+        用量（官方接口在最后一个 chunk 上报）累加到 options["usage"]（如有）。
+        """
+        params = self._build_params(text, source_lang, target_lang, options)
+        params["stream"] = True
+        if self._official_api:
+            # 兼容接口未必支持 stream_options，只对官方接口请求用量
+            params["stream_options"] = {"include_usage": True}
+        log_ai_sdk_params("openai", params)
+
+        usage = TokenUsage()
+        started = False
+        with self._lease() as client:
+            async for delta in stream_with_retry(
+                lambda: self._iter_stream(client, params, usage),
+                admit=self._admit(params, text),
+                metric_labels=("openai", params["model"]),
+            ):
+                if not started:
+                    # 与非流式结果的 strip() 保持一致：去掉开头的空白
+                    delta = delta.lstrip()
+                if delta:
+                    started = True
+                    yield delta
+        usage_stats.record("openai", usage)
+        collect_usage(options, usage)
+
+    async def _iter_stream(self, client, params: dict, usage: TokenUsage) -> AsyncIterator[str]:
+        stream = await client.chat.completions.create(**params)
+        async with stream:
+            async for chunk in stream:
+                if chunk.usage is not None:
+                    usage.add(TokenUsage.from_openai(chunk.usage))
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+
+    def _lease(self) -> ContextManager[AsyncOpenAI]:
+        """借用 SDK 客户端；来自客户端池时，调用期间客户端不会被回收关闭"""
+        if self._pool is None:
+            return nullcontext(self.client)
+        return self._pool.lease_client("openai", self._api_key, self._base_url)
+
+    def _admit(self, params: dict, text: str):
+        """准入控制：按凭据限制并发与 RPM/TPM（见 app/engines/admission.py）"""
+        tokens = call_tokens(params["messages"][0]["content"], text)
+        return lambda: admission.acquire(self._admission_key, tokens)
+
+    def _build_params(
+        self,
+        text: str,
+        source_lang: str,
+        target_lang: str,
+        options: dict | None,
+    ) -> dict:
+        options = options or {}
+        # 稳定前缀在前、易变的上文在后，使 OpenAI 自动前缀缓存尽可能命中
+        stable, volatile = resolve_system_parts(source_lang, target_lang, options)
+        system_prompt = f"{stable}\n\n{volatile}" if volatile else stable
+        model = options.get("model", self._default_model)
+
+        params = {
+            "model": model,
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": text},
+            ],
+            "temperature": 0.3,
+        }
+        if self._official_api and prompt_cacheable(stable):
+            # 相同前缀的请求路由到同一缓存分片（兼容接口未必支持该参数，只对官方接口发送）
+            params["prompt_cache_key"] = hashlib.sha256(
+                f"{model}\n{stable}".encode("utf-8")
+            ).hexdigest()[:32]
+        return params
+
     def _build_system_prompt(self, source_lang: str, target_lang: str, custom_prompt: str) -> str:
         return build_translation_system_prompt(
             source_lang=source_lang,
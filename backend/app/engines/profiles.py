@@ -0,0 +1,201 @@
+"""服务端引擎配置档。
+
+把凭据与限制保存在服务端，请求只需通过 `X-Engine-Profile` 等请求头引用配置档 id：
+- 配置档在注册时即完成校验并生成 `EngineConfig`，请求期间不再解析 JSON
+- 对应的 SDK 客户端在注册时预先创建并常驻客户端池（不参与空闲回收）
+- 可为每个配置档单独设置准入限制（未设置的项沿用全局 `admission_*` 配置）
+- 配置档来自 `engine_profiles_path` 指向的 JSON 文件，或 /api/engines/profiles 接口
+- 配置档默认非公开：需带 `X-Engine-Profile-Token`（与 `engine_profiles_token` 一致）才能列出和引用；
+  `"public": true` 的配置档任何调用方都能使用，其上游费用由服务端承担
+
+JSON 文件格式（apiKey 也可用 apiKeyEnv 指定从环境变量读取；apiKeyEnv 只在配置文件中生效，
+HTTP 接口不接受，避免调用方把任意服务端环境变量作为凭据发往自己的 baseUrl）：
+
+    {"profiles": {"gpt4o": {"channel": "openai", "apiKeyEnv": "OPENAI_API_KEY", "model": "gpt-4o",
+                            "public": false, "limits": {"maxInFlight": 8, "requestsPerMinute": 500}}}}
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Any
+
+from app.config import settings
+from app.dependencies import EngineConfig, engine_config_from_dict
+from app.engines.admission import AdmissionLimits, admission
+from app.engines.client_pool import client_pool, engine_client_key
+from app.errors import ApiError
+
+_PROFILE_ID = re.compile(r"^[A-Za-z0-9_.-]{1,64}$")
+
+_LIMIT_FIELDS = {
+    "maxInFlight": "max_in_flight",
+    "requestsPerMinute": "requests_per_minute",
+    "tokensPerMinute": "tokens_per_minute",
+    "queueTimeout": "queue_timeout",
+}
+
+
+@dataclass
+class EngineProfile:
+    id: str
+    config: EngineConfig
+    limits: AdmissionLimits | None = None
+    description: str = ""
+    is_public: bool = False
+
+    def public(self) -> dict[str, Any]:
+        """对外展示的配置档信息（不含 apiKey 的任何部分）"""
+        limits = self.limits or admission.limits
+        return {
+            "id": self.id,
+            "channel": self.config.channel,
+            "baseUrl": self.config.base_url,
+            "model": self.config.model,
+            "description": self.description,
+            "public": self.is_public,
+            "apiKeyConfigured": bool(self.config.api_key),
+            "limits": {camel: getattr(limits, field) for camel, field in _LIMIT_FIELDS.items()},
+        }
+
+
+def parse_profile(profile_id: str, data: object, *, allow_env: bool = False) -> EngineProfile:
+    """校验单个配置档（格式与 X-Engine-Config 相同，另可带 limits / description / public）
+
+    allow_env 为 True（仅限服务端配置文件）时还接受 apiKeyEnv。
+    """
+    if not _PROFILE_ID.match(profile_id):
+        raise ApiError(
+            400,
+            "invalid_engine_profile_id",
+            f"无效的配置档 id：{profile_id}",
+            {"pattern": _PROFILE_ID.pattern},
+        )
+    if not isinstance(data, dict):
+        raise ApiError(400, "invalid_engine_profile", f"配置档 {profile_id} 必须是 JSON 对象")
+
+    env_name = data.get("apiKeyEnv")
+    if env_name is not None and not allow_env:
+        raise ApiError(
+            400, "engine_profile_env_not_allowed", "apiKeyEnv 只能在服务端配置文件中使用，请直接提供 apiKey"
+        )
+    if not data.get("apiKey") and isinstance(env_name, str) and env_name:
+        data = {**data, "apiKey": os.environ.get(env_name, "")}
+    config = engine_config_from_dict(data)
+
+    limits_data = data.get("limits")
+    limits: AdmissionLimits | None = None
+    if limits_data is not None:
+        if not isinstance(limits_data, dict):
+            raise ApiError(400, "invalid_engine_profile", f"配置档 {profile_id} 的 limits 必须是 JSON 对象")
+        overrides: dict[str, float] = {}
+        for camel, field in _LIMIT_FIELDS.items():
+            value = limits_data.get(camel)
+            if value is None:
+                continue
+            if isinstance(value, bool) or not isinstance(value, (int, float)) or value < 0:
+                raise ApiError(
+                    400, "invalid_engine_profile", f"配置档 {profile_id} 的 limits.{camel} 必须是非负数"
+                )
+            overrides[field] = int(value) if field == "max_in_flight" else float(value)
+        # 未指定的限制项沿用全局配置
+        limits = replace(admission.limits, **overrides)
+
+    public = data.get("public", False)
+    if not isinstance(public, bool):
+        raise ApiError(400, "invalid_engine_profile", f"配置档 {profile_id} 的 public 必须是布尔值")
+
+    description = data.get("description")
+    return EngineProfile(
+        id=profile_id,
+        config=config,
+        limits=limits,
+        description=description if isinstance(description, str) else "",
+        is_public=public,
+    )
+
+
+class ProfileRegistry:
+    """进程内的引擎配置档注册表
+
+    同一组凭据（channel, base_url, api_key）的配置档共享一个客户端与一组准入名额，
+    此时以最后注册的限制为准。
+    """
+
+    def __init__(self) -> None:
+        self._profiles: dict[str, EngineProfile] = {}
+
+    def get(self, profile_id: str) -> EngineProfile:
+        profile = self._profiles.get(profile_id)
+        if profile is None:
+            raise ApiError(404, "engine_profile_not_found", f"引擎配置档不存在：{profile_id}")
+        return profile
+
+    def resolve(self, profile_id: str, *, authorized: bool) -> EngineProfile:
+        """取调用方可以使用的配置档：非公开配置档未授权时视为不存在"""
+        profile = self._profiles.get(profile_id)
+        if profile is None or not (profile.is_public or authorized):
+            raise ApiError(404, "engine_profile_not_found", f"引擎配置档不存在：{profile_id}")
+        return profile
+
+    def list_profiles(self, *, authorized: bool = True) -> list[EngineProfile]:
+        return [p for p in self._profiles.values() if p.is_public or authorized]
+
+    def put(self, profile: EngineProfile) -> None:
+        """注册（或替换）配置档：预建并常驻客户端，设置准入限制"""
+        previous = self._profiles.get(profile.id)
+        key = client_pool.pin(profile.config)
+        admission.configure(key, profile.limits)
+        self._profiles[profile.id] = profile
+        if previous is not None:
+            self._release(previous)
+
+    def remove(self, profile_id: str) -> EngineProfile:
+        profile = self.get(profile_id)
+        del self._profiles[profile_id]
+        self._release(profile)
+        return profile
+
+    def _release(self, profile: EngineProfile) -> None:
+        """凭据不再被任何配置档使用时，取消常驻并恢复全局准入限制"""
+        key = engine_client_key(profile.config)
+        if any(engine_client_key(p.config) == key for p in self._profiles.values()):
+            return
+        client_pool.unpin(key)
+        admission.configure(key, None)
+
+    def load_file(self, path: str | Path) -> int:
+        """从 JSON 文件加载配置档（整体校验通过后才注册），返回加载数量"""
+        try:
+            data = json.loads(Path(path).read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError) as e:
+            raise ApiError(500, "engine_profiles_load_failed", f"无法读取引擎配置档文件 {path}：{e}")
+        items = data.get("profiles") if isinstance(data, dict) else None
+        if not isinstance(items, dict):
+            raise ApiError(500, "engine_profiles_load_failed", f"引擎配置档文件 {path} 缺少 profiles 对象")
+
+        profiles = [parse_profile(str(profile_id), item, allow_env=True) for profile_id, item in items.items()]
+        for profile in profiles:
+            self.put(profile)
+        return len(profiles)
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "profiles": len(self._profiles),
+            "channels": sorted({p.config.channel for p in self._profiles.values()}),
+        }
+
+
+# 全局配置档注册表
+engine_profiles = ProfileRegistry()
+
+
+def load_configured_profiles() -> int:
+    """加载 `engine_profiles_path` 指向的配置档文件（未配置时不加载）"""
+    if not settings.engine_profiles_path:
+        return 0
+    return engine_profiles.load_file(settings.engine_profiles_path)
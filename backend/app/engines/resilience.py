@@ -0,0 +1,257 @@
+"""上游调用的超时与重试策略。
+
+- 每次尝试有独立超时（流式调用则是“首个增量”的超时与增量之间的空闲超时）
+- 所有尝试共享一个总截止时间
+- 仅对可重试错误（超时、连接错误、408/409/429/5xx）重试，4xx 直接失败
+- 指数退避 + 全抖动；上游返回 Retry-After 时以其为准
+"""
+
+from __future__ import annotations
+
+import asyncio
+import email.utils
+import random
+import time
+from contextlib import contextmanager, nullcontext
+from dataclasses import asdict, dataclass
+from typing import Any, AsyncContextManager, AsyncIterator, Awaitable, Callable, Iterator, TypeVar
+
+import anthropic
+import httpx
+import openai
+
+from app.cancellation import track_upstream_call
+from app.config import settings
+from app.metrics import upstream_duration, upstream_ttft
+
+
+T = TypeVar("T")
+
+RETRYABLE_STATUS_CODES = {408, 409, 425, 429, 500, 502, 503, 504, 529}
+
+
+class UpstreamTimeoutError(TimeoutError):
+    """上游调用超时（保留超时时长，便于生成可读的错误信息）"""
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    max_attempts: int = 3
+    attempt_timeout: float = 60.0
+    total_timeout: float = 180.0
+    backoff_base: float = 0.5
+    backoff_max: float = 8.0
+
+    @classmethod
+    def from_settings(cls) -> RetryPolicy:
+        return cls(
+            max_attempts=max(1, settings.engine_max_attempts),
+            attempt_timeout=settings.engine_attempt_timeout,
+            total_timeout=settings.engine_total_timeout,
+            backoff_base=settings.engine_backoff_base,
+            backoff_max=settings.engine_backoff_max,
+        )
+
+
+@dataclass
+class RetryStats:
+    attempts: int = 0
+    retries: int = 0
+    timeouts: int = 0
+    gave_up: int = 0
+
+    def snapshot(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+# 全局重试统计
+retry_stats = RetryStats()
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """判断异常是否值得重试"""
+    if isinstance(exc, TimeoutError):
+        return True
+    should_retry = _response_header(exc, "x-should-retry")
+    if should_retry in ("true", "false"):
+        return should_retry == "true"
+    if isinstance(exc, (openai.APIConnectionError, anthropic.APIConnectionError, httpx.TransportError)):
+        return True
+    status = getattr(exc, "status_code", None)
+    if isinstance(status, int):
+        return status in RETRYABLE_STATUS_CODES or status >= 500
+    return False
+
+
+def retry_after_seconds(exc: BaseException) -> float | None:
+    """解析 Retry-After / retry-after-ms 响应头（秒数或 HTTP 日期）"""
+    value = _response_header(exc, "retry-after-ms")
+    if value:
+        try:
+            return max(0.0, float(value) / 1000)
+        except ValueError:
+            pass
+
+    value = _response_header(exc, "retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+def backoff_delay(attempt: int, policy: RetryPolicy, retry_after: float | None = None) -> float:
+    """第 attempt 次失败后的等待时间（全抖动指数退避，Retry-After 优先）"""
+    if retry_after is not None:
+        return retry_after
+    cap = min(policy.backoff_max, policy.backoff_base * (2 ** (attempt - 1)))
+    return random.uniform(0, cap)
+
+
+def _response_header(exc: BaseException, name: str) -> str | None:
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None)
+    if headers is None:
+        return None
+    value = headers.get(name)
+    return value.strip().lower() if isinstance(value, str) else None
+
+
+def _next_delay(
+    exc: Exception, attempt: int, policy: RetryPolicy, deadline: float
+) -> float | None:
+    """返回下次重试前的等待时间；不应重试时返回 None"""
+    if isinstance(exc, TimeoutError):
+        retry_stats.timeouts += 1
+    if attempt >= policy.max_attempts or not is_retryable(exc):
+        return None
+    delay = backoff_delay(attempt, policy, retry_after_seconds(exc))
+    if time.monotonic() + delay >= deadline:
+        return None
+    return delay
+
+
+def _timeout_error(exc: TimeoutError, timeout: float) -> TimeoutError:
+    if isinstance(exc, UpstreamTimeoutError) or str(exc):
+        return exc
+    return UpstreamTimeoutError(f"上游调用超时（{timeout:g}s）")
+
+
+@contextmanager
+def _observe_attempt(metric_labels: tuple[str, str] | None) -> Iterator[float]:
+    """记录一次上游尝试的耗时与结果（ok / timeout / error / cancelled）"""
+    started = time.monotonic()
+    outcome = "ok"
+    try:
+        yield started
+    except TimeoutError:
+        outcome = "timeout"
+        raise
+    except Exception:
+        outcome = "error"
+        raise
+    except BaseException:
+        outcome = "cancelled"
+        raise
+    finally:
+        if metric_labels:
+            channel, model = metric_labels
+            upstream_duration.observe(
+                time.monotonic() - started, channel=channel, model=model, outcome=outcome
+            )
+
+
+async def call_with_retry(
+    fn: Callable[[], Awaitable[T]],
+    policy: RetryPolicy | None = None,
+    admit: Callable[[], AsyncContextManager[Any]] | None = None,
+    metric_labels: tuple[str, str] | None = None,
+) -> T:
+    """按策略调用 fn（每次尝试都会重新调用 fn 生成新的请求）
+
+    admit 为准入控制（见 `app/engines/admission.py`）：每次尝试先取得名额再开始计时。
+    metric_labels 为 (channel, model)，用于记录每次尝试的上游耗时指标。
+    """
+    policy = policy or RetryPolicy.from_settings()
+    deadline = time.monotonic() + policy.total_timeout
+    attempt = 0
+    while True:
+        attempt += 1
+        retry_stats.attempts += 1
+        timeout = policy.attempt_timeout
+        try:
+            async with admit() if admit else nullcontext():
+                timeout = max(0.0, min(policy.attempt_timeout, deadline - time.monotonic()))
+                with track_upstream_call(), _observe_attempt(metric_labels):
+                    async with asyncio.timeout(timeout):
+                        return await fn()
+        except Exception as e:
+            delay = _next_delay(e, attempt, policy, deadline)
+            if delay is None:
+                retry_stats.gave_up += 1
+                if isinstance(e, TimeoutError):
+                    raise _timeout_error(e, timeout) from e
+                raise
+        retry_stats.retries += 1
+        await asyncio.sleep(delay)
+
+
+async def stream_with_retry(
+    open_stream: Callable[[], AsyncIterator[T]],
+    policy: RetryPolicy | None = None,
+    admit: Callable[[], AsyncContextManager[Any]] | None = None,
+    metric_labels: tuple[str, str] | None = None,
+) -> AsyncIterator[T]:
+    """按策略消费流式调用
+
+    只在尚未产出任何增量前重试（否则调用方会收到重复内容）；
+    首个增量受单次超时与总截止时间约束，之后相邻增量的间隔不得超过单次超时。
+    admit 取得的准入名额在整个流式尝试期间一直占用；metric_labels 同 `call_with_retry`，
+    另记录首个增量耗时。
+    """
+    policy = policy or RetryPolicy.from_settings()
+    deadline = time.monotonic() + policy.total_timeout
+    attempt = 0
+    while True:
+        attempt += 1
+        retry_stats.attempts += 1
+        started = False
+        timeout = policy.attempt_timeout
+        try:
+            async with admit() if admit else nullcontext():
+                with track_upstream_call(), _observe_attempt(metric_labels) as attempt_started:
+                    stream = open_stream()
+                    try:
+                        while True:
+                            timeout = policy.attempt_timeout
+                            if not started:
+                                timeout = max(0.0, min(timeout, deadline - time.monotonic()))
+                            try:
+                                async with asyncio.timeout(timeout):
+                                    item = await anext(stream)
+                            except StopAsyncIteration:
+                                return
+                            if not started and metric_labels:
+                                channel, model = metric_labels
+                                upstream_ttft.observe(
+                                    time.monotonic() - attempt_started, channel=channel, model=model
+                                )
+                            started = True
+                            yield item
+                    finally:
+                        await stream.aclose()
+        except Exception as e:
+            delay = None if started else _next_delay(e, attempt, policy, deadline)
+            if delay is None:
+                retry_stats.gave_up += 1
+                if isinstance(e, TimeoutError):
+                    raise _timeout_error(e, timeout) from e
+                raise
+        retry_stats.retries += 1
+        await asyncio.sleep(delay)
@@ -0,0 +1,62 @@
+import asyncio
+import unittest
+
+from app.engines.admission import AdmissionController, AdmissionLimits, AdmissionTimeoutError
+
+KEY = ("openai", "", "hash")
+
+
+class TestAdmissionController(unittest.TestCase):
+    def test_max_in_flight_queues_fifo(self):
+        async def run():
+            controller = AdmissionController(AdmissionLimits(max_in_flight=2))
+            order: list[int] = []
+            peak = 0
+
+            async def call(i: int):
+                nonlocal peak
+                async with controller.acquire(KEY):
+                    order.append(i)
+                    peak = max(peak, controller.snapshot()["in_flight"])
+                    await asyncio.sleep(0.01)
+
+            await asyncio.gather(*(call(i) for i in range(6)))
+            return order, peak, controller.snapshot()
+
+        order, peak, snapshot = asyncio.run(run())
+        self.assertEqual(order, list(range(6)))
+        self.assertEqual(peak, 2)
+        self.assertEqual(snapshot["admitted"], 6)
+        self.assertEqual(snapshot["queue_depth"], 0)
+
+    def test_token_bucket_delays_instead_of_failing(self):
+        async def run():
+            # 每分钟 600 个 token（10/s）：第二个 5 token 的请求需等待约 0.5s
+            controller = AdmissionController(AdmissionLimits(tokens_per_minute=600))
+            loop = asyncio.get_running_loop()
+            async with controller.acquire(KEY, tokens=595):
+                pass
+            started = loop.time()
+            async with controller.acquire(KEY, tokens=10):
+                return loop.time() - started
+
+        self.assertGreater(asyncio.run(run()), 0.4)
+
+    def test_queue_deadline(self):
+        async def run():
+            controller = AdmissionController(AdmissionLimits(max_in_flight=1, queue_timeout=0.05))
+            async with controller.acquire(KEY):
+                with self.assertRaises(AdmissionTimeoutError):
+                    async with controller.acquire(KEY):
+                        pass
+            async with controller.acquire(KEY):
+                pass
+            return controller.snapshot()
+
+        snapshot = asyncio.run(run())
+        self.assertEqual(snapshot["timeouts"], 1)
+        self.assertEqual(snapshot["in_flight"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+import asyncio
+import unittest
+
+from app.dependencies import EngineConfig
+from app.engines.client_pool import ClientPool, client_key
+
+
+class TestClientPoolLeases(unittest.TestCase):
+    def test_idle_sweep_skips_leased_clients(self):
+        async def run():
+            pool = ClientPool(idle_ttl=0)
+            with pool.lease_client("openai", "k1") as client:
+                self.assertEqual(pool.evict_idle(now=float("inf")), 0)
+                self.assertFalse(client._client.is_closed)
+            self.assertEqual(pool.evict_idle(now=float("inf")), 1)
+            await pool.aclose()
+            return client
+
+        client = asyncio.run(run())
+        self.assertTrue(client._client.is_closed)
+
+    def test_capacity_eviction_defers_close_until_released(self):
+        async def run():
+            pool = ClientPool(max_clients=1)
+            with pool.lease_client("openai", "k1") as leased:
+                pool.get_client("openai", "k2")
+                snapshot = pool.snapshot()
+                await asyncio.sleep(0)
+                still_open = not leased._client.is_closed
+            await asyncio.sleep(0)
+            closed_after_release = leased._client.is_closed
+            # 被淘汰后再次借出同一凭据会得到新的客户端
+            with pool.lease_client("openai", "k1") as fresh:
+                self.assertIsNot(fresh, leased)
+            await pool.aclose()
+            return snapshot, still_open, closed_after_release, pool.snapshot()
+
+        snapshot, still_open, closed_after_release, final = asyncio.run(run())
+        self.assertEqual((snapshot["clients"], snapshot["retiring"], snapshot["leased"]), (1, 1, 1))
+        self.assertTrue(still_open)
+        self.assertTrue(closed_after_release)
+        self.assertEqual(final["retiring"], 0)
+
+    def test_idle_clients_are_evicted_before_leased_ones(self):
+        async def run():
+            pool = ClientPool(max_clients=2)
+            with pool.lease_client("openai", "k1"):
+                pool.get_client("openai", "k2")
+                pool.get_client("openai", "k3")
+                keys = {key[2] for key in pool._clients}
+            await pool.aclose()
+            return keys
+
+        self.assertIn(client_key("openai", None, "k1")[2], asyncio.run(run()))
+
+    def test_only_pinned_clients_are_warmed(self):
+        async def run():
+            pool = ClientPool()
+            pinned = pool.pin(EngineConfig(api_key="k1", base_url="https://configured.example/v1", channel="openai"))
+            pool.get_client("openai", "k2", "https://caller.example/v1")
+            targets = pool.warm_targets()
+            await pool.aclose()
+            return pinned, targets
+
+        pinned, targets = asyncio.run(run())
+        self.assertEqual([(key, url) for key, url, _ in targets], [(pinned, "https://configured.example/v1/")])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import asyncio
+import unittest
+from unittest import mock
+
+from app.engines.base import TranslationResult
+from app.engines.hedging import HedgedEngine
+
+
+class _SleepyEngine:
+    engine_type = "llm"
+    supported_languages: list[str] = []
+    default_model = "m"
+
+    def __init__(self, id: str, delay: float):
+        self.id = self.name = id
+        self.delay = delay
+        self.cancelled = False
+
+    async def translate(self, text, source_lang, target_lang, options=None):
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        return TranslationResult(text=self.id, source_lang=source_lang, target_lang=target_lang)
+
+    async def translate_stream(self, text, source_lang, target_lang, options=None):
+        await asyncio.sleep(self.delay)
+        for delta in (self.id, "!"):
+            yield delta
+
+
+@mock.patch("app.engines.hedging.settings.hedging_default_delay", 0.02)
+class TestHedgedEngine(unittest.TestCase):
+    def test_fast_primary_is_not_hedged(self):
+        fallback = _SleepyEngine("fallback", 0.0)
+        engine = HedgedEngine(_SleepyEngine("primary", 0.0), fallback)
+        result = asyncio.run(engine.translate("hi", "en", "zh"))
+        self.assertEqual(result.text, "primary")
+
+    def test_slow_primary_loses_and_is_cancelled(self):
+        primary = _SleepyEngine("primary", 1.0)
+        engine = HedgedEngine(primary, _SleepyEngine("fallback", 0.0))
+        result = asyncio.run(engine.translate("hi", "en", "zh"))
+        self.assertEqual(result.text, "fallback")
+        self.assertTrue(primary.cancelled)
+
+    def test_stream_follows_first_delta(self):
+        async def run():
+            engine = HedgedEngine(_SleepyEngine("primary", 1.0), _SleepyEngine("fallback", 0.0))
+            return [d async for d in engine.translate_stream("hi", "en", "zh")]
+
+        self.assertEqual(asyncio.run(run()), ["fallback", "!"])
+
+
+if __name__ == "__main__":
+    unittest.main()
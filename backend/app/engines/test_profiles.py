@@ -0,0 +1,138 @@
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.dependencies import get_engine_config, get_engine_configs
+from app.engines.admission import admission
+from app.engines.client_pool import client_pool, engine_client_key
+from app.engines.profiles import ProfileRegistry, parse_profile
+from app.errors import ApiError
+
+
+class TestEngineProfiles(unittest.TestCase):
+    def test_parse_profile_inherits_global_limits(self):
+        profile = parse_profile(
+            "gpt",
+            {"apiKey": "sk-test", "channel": "openai", "model": "gpt-4o", "limits": {"requestsPerMinute": 60}},
+        )
+        self.assertEqual(profile.config.model, "gpt-4o")
+        self.assertEqual(profile.limits.requests_per_minute, 60)
+        self.assertEqual(profile.limits.max_in_flight, admission.limits.max_in_flight)
+        self.assertNotIn("test", json.dumps(profile.public()))
+
+        with self.assertRaises(ApiError):
+            parse_profile("bad id", {"apiKey": "sk-test"})
+        with self.assertRaises(ApiError):
+            parse_profile("gpt", {"apiKey": "sk-test", "limits": {"maxInFlight": -1}})
+
+    def test_registry_pins_client_and_configures_limits(self):
+        registry = ProfileRegistry()
+        client_pool.evict_idle(now=float("inf"))
+        with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as f:
+            json.dump({"profiles": {"claude": {"apiKeyEnv": "TEST_PROFILE_KEY", "channel": "anthropic",
+                                               "limits": {"maxInFlight": 3}}}}, f)
+        os.environ["TEST_PROFILE_KEY"] = "sk-ant-test"
+        try:
+            self.assertEqual(registry.load_file(f.name), 1)
+        finally:
+            os.unlink(f.name)
+            del os.environ["TEST_PROFILE_KEY"]
+
+        key = engine_client_key(registry.get("claude").config)
+        try:
+            self.assertEqual(admission.limits_for(key).max_in_flight, 3)
+            self.assertEqual(client_pool.evict_idle(now=float("inf")), 0)
+        finally:
+            registry.remove("claude")
+        self.assertEqual(admission.limits_for(key), admission.limits)
+        self.assertEqual(client_pool.evict_idle(now=float("inf")), 1)
+
+    def test_profile_headers_take_precedence(self):
+        from app.engines.profiles import engine_profiles
+
+        engine_profiles.put(parse_profile("p1", {"apiKey": "sk-one", "model": "m1", "public": True}))
+        try:
+            configs = asyncio.run(
+                get_engine_configs(x_engine_configs="not json", x_engine_profiles="p1, p1", x_engine_profile_token=None)
+            )
+            self.assertEqual([c.model for c in configs], ["m1", "m1"])
+            with self.assertRaises(ApiError):
+                asyncio.run(
+                    get_engine_configs(x_engine_configs=None, x_engine_profiles="missing", x_engine_profile_token=None)
+                )
+        finally:
+            engine_profiles.remove("p1")
+
+    def test_private_profiles_require_profile_token(self):
+        from app.engines.profiles import engine_profiles
+        from app.main import app
+
+        engine_profiles.put(parse_profile("open", {"apiKey": "sk-open", "public": True}))
+        engine_profiles.put(parse_profile("private", {"apiKey": "sk-private", "model": "m-private"}))
+        self.addCleanup(engine_profiles.remove, "open")
+        self.addCleanup(engine_profiles.remove, "private")
+
+        def resolve(token):
+            return asyncio.run(
+                get_engine_config(x_engine_config=None, x_engine_profile="private", x_engine_profile_token=token)
+            )
+
+        with TestClient(app) as client:
+            listed = client.get("/api/engines/profiles").json()["profiles"]
+            self.assertEqual([p["id"] for p in listed], ["open"])
+            self.assertEqual(client.get("/api/engines/profiles/private").status_code, 404)
+            # 未配置令牌时非公开配置档无法引用
+            with self.assertRaises(ApiError) as ctx:
+                resolve("anything")
+            self.assertEqual(ctx.exception.status_code, 404)
+
+            with mock.patch.object(settings, "engine_profiles_token", "profile-secret"):
+                with self.assertRaises(ApiError):
+                    resolve("wrong")
+                self.assertEqual(resolve("profile-secret").model, "m-private")
+                headers = {"X-Engine-Profile-Token": "profile-secret"}
+                listed = client.get("/api/engines/profiles", headers=headers).json()["profiles"]
+                self.assertEqual({p["id"] for p in listed}, {"open", "private"})
+                self.assertEqual(client.get("/api/engines/profiles/private", headers=headers).status_code, 200)
+
+        with self.assertRaises(ApiError):
+            parse_profile("x", {"apiKey": "sk", "public": "yes"})
+
+    def test_http_api_requires_admin_token_and_rejects_api_key_env(self):
+        from app.main import app
+
+        os.environ["TEST_PROFILE_SECRET"] = "supersecretvalue1234"
+        self.addCleanup(os.environ.pop, "TEST_PROFILE_SECRET")
+        body = {"channel": "openai", "apiKeyEnv": "TEST_PROFILE_SECRET", "baseUrl": "http://attacker.example/v1"}
+        with self.assertRaises(ApiError) as ctx:
+            parse_profile("x", body)
+        self.assertEqual(ctx.exception.code, "engine_profile_env_not_allowed")
+
+        with TestClient(app) as client:
+            url = "/api/engines/profiles/x"
+            # 默认关闭：HTTP 接口只读
+            self.assertEqual(client.put(url, json=body).status_code, 403)
+            with mock.patch.object(settings, "engine_profiles_api_enabled", True):
+                self.assertEqual(client.put(url, json=body).status_code, 403)
+                with mock.patch.object(settings, "admin_token", "admin-secret"):
+                    self.assertEqual(client.put(url, json=body, headers={"X-Admin-Token": "wrong"}).status_code, 401)
+                    headers = {"X-Admin-Token": "admin-secret"}
+                    rejected = client.put(url, json=body, headers=headers)
+                    self.assertEqual(rejected.status_code, 400)
+                    self.assertEqual(rejected.json()["error"]["code"], "engine_profile_env_not_allowed")
+                    self.assertEqual(client.get(url).status_code, 404)
+
+                    created = client.put(url, json={"apiKey": "sk-direct-1234", "channel": "openai"}, headers=headers)
+                    self.assertEqual(created.status_code, 200)
+                    self.assertNotIn("1234", created.text)
+                    self.assertEqual(client.delete(url, headers=headers).status_code, 200)
+
+
+if __name__ == "__main__":
+    unittest.main()
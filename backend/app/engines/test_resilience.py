@@ -0,0 +1,160 @@
+import asyncio
+import email.utils
+import time
+import unittest
+
+import httpx
+import openai
+
+from app.engines.client_pool import ClientPool
+from app.engines.resilience import (
+    RetryPolicy,
+    UpstreamTimeoutError,
+    call_with_retry,
+    retry_after_seconds,
+    stream_with_retry,
+)
+
+_REQUEST = httpx.Request("POST", "https://upstream.test/v1/chat/completions")
+FAST = RetryPolicy(max_attempts=3, attempt_timeout=1.0, total_timeout=5.0, backoff_base=0.001, backoff_max=0.001)
+
+
+def status_error(status: int, headers: dict[str, str] | None = None) -> openai.APIStatusError:
+    response = httpx.Response(status, headers=headers or {}, request=_REQUEST)
+    return openai.APIStatusError(f"status {status}", response=response, body=None)
+
+
+def connection_error() -> openai.APIConnectionError:
+    return openai.APIConnectionError(request=_REQUEST)
+
+
+class TestRetryAfter(unittest.TestCase):
+    def test_seconds_milliseconds_and_http_date(self):
+        self.assertEqual(retry_after_seconds(status_error(429, {"retry-after": "7"})), 7.0)
+        self.assertEqual(retry_after_seconds(status_error(429, {"retry-after-ms": "1500", "retry-after": "9"})), 1.5)
+        date = email.utils.formatdate(time.time() + 30, usegmt=True)
+        self.assertAlmostEqual(retry_after_seconds(status_error(503, {"retry-after": date})), 30, delta=2)
+        past = email.utils.formatdate(time.time() - 30, usegmt=True)
+        self.assertEqual(retry_after_seconds(status_error(503, {"retry-after": past})), 0.0)
+        self.assertIsNone(retry_after_seconds(status_error(503, {"retry-after": "soon"})))
+        self.assertIsNone(retry_after_seconds(status_error(503)))
+        self.assertIsNone(retry_after_seconds(ValueError()))
+
+
+class TestCallWithRetry(unittest.TestCase):
+    def run_calls(self, errors, policy=FAST):
+        attempts = 0
+
+        async def fn():
+            nonlocal attempts
+            attempts += 1
+            if attempts <= len(errors):
+                raise errors[attempts - 1]
+            return "ok"
+
+        async def run():
+            try:
+                return await call_with_retry(fn, policy)
+            except Exception as e:
+                return e
+
+        return asyncio.run(run()), attempts
+
+    def test_retries_retryable_errors(self):
+        self.assertEqual(self.run_calls([status_error(500), connection_error()]), ("ok", 3))
+
+    def test_client_errors_are_not_retried(self):
+        result, attempts = self.run_calls([status_error(400)])
+        self.assertIsInstance(result, openai.APIStatusError)
+        self.assertEqual(attempts, 1)
+
+    def test_gives_up_after_max_attempts(self):
+        result, attempts = self.run_calls([status_error(503)] * 5)
+        self.assertEqual(result.status_code, 503)
+        self.assertEqual(attempts, 3)
+
+    def test_retry_after_beyond_deadline_is_not_awaited(self):
+        policy = RetryPolicy(max_attempts=3, attempt_timeout=1.0, total_timeout=1.0)
+        started = time.monotonic()
+        result, attempts = self.run_calls([status_error(429, {"retry-after": "30"})], policy)
+        self.assertEqual((result.status_code, attempts), (429, 1))
+        self.assertLess(time.monotonic() - started, 0.5)
+
+    def test_timeout_maps_to_upstream_timeout_error(self):
+        async def hang():
+            await asyncio.sleep(10)
+
+        async def run():
+            policy = RetryPolicy(max_attempts=2, attempt_timeout=0.02, total_timeout=5.0, backoff_base=0.001)
+            with self.assertRaises(UpstreamTimeoutError) as ctx:
+                await call_with_retry(hang, policy)
+            return str(ctx.exception)
+
+        self.assertIn("0.02s", asyncio.run(run()))
+
+
+class TestStreamWithRetry(unittest.TestCase):
+    def consume(self, factories, policy=FAST):
+        opened = 0
+
+        def open_stream():
+            nonlocal opened
+            opened += 1
+            return factories[min(opened, len(factories)) - 1]()
+
+        async def run():
+            items = []
+            try:
+                async for item in stream_with_retry(open_stream, policy):
+                    items.append(item)
+            except Exception as e:
+                return items, e, opened
+            return items, None, opened
+
+        return asyncio.run(run())
+
+    def test_retries_before_first_delta(self):
+        async def fail():
+            raise connection_error()
+            yield
+
+        async def ok():
+            yield "a"
+            yield "b"
+
+        self.assertEqual(self.consume([fail, ok]), (["a", "b"], None, 2))
+
+    def test_no_retry_after_first_delta(self):
+        async def partial():
+            yield "a"
+            raise connection_error()
+
+        items, error, opened = self.consume([partial])
+        self.assertEqual((items, opened), (["a"], 1))
+        self.assertIsInstance(error, openai.APIConnectionError)
+
+    def test_idle_timeout_between_deltas(self):
+        async def stall():
+            yield "a"
+            await asyncio.sleep(10)
+            yield "b"
+
+        policy = RetryPolicy(max_attempts=3, attempt_timeout=0.02, total_timeout=5.0)
+        items, error, opened = self.consume([stall], policy)
+        self.assertEqual((items, opened), (["a"], 1))
+        self.assertIsInstance(error, UpstreamTimeoutError)
+
+
+class TestSdkRetriesDisabled(unittest.TestCase):
+    def test_pooled_clients_have_no_sdk_retries(self):
+        async def run():
+            pool = ClientPool()
+            clients = [pool.get_client("openai", "k"), pool.get_client("anthropic", "k")]
+            await pool.aclose()
+            return [client.max_retries for client in clients]
+
+        self.assertEqual(asyncio.run(run()), [0, 0])
+
+
+if __name__ == "__main__":
+    unittest.main()
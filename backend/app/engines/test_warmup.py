@@ -0,0 +1,66 @@
+import asyncio
+import unittest
+
+import httpx
+
+from app.engines.warmup import ConnectionWarmer
+
+
+class _Pool:
+    def __init__(self, targets):
+        self.targets = targets
+
+    def warm_targets(self):
+        return self.targets
+
+
+def _client(handler) -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+class TestConnectionWarmer(unittest.TestCase):
+    def test_any_http_status_counts_as_warm(self):
+        async def run():
+            seen: list[str] = []
+
+            def handler(request: httpx.Request) -> httpx.Response:
+                seen.append(request.method)
+                return httpx.Response(404)
+
+            def refuse(request: httpx.Request) -> httpx.Response:
+                raise httpx.ConnectError("refused", request=request)
+
+            pool = _Pool([
+                (("openai", "https://a", "h1"), "https://a/v1/", _client(handler)),
+                (("anthropic", "https://b", "h2"), "https://b", _client(refuse)),
+            ])
+            warmer = ConnectionWarmer(pool, connections=3, interval=0)
+            self.assertFalse(warmer.ready)
+            await warmer.warm_once()
+            return seen, warmer.snapshot()
+
+        seen, snapshot = asyncio.run(run())
+        self.assertEqual(seen, ["HEAD"] * 3)
+        self.assertTrue(snapshot["ready"])
+        ok, failed = snapshot["targets"]
+        self.assertEqual((ok["ok"], ok["connections"]), (True, 3))
+        self.assertEqual((failed["ok"], failed["failures"]), (False, 1))
+        self.assertIn("ConnectError", failed["error"])
+
+    def test_drops_targets_no_longer_pooled(self):
+        async def run():
+            client = _client(lambda request: httpx.Response(200))
+            pool = _Pool([(("openai", "https://a", "h1"), "https://a/v1/", client)])
+            warmer = ConnectionWarmer(pool, interval=0)
+            await warmer.warm_once()
+            pool.targets = []
+            await warmer.warm_once()
+            return warmer.snapshot()
+
+        snapshot = asyncio.run(run())
+        self.assertEqual(snapshot["rounds"], 2)
+        self.assertEqual(snapshot["targets"], [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+"""上游调用的 token 用量（含 provider 侧提示词缓存的读写量）"""
+
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass
+from typing import Any
+
+
+@dataclass
+class TokenUsage:
+    """一次（或多次累加的）调用用量
+
+    - input_tokens：未命中缓存的输入 token（OpenAI 的 prompt_tokens 已扣除 cached_tokens）
+    - cache_read_tokens：命中 provider 提示词缓存的输入 token
+    - cache_write_tokens：写入提示词缓存的输入 token（仅 Anthropic 上报）
+    """
+
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cache_read_tokens: int = 0
+    cache_write_tokens: int = 0
+
+    def add(self, other: TokenUsage | None) -> None:
+        if other is None:
+            return
+        self.input_tokens += other.input_tokens
+        self.output_tokens += other.output_tokens
+        self.cache_read_tokens += other.cache_read_tokens
+        self.cache_write_tokens += other.cache_write_tokens
+
+    @classmethod
+    def from_openai(cls, usage: Any) -> TokenUsage | None:
+        if usage is None:
+            return None
+        details = getattr(usage, "prompt_tokens_details", None)
+        cached = getattr(details, "cached_tokens", None) or 0
+        return cls(
+            input_tokens=(usage.prompt_tokens or 0) - cached,
+            output_tokens=usage.completion_tokens or 0,
+            cache_read_tokens=cached,
+        )
+
+    @classmethod
+    def from_anthropic(cls, usage: Any) -> TokenUsage | None:
+        if usage is None:
+            return None
+        return cls(
+            input_tokens=getattr(usage, "input_tokens", None) or 0,
+            output_tokens=getattr(usage, "output_tokens", None) or 0,
+            cache_read_tokens=getattr(usage, "cache_read_input_tokens", None) or 0,
+            cache_write_tokens=getattr(usage, "cache_creation_input_tokens", None) or 0,
+        )
+
+
+class UsageStats:
+    """按渠道累计的用量统计"""
+
+    def __init__(self):
+        self._calls: dict[str, int] = {}
+        self._usage: dict[str, TokenUsage] = {}
+
+    def record(self, channel: str, usage: TokenUsage | None) -> None:
+        if usage is None:
+            return
+        self._calls[channel] = self._calls.get(channel, 0) + 1
+        self._usage.setdefault(channel, TokenUsage()).add(usage)
+
+    def snapshot(self) -> dict[str, Any]:
+        result: dict[str, Any] = {}
+        for channel, usage in self._usage.items():
+            prompt = usage.input_tokens + usage.cache_read_tokens + usage.cache_write_tokens
+            result[channel] = {
+                "calls": self._calls[channel],
+                **asdict(usage),
+                "cache_hit_ratio": usage.cache_read_tokens / prompt if prompt else 0.0,
+            }
+        return result
+
+
+# 全局用量统计
+usage_stats = UsageStats()
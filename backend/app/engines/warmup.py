@@ -0,0 +1,151 @@
+"""上游连接预热。
+
+部署后或空闲一段时间后，首批请求除模型耗时外还要付出 DNS、TCP 与 TLS 建连的代价。
+预热任务在应用启动时、以及之后每隔 `warmup_interval` 秒，对服务端引擎配置档预建的常驻客户端
+并发发出 `warmup_connections` 个 HEAD 请求（调用方通过 X-Engine-Config 临时指定的 base_url 不预热）：
+- 只关心连接是否建立，任何 HTTP 状态码都算成功（不携带凭据，不消耗 token）
+- 请求走客户端自己的 httpx 连接池，建立的连接留在池中供后续调用复用
+- 周期性执行即 keep-alive ping，使连接不因 `keepalive_expiry` 到期而被关闭
+- 预热不更新客户端的 last_used，不影响空闲回收
+
+首轮预热结束后 GET /ready 返回 200，各目标的结果与耗时一并给出。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import asdict, dataclass
+from typing import Any
+
+import httpx
+
+from app.config import settings
+from app.engines.client_pool import ClientKey, ClientPool, client_pool
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class WarmupTarget:
+    channel: str
+    base_url: str
+    ok: bool = False
+    connections: int = 0
+    latency: float = 0.0
+    error: str | None = None
+    checked_at: float = 0.0
+    runs: int = 0
+    failures: int = 0
+
+
+class ConnectionWarmer:
+    """启动预热 + 周期性 keep-alive"""
+
+    def __init__(
+        self,
+        pool: ClientPool,
+        *,
+        enabled: bool = True,
+        connections: int = 2,
+        interval: float = 20.0,
+        timeout: float = 5.0,
+    ):
+        self._pool = pool
+        self.enabled = enabled
+        self._connections = max(1, connections)
+        self._interval = interval
+        self._timeout = timeout
+        self._targets: dict[ClientKey, WarmupTarget] = {}
+        self._task: asyncio.Task | None = None
+        self.rounds = 0
+        self.last_round_seconds = 0.0
+
+    @property
+    def ready(self) -> bool:
+        return not self.enabled or self.rounds > 0
+
+    async def warm_once(self) -> None:
+        """对池中所有常驻客户端预热一轮"""
+        started = time.perf_counter()
+        targets = self._pool.warm_targets()
+        live = {key for key, _, _ in targets}
+        for stale in [key for key in self._targets if key not in live]:
+            del self._targets[stale]
+        await asyncio.gather(*(self._warm(key, url, client) for key, url, client in targets))
+        self.rounds += 1
+        self.last_round_seconds = time.perf_counter() - started
+
+    async def _warm(self, key: ClientKey, base_url: str, http_client: httpx.AsyncClient) -> None:
+        target = self._targets.get(key)
+        if target is None:
+            target = self._targets[key] = WarmupTarget(channel=key[0], base_url=base_url)
+
+        started = time.perf_counter()
+        try:
+            async with asyncio.timeout(self._timeout):
+                results = await asyncio.gather(
+                    *(http_client.head(base_url) for _ in range(self._connections)),
+                    return_exceptions=True,
+                )
+        except TimeoutError:
+            results = [TimeoutError(f"预热超时（{self._timeout:g}s）")]
+        errors = [r for r in results if isinstance(r, BaseException)]
+
+        target.runs += 1
+        target.latency = time.perf_counter() - started
+        target.checked_at = time.time()
+        target.connections = len(results) - len(errors)
+        target.ok = target.connections > 0
+        target.error = None if target.ok else _describe(errors[0])
+        if not target.ok:
+            target.failures += 1
+            logger.warning("upstream warm-up failed for %s: %s", base_url, target.error)
+
+    def start(self) -> None:
+        """启动预热任务（需在事件循环内调用）：立即预热一轮，随后按间隔保持连接"""
+        if self.enabled and (self._task is None or self._task.done()):
+            self._task = asyncio.get_running_loop().create_task(self._run_forever())
+
+    async def _run_forever(self) -> None:
+        while True:
+            try:
+                await self.warm_once()
+            except Exception:
+                logger.exception("upstream warm-up round failed")
+            if self._interval <= 0:
+                return
+            await asyncio.sleep(self._interval)
+
+    async def aclose(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "ready": self.ready,
+            "rounds": self.rounds,
+            "last_round_seconds": self.last_round_seconds,
+            "targets": [asdict(t) for t in self._targets.values()],
+        }
+
+
+def _describe(error: BaseException) -> str:
+    return f"{type(error).__name__}: {error}" if str(error) else type(error).__name__
+
+
+# 全局连接预热器
+connection_warmer = ConnectionWarmer(
+    client_pool,
+    enabled=settings.warmup_enabled,
+    connections=settings.warmup_connections,
+    interval=settings.warmup_interval,
+    timeout=settings.warmup_timeout,
+)
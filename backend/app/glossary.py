@@ -0,0 +1,359 @@
+"""术语表（glossary）。
+
+加载 CSV / TBX 术语库，构建 Aho-Corasick 自动机做多模式串匹配：
+- 请求时只找出原文中实际出现的术语注入 system prompt，而不是整张术语表
+- 匹配耗时与原文长度成正比，与术语数量无关（10 万条术语同样适用）
+- 不区分大小写；以字母/数字开头或结尾的术语要求词边界（`cat` 不匹配 `category`），CJK 术语不要求
+- 重叠时取最左、最长的术语
+
+术语表来自 `glossary_dir` 目录下的 *.csv / *.tbx（文件名即 id），或 PUT /api/glossaries/{id}；
+Spec 蓝图通过 `techniques.useTerminology` + `terminologySource`、Easy 通过 `glossary` 字段引用。
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import logging
+import re
+import xml.etree.ElementTree as ET
+from collections import deque
+from dataclasses import dataclass
+from itertools import chain
+from pathlib import Path
+from typing import Any, Iterator
+
+from app.config import settings
+from app.errors import ApiError
+
+logger = logging.getLogger(__name__)
+
+_GLOSSARY_ID = re.compile(r"^[A-Za-z0-9_.-]{1,64}$")
+_XML_LANG = "{http://www.w3.org/XML/1998/namespace}lang"
+
+_CSV_SOURCE = {"source", "src", "term", "source_term", "原文", "术语"}
+_CSV_TARGET = {"target", "tgt", "translation", "target_term", "译文", "译名"}
+_CSV_NOTE = {"note", "notes", "comment", "description", "备注", "说明"}
+
+
+@dataclass(frozen=True)
+class GlossaryTerm:
+    source: str
+    target: str
+    note: str = ""
+
+
+class TermMatcher:
+    """Aho-Corasick 自动机
+
+    转移表是单个 dict，键为 `(状态 << 21) | 码位`，避免每个状态一个 dict 的内存开销。
+    """
+
+    def __init__(self, patterns: list[str]):
+        self._goto: dict[int, int] = {}
+        self._fail = [0]
+        self._pattern = [-1]  # 在该状态结束的模式串下标
+        self._output = [0]  # 失配链上最近的、有模式串结束的状态（0 表示没有）
+        self._lengths = [len(p) for p in patterns]
+        edges: list[list[tuple[int, int]]] = [[]]
+
+        for index, pattern in enumerate(patterns):
+            state = 0
+            for ch in pattern:
+                key = (state << 21) | ord(ch)
+                child = self._goto.get(key)
+                if child is None:
+                    child = self._goto[key] = len(self._fail)
+                    self._fail.append(0)
+                    self._pattern.append(-1)
+                    self._output.append(0)
+                    edges.append([])
+                    edges[state].append((ord(ch), child))
+                state = child
+            if state:
+                self._pattern[state] = index
+
+        queue = deque(child for _, child in edges[0])
+        while queue:
+            state = queue.popleft()
+            for code, child in edges[state]:
+                queue.append(child)
+                fallback = self._fail[state]
+                while fallback and ((fallback << 21) | code) not in self._goto:
+                    fallback = self._fail[fallback]
+                target = self._goto.get((fallback << 21) | code, 0)
+                self._fail[child] = target
+                self._output[child] = target if self._pattern[target] >= 0 else self._output[target]
+
+    @property
+    def states(self) -> int:
+        return len(self._fail)
+
+    def iter_matches(self, text: str) -> Iterator[tuple[int, int]]:
+        """产出所有命中 (起始下标, 模式串下标)，可能重叠"""
+        goto, fail, pattern, output, lengths = self._goto, self._fail, self._pattern, self._output, self._lengths
+        state = 0
+        for end, ch in enumerate(text, 1):
+            code = ord(ch)
+            while True:
+                child = goto.get((state << 21) | code)
+                if child is not None:
+                    state = child
+                    break
+                if not state:
+                    break
+                state = fail[state]
+            hit = state if pattern[state] >= 0 else output[state]
+            while hit:
+                index = pattern[hit]
+                yield end - lengths[index], index
+                hit = output[hit]
+
+
+def _fold(text: str) -> str:
+    """匹配用的大小写折叠（保持长度不变，下标与原文一一对应）"""
+    lowered = text.lower()
+    if len(lowered) == len(text):
+        return lowered
+    return "".join(ch.lower()[:1] or ch for ch in text)
+
+
+def _is_word_char(ch: str) -> bool:
+    """需要词边界的字符：字母与数字（CJK 等表意文字除外）"""
+    return ch.isalnum() and ch < "⺀"
+
+
+class Glossary:
+    """一张双语术语表"""
+
+    def __init__(
+        self,
+        glossary_id: str,
+        terms: list[GlossaryTerm],
+        *,
+        source_lang: str | None = None,
+        target_lang: str | None = None,
+    ):
+        self.id = glossary_id
+        self.source_lang = source_lang
+        self.target_lang = target_lang
+        # 同一原文术语出现多次时以后出现的为准
+        unique: dict[str, GlossaryTerm] = {}
+        for term in terms:
+            key = _fold(term.source.strip())
+            if key and term.target.strip():
+                unique[key] = term
+        self._terms = list(unique.values())
+        self._matcher = TermMatcher(list(unique))
+
+    def __len__(self) -> int:
+        return len(self._terms)
+
+    def find(self, text: str, *, limit: int | None = None) -> list[GlossaryTerm]:
+        """找出原文中出现的术语（按首次出现的顺序去重，至多 limit 条）"""
+        folded = _fold(text)
+        candidates: list[tuple[int, int, int]] = []
+        for start, index in self._matcher.iter_matches(folded):
+            end = start + self._matcher._lengths[index]
+            if _is_word_char(folded[start]) and start > 0 and _is_word_char(folded[start - 1]):
+                continue
+            if _is_word_char(folded[end - 1]) and end < len(folded) and _is_word_char(folded[end]):
+                continue
+            candidates.append((start, -end, index))
+
+        found: dict[int, GlossaryTerm] = {}
+        covered = 0
+        for start, neg_end, index in sorted(candidates):
+            if start < covered:
+                continue
+            covered = -neg_end
+            if index not in found:
+                found[index] = self._terms[index]
+                if limit is not None and len(found) >= limit:
+                    break
+        return list(found.values())
+
+    def check_languages(self, source_lang: str, target_lang: str) -> None:
+        """校验请求的语言对与术语表一致（按主语言子标签比较）
+
+        术语表未标注的一侧、以及请求源语言为 auto 时不校验；不一致时抛出 400。
+        """
+        source_ok = not self.source_lang or source_lang == "auto" or _same_language(source_lang, self.source_lang)
+        target_ok = not self.target_lang or _same_language(target_lang, self.target_lang)
+        if not (source_ok and target_ok):
+            raise ApiError(
+                400,
+                "glossary_language_mismatch",
+                f"术语表 {self.id} 的语言对与请求不一致",
+                {
+                    "glossary": {"source_lang": self.source_lang, "target_lang": self.target_lang},
+                    "request": {"source_lang": source_lang, "target_lang": target_lang},
+                },
+            )
+
+    def info(self) -> dict[str, Any]:
+        return {
+            "id": self.id,
+            "terms": len(self._terms),
+            "source_lang": self.source_lang,
+            "target_lang": self.target_lang,
+        }
+
+
+def parse_csv(content: str) -> list[GlossaryTerm]:
+    """解析 CSV 术语表：有表头时按列名（source/target/note 等）取列，否则依次为原文、译文、备注"""
+    rows = csv.reader(io.StringIO(content.lstrip("﻿")))
+    first = next(rows, None)
+    if first is None:
+        return []
+
+    header = [cell.strip().lower() for cell in first]
+    source_col = next((i for i, name in enumerate(header) if name in _CSV_SOURCE), None)
+    target_col = next((i for i, name in enumerate(header) if name in _CSV_TARGET), None)
+    if source_col is None or target_col is None:
+        source_col, target_col, note_col = 0, 1, 2
+        data = chain([first], rows)
+    else:
+        note_col = next((i for i, name in enumerate(header) if name in _CSV_NOTE), None)
+        data = rows
+
+    terms: list[GlossaryTerm] = []
+    for row in data:
+        if len(row) <= max(source_col, target_col):
+            continue
+        note = row[note_col].strip() if note_col is not None and note_col < len(row) else ""
+        terms.append(GlossaryTerm(row[source_col].strip(), row[target_col].strip(), note))
+    return terms
+
+
+def parse_tbx(
+    content: bytes, *, source_lang: str | None = None, target_lang: str | None = None
+) -> tuple[list[GlossaryTerm], str | None, str | None]:
+    """流式解析 TBX（termEntry/langSet 或 TBX v3 的 conceptEntry/langSec）
+
+    未指定语言时，以第一个条目的前两个语言作为原文/译文语言。
+    同一条目中原文语言的每个同义术语都对应译文语言的首选术语。
+    """
+    terms: list[GlossaryTerm] = []
+    try:
+        for _, element in ET.iterparse(io.BytesIO(content), events=("end",)):
+            if _local(element.tag) not in {"termEntry", "conceptEntry"}:
+                continue
+            languages: list[tuple[str, list[str]]] = []
+            note = ""
+            for child in element.iter():
+                name = _local(child.tag)
+                if name in {"langSet", "langSec"}:
+                    words = [
+                        t.text.strip() for t in child.iter() if _local(t.tag) == "term" and t.text and t.text.strip()
+                    ]
+                    if words:
+                        languages.append((child.get(_XML_LANG) or child.get("lang") or "", words))
+                elif name in {"descrip", "note", "definition"} and not note and child.text:
+                    note = child.text.strip()
+            element.clear()
+
+            if source_lang is None and target_lang is None and len(languages) >= 2:
+                source_lang, target_lang = languages[0][0], languages[1][0]
+            sources = next((words for lang, words in languages if _same_language(lang, source_lang)), [])
+            targets = next((words for lang, words in languages if _same_language(lang, target_lang)), [])
+            if targets:
+                terms.extend(GlossaryTerm(source, targets[0], note) for source in sources)
+    except ET.ParseError as e:
+        raise ApiError(400, "invalid_glossary", f"TBX 解析失败：{e}")
+    return terms, source_lang, target_lang
+
+
+def _local(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1] if isinstance(tag, str) else ""
+
+
+def _same_language(lang: str, expected: str | None) -> bool:
+    """按主语言子标签比较（en 与 en-US 视为相同）"""
+    if not expected:
+        return False
+    return re.split(r"[-_]", lang.lower())[0] == re.split(r"[-_]", expected.lower())[0]
+
+
+def build_glossary(
+    glossary_id: str,
+    content: bytes,
+    *,
+    format: str,
+    source_lang: str | None = None,
+    target_lang: str | None = None,
+) -> Glossary:
+    """由文件内容构建术语表（CPU 密集，请求中调用时应放到线程池）"""
+    if not _GLOSSARY_ID.match(glossary_id):
+        raise ApiError(
+            400, "invalid_glossary_id", f"无效的术语表 id：{glossary_id}", {"pattern": _GLOSSARY_ID.pattern}
+        )
+    if format == "csv":
+        try:
+            terms = parse_csv(content.decode("utf-8"))
+        except UnicodeDecodeError as e:
+            raise ApiError(400, "invalid_glossary", f"CSV 术语表必须是 UTF-8 编码：{e}")
+    elif format == "tbx":
+        terms, source_lang, target_lang = parse_tbx(content, source_lang=source_lang, target_lang=target_lang)
+    else:
+        raise ApiError(400, "unsupported_glossary_format", f"不支持的术语表格式：{format}", {"supported": ["csv", "tbx"]})
+    return Glossary(glossary_id, terms, source_lang=source_lang, target_lang=target_lang)
+
+
+class GlossaryRegistry:
+    """进程内的术语表注册表"""
+
+    def __init__(self) -> None:
+        self._glossaries: dict[str, Glossary] = {}
+
+    def get(self, glossary_id: str) -> Glossary:
+        glossary = self._glossaries.get(glossary_id)
+        if glossary is None:
+            raise ApiError(404, "glossary_not_found", f"术语表不存在：{glossary_id}")
+        return glossary
+
+    def resolve(self, glossary_id: str, *, source_lang: str, target_lang: str) -> Glossary:
+        """获取请求引用的术语表，并校验其语言对与请求一致"""
+        glossary = self.get(glossary_id)
+        glossary.check_languages(source_lang, target_lang)
+        return glossary
+
+    def put(self, glossary: Glossary) -> None:
+        self._glossaries[glossary.id] = glossary
+
+    def remove(self, glossary_id: str) -> None:
+        self.get(glossary_id)
+        del self._glossaries[glossary_id]
+
+    def list_glossaries(self) -> list[Glossary]:
+        return list(self._glossaries.values())
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "glossaries": len(self._glossaries),
+            "terms": sum(len(g) for g in self._glossaries.values()),
+        }
+
+    def load_dir(self, path: str | Path) -> int:
+        """加载目录下的 *.csv / *.tbx（文件名即 id），返回加载数量"""
+        loaded = 0
+        for file in sorted(Path(path).iterdir()):
+            format = file.suffix.lower().lstrip(".")
+            if format not in {"csv", "tbx"}:
+                continue
+            glossary = build_glossary(file.stem, file.read_bytes(), format=format)
+            self.put(glossary)
+            logger.info("loaded glossary %s (%d terms)", glossary.id, len(glossary))
+            loaded += 1
+        return loaded
+
+
+# 全局术语表注册表
+glossaries = GlossaryRegistry()
+
+
+def load_configured_glossaries() -> int:
+    """加载 `glossary_dir` 目录下的术语表（未配置时不加载）"""
+    if not settings.glossary_dir:
+        return 0
+    return glossaries.load_dir(settings.glossary_dir)
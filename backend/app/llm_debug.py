@@ -1,20 +1,119 @@
+"""上游请求参数的调试日志。
+
+日志在后台线程中脱敏、格式化并写出，事件循环上只做一次采样判断与入队：
+- 未开启（`llm_log_enabled` 关闭或 app.llm 日志未启用 INFO）时直接返回，零开销
+- 按 `llm_log_sample_rate` 采样；队列满时丢弃并计数，不阻塞请求
+- 单个字符串按 `llm_log_max_chars` 截断，整条日志按 `llm_log_max_bytes` 截断
+"""
+
 from __future__ import annotations
 
 import json
 import logging
+import queue
+import random
+import threading
+from dataclasses import asdict, dataclass
 from typing import Any
 
+from app.config import settings
+
+llm_logger = logging.getLogger("app.llm")
+
+_STOP = object()
+
+
+@dataclass
+class PayloadLogStats:
+    submitted: int = 0
+    sampled_out: int = 0
+    dropped: int = 0
+    written: int = 0
+
+    def snapshot(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+class PayloadLogger:
+    """队列 + 后台线程的参数日志写出器（首次提交时启动线程）"""
 
-uvicorn_logger = logging.getLogger("uvicorn.error")
+    def __init__(self, logger: logging.Logger, queue_size: int):
+        self._logger = logger
+        self._queue: queue.Queue[Any] = queue.Queue(maxsize=max(1, queue_size))
+        self._thread: threading.Thread | None = None
+        self.stats = PayloadLogStats()
 
+    @property
+    def enabled(self) -> bool:
+        return settings.llm_log_enabled and self._logger.isEnabledFor(logging.INFO)
 
-def log_ai_sdk_params(provider: str, params: dict[str, Any], *, max_chars: int = 4000) -> None:
+    def submit(self, provider: str, params: dict[str, Any]) -> None:
+        if not self.enabled:
+            return
+        if random.random() >= settings.llm_log_sample_rate:
+            self.stats.sampled_out += 1
+            return
+        if self._thread is None:
+            self.start()
+        try:
+            # 只入队引用：调用方记录后不再修改 params，格式化推迟到后台线程
+            self._queue.put_nowait((provider, params))
+            self.stats.submitted += 1
+        except queue.Full:
+            self.stats.dropped += 1
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="llm-payload-log", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """写完已入队的日志后停止后台线程"""
+        thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            return
+        thread.join(timeout)
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            provider, params = item
+            try:
+                self._logger.info("AI_SDK_PARAMS[%s]\n%s", provider, format_payload(params))
+                self.stats.written += 1
+            except Exception:
+                self._logger.exception("写出 AI_SDK_PARAMS 日志失败")
+
+
+def format_payload(
+    params: dict[str, Any], *, max_chars: int | None = None, max_bytes: int | None = None
+) -> str:
+    """脱敏并格式化请求参数（在后台线程中调用）"""
+    max_chars = settings.llm_log_max_chars if max_chars is None else max_chars
+    max_bytes = settings.llm_log_max_bytes if max_bytes is None else max_bytes
     safe = _redact_payload(params, max_chars=max_chars)
     try:
         body = json.dumps(safe, ensure_ascii=False, indent=2)
     except Exception:
         body = str(safe)
-    uvicorn_logger.info("AI_SDK_PARAMS[%s]\n%s", provider, body)
+    encoded = body.encode("utf-8")
+    if max_bytes and len(encoded) > max_bytes:
+        body = encoded[:max_bytes].decode("utf-8", "ignore") + f"\n...(truncated, total={len(encoded)} bytes)"
+    return body
+
+
+payload_logger = PayloadLogger(llm_logger, settings.llm_log_queue_size)
+
+
+def log_ai_sdk_params(provider: str, params: dict[str, Any]) -> None:
+    """记录即将发送给 SDK 的参数（非阻塞，可能被采样或丢弃）"""
+    payload_logger.submit(provider, params)
 
 
 def _redact_payload(payload: dict[str, Any], *, max_chars: int) -> dict[str, Any]:
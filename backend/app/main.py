@@ -1,10 +1,34 @@
+import asyncio
 import logging
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.config import settings
+from app.engines.client_pool import client_pool
+from app.engines.profiles import load_configured_profiles
+from app.engines.warmup import connection_warmer
 from app.errors import install_error_handlers
-from app.routers import health, translate, engines
+from app.glossary import load_configured_glossaries
+from app.llm_debug import payload_logger
+from app.metrics import MetricsMiddleware
+from app.routers import health, metrics, translate, engines, glossaries, stats
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    """应用生命周期：加载引擎配置档与术语表并启动后台任务（空闲回收、连接预热），关闭时释放上游连接并写完待写日志"""
+    load_configured_profiles()
+    load_configured_glossaries()
+    client_pool.start()
+    connection_warmer.start()
+    try:
+        yield
+    finally:
+        await connection_warmer.aclose()
+        await client_pool.aclose()
+        await asyncio.to_thread(payload_logger.stop)
 
 
 def create_app() -> FastAPI:
@@ -13,6 +37,7 @@ def create_app() -> FastAPI:
         title="NextTranslation API",
         description="多层次翻译平台 API",
         version="0.1.0",
+        lifespan=lifespan,
     )
 
     if settings.debug:
@@ -33,12 +58,17 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
     )
 
+    app.add_middleware(MetricsMiddleware)
+
     install_error_handlers(app, debug=settings.debug)
 
     # 注册路由
     app.include_router(health.router)
+    app.include_router(metrics.router)
     app.include_router(translate.router, prefix=settings.api_prefix)
     app.include_router(engines.router, prefix=settings.api_prefix)
+    app.include_router(glossaries.router, prefix=settings.api_prefix)
+    app.include_router(stats.router, prefix=settings.api_prefix)
 
     return app
 
@@ -0,0 +1,244 @@
+"""Prometheus 文本格式的运行指标（GET /metrics）。
+
+不依赖 prometheus_client：服务只在单个事件循环中运行，热路径上的记录只是对字典中
+列表/浮点数的原地累加，无需加锁。已有的全局统计（缓存、重试、准入、用量等）在抓取时
+才从各自的 snapshot() 读出，不增加热路径开销。
+"""
+
+from __future__ import annotations
+
+import math
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from typing import Any, Callable, Iterable
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+LabelValues = tuple[str, ...]
+Sample = tuple[str, dict[str, str], float]
+
+# 默认直方图桶（秒）：覆盖从毫秒级缓存命中到分钟级长文本生成
+DEFAULT_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+
+class _Metric(ABC):
+    type = ""
+
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels: dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def _labels(self, key: LabelValues) -> dict[str, str]:
+        return dict(zip(self.labelnames, key))
+
+    @abstractmethod
+    def samples(self) -> list[Sample]:
+        """当前的全部样本 (名称, 标签, 值)"""
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self) -> list[Sample]:
+        return [(f"{self.name}_total", self._labels(k), v) for k, v in self._values.items()]
+
+
+class Gauge(_Metric):
+    type = "gauge"
+
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def samples(self) -> list[Sample]:
+        return [(self.name, self._labels(k), v) for k, v in self._values.items()]
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Iterable[str] = (),
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # 每组标签：[各桶计数..., +Inf 计数, 总和]
+        self._values: dict[LabelValues, list[float]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        counts = self._values.get(key)
+        if counts is None:
+            counts = self._values[key] = [0.0] * (len(self.buckets) + 2)
+        counts[bisect_left(self.buckets, value)] += 1
+        counts[-1] += value
+
+    def samples(self) -> list[Sample]:
+        result: list[Sample] = []
+        for key, counts in self._values.items():
+            labels = self._labels(key)
+            cumulative = 0.0
+            for bound, count in zip((*self.buckets, math.inf), counts):
+                cumulative += count
+                result.append((f"{self.name}_bucket", {**labels, "le": _format_value(bound)}, cumulative))
+            result.append((f"{self.name}_sum", labels, counts[-1]))
+            result.append((f"{self.name}_count", labels, cumulative))
+        return result
+
+
+class _Collected(_Metric):
+    """抓取时由回调生成样本的指标（用于导出已有的 snapshot 统计）"""
+
+    def __init__(self, name: str, help: str, type: str, collect: Callable[[], Iterable[tuple[dict[str, str], float]]]):
+        super().__init__(name, help)
+        self.type = type
+        self._collect = collect
+
+    def samples(self) -> list[Sample]:
+        suffix = "_total" if self.type == "counter" else ""
+        return [(f"{self.name}{suffix}", labels, value) for labels, value in self._collect()]
+
+
+class Registry:
+    def __init__(self, prefix: str = ""):
+        self.prefix = prefix
+        self._metrics: list[_Metric] = []
+
+    def _add(self, metric: _Metric) -> Any:
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self._add(Counter(self.prefix + name, help, labelnames))
+
+    def gauge(self, name: str, help: str, labelnames: Iterable[str] = ()) -> Gauge:
+        return self._add(Gauge(self.prefix + name, help, labelnames))
+
+    def histogram(
+        self, name: str, help: str, labelnames: Iterable[str] = (), buckets: Iterable[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._add(Histogram(self.prefix + name, help, labelnames, buckets))
+
+    def collected(
+        self, name: str, help: str, type: str, collect: Callable[[], Iterable[tuple[dict[str, str], float]]]
+    ) -> None:
+        self._add(_Collected(self.prefix + name, help, type, collect))
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if value == int(value):
+        return str(int(value))
+    return repr(float(value))
+
+
+registry = Registry(prefix="nexttranslation_")
+
+http_requests = registry.counter(
+    "http_requests", "HTTP 请求数", ("route", "mode", "method", "status")
+)
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds", "HTTP 请求耗时（流式为整个响应期间）", ("route", "mode", "method")
+)
+http_in_flight = registry.gauge("http_requests_in_flight", "进行中的 HTTP 请求数")
+upstream_duration = registry.histogram(
+    "upstream_call_duration_seconds", "上游调用耗时（单次尝试，不含排队）", ("channel", "model", "outcome")
+)
+upstream_ttft = registry.histogram(
+    "upstream_time_to_first_token_seconds", "上游流式调用首个增量耗时", ("channel", "model")
+)
+judge_parse_failures = registry.counter(
+    "judge_parse_failures", "裁判输出无法解析为 JSON 的次数", ("stream",)
+)
+sse_stream_duration = registry.histogram(
+    "sse_stream_duration_seconds", "SSE 响应持续时间", ("endpoint", "outcome")
+)
+
+
+def route_mode(route: str) -> str:
+    """由路由模板得到翻译模式（/api/translate/<mode>/...），其它路由为空"""
+    parts = route.strip("/").split("/")
+    if "translate" in parts:
+        index = parts.index("translate") + 1
+        if index < len(parts):
+            return parts[index]
+    return ""
+
+
+class MetricsMiddleware:
+    """记录每个 HTTP 请求的路由、状态码与耗时（纯 ASGI，不缓冲流式响应）"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        http_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            http_in_flight.dec()
+            # 只使用路由模板作为标签，未匹配的路径统一归类，避免标签基数失控
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            mode = route_mode(route)
+            method = scope.get("method", "")
+            http_requests.inc(route=route, mode=mode, method=method, status=str(status))
+            http_request_duration.observe(
+                time.perf_counter() - started, route=route, mode=mode, method=method
+            )
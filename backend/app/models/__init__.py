@@ -7,9 +7,14 @@ from app.models.blueprint import (
     PromptBlock,
     SpecBlueprintRequest,
     SpecBlueprintResponse,
+    TheoryAnalysisError,
     TranslationBlueprint,
 )
 from app.models.translation import (
+    BatchItemResult,
+    BatchTranslateItem,
+    BatchTranslateRequest,
+    BatchTranslateResponse,
     EasyTranslateRequest,
     EasyTranslateResponse,
     VibeTranslateRequest,
@@ -20,17 +25,23 @@ from app.models.translation import (
     TranslationScore,
     ScoredEngineResult,
     EngineResult,
+    TokenUsageInfo,
 )
 
 __all__ = [
     "EasyTranslateRequest",
     "EasyTranslateResponse",
+    "BatchTranslateItem",
+    "BatchTranslateRequest",
+    "BatchTranslateResponse",
+    "BatchItemResult",
     "VibeTranslateRequest",
     "VibeTranslateResponse",
     "SpecTranslateRequest",
     "SpecTranslateResponse",
     "SpecBlueprintRequest",
     "SpecBlueprintResponse",
+    "TheoryAnalysisError",
     "TranslationBlueprint",
     "PromptBlock",
     "EquivalenceTheoryConfig",
@@ -40,4 +51,5 @@ __all__ = [
     "TranslationScore",
     "ScoredEngineResult",
     "EngineResult",
+    "TokenUsageInfo",
 ]
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from pydantic import BaseModel, ConfigDict, Field
-from typing import Annotated, Literal
+from typing import Annotated, Any, Literal
 
 
 TheoryId = Literal["equivalence", "functionalism", "dts"]
@@ -135,6 +135,17 @@ class SpecBlueprintRequest(BaseModel):
     )
 
 
+class TheoryAnalysisError(BaseModel):
+    """单个理论的 AI 分析失败信息（不影响其他理论）"""
+
+    model_config = ConfigDict(populate_by_name=True)
+
+    theory_id: TheoryId = Field(..., description="失败的理论")
+    code: str = Field(..., description="错误码")
+    message: str = Field(..., description="错误信息")
+    details: Any | None = Field(default=None, description="错误详情")
+
+
 class SpecBlueprintResponse(BaseModel):
     """规范翻译蓝图生成响应"""
 
@@ -143,4 +154,7 @@ class SpecBlueprintResponse(BaseModel):
     blueprint: TranslationBlueprint = Field(
         ..., description="生成后的蓝图（包含 AI 产物与提示词分块）"
     )
+    errors: list[TheoryAnalysisError] = Field(
+        default_factory=list, description="生成失败的理论分析（其余理论的结果照常返回）"
+    )
 
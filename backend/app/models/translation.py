@@ -4,6 +4,16 @@ from pydantic import BaseModel, Field
 
 from app.models.blueprint import TranslationBlueprint
 
+
+class TokenUsageInfo(BaseModel):
+    """上游 token 用量（含提示词缓存读写量）"""
+
+    input_tokens: int = Field(default=0, description="未命中提示词缓存的输入 token")
+    output_tokens: int = Field(default=0, description="输出 token")
+    cache_read_tokens: int = Field(default=0, description="命中提示词缓存的输入 token")
+    cache_write_tokens: int = Field(default=0, description="写入提示词缓存的输入 token")
+
+
 class EasyTranslateRequest(BaseModel):
     """简易翻译请求"""
 
@@ -12,6 +22,7 @@ class EasyTranslateRequest(BaseModel):
     target_lang: str = Field(..., description="目标语言代码")
     prompt: str | None = Field(default=None, description="自定义提示词")
     engine: str = Field(default="openai", description="使用的翻译引擎")
+    glossary: str | None = Field(default=None, description="术语表 id（原文中出现的术语按指定译法翻译）")
 
 
 class EasyTranslateResponse(BaseModel):
@@ -21,6 +32,44 @@ class EasyTranslateResponse(BaseModel):
     source_lang: str = Field(..., description="源语言（检测到的或指定的）")
     target_lang: str = Field(..., description="目标语言")
     engine: str = Field(..., description="使用的引擎")
+    usage: TokenUsageInfo | None = Field(default=None, description="上游 token 用量（全部命中翻译缓存时为空）")
+
+
+class BatchTranslateItem(BaseModel):
+    """批量翻译条目"""
+
+    id: str | None = Field(default=None, description="调用方自定义标识（原样返回）")
+    text: str = Field(..., description="要翻译的文本")
+
+
+class BatchTranslateRequest(BaseModel):
+    """批量翻译请求"""
+
+    items: list[BatchTranslateItem] = Field(..., min_length=1, description="待翻译条目列表")
+    source_lang: str = Field(default="auto", description="源语言代码")
+    target_lang: str = Field(..., description="目标语言代码")
+    prompt: str | None = Field(default=None, description="自定义提示词（作用于所有条目）")
+    engine: str = Field(default="openai", description="使用的翻译引擎")
+
+
+class BatchItemResult(BaseModel):
+    """单条批量翻译结果"""
+
+    index: int = Field(..., description="条目在请求中的下标")
+    id: str | None = None
+    translated_text: str
+    success: bool = True
+    error: str | None = None
+
+
+class BatchTranslateResponse(BaseModel):
+    """批量翻译响应（results 与请求 items 顺序一致）"""
+
+    results: list[BatchItemResult]
+    source_lang: str
+    target_lang: str
+    engine: str
+    llm_calls: int = Field(default=0, description="实际发起的上游调用次数")
 
 
 class EngineResult(BaseModel):
@@ -52,6 +101,7 @@ class ScoredEngineResult(BaseModel):
     translated_text: str
     success: bool = True
     error: str | None = None
+    timed_out: bool = False
     score: TranslationScore | None = None
 
 
@@ -63,6 +113,12 @@ class VibeTranslateRequest(BaseModel):
     target_lang: str = Field(..., description="目标语言代码")
     intent: str = Field(..., description="翻译意图描述")
     engines: list[str] = Field(default=["openai", "anthropic"], description="使用的引擎列表")
+    quorum: int | None = Field(
+        default=None, ge=0, description="成功候选达到该数量即开始评分（默认取配置，0 表示等待全部）"
+    )
+    candidate_deadline: float | None = Field(
+        default=None, ge=0, description="候选最长等待秒数（默认取配置，0 表示不限制）"
+    )
 
 
 class VibeTranslateResponse(BaseModel):
@@ -105,4 +161,7 @@ class SpecTranslateResponse(BaseModel):
     target_lang: str
     blueprint_applied: TranslationBlueprint
     decisions: list[TranslationDecision] | None = None
-    extracted_terms: list[dict] | None = None
+    extracted_terms: list[dict] | None = Field(
+        default=None, description="原文中命中的术语表条目（techniques.extractTerms 开启时）"
+    )
+    usage: TokenUsageInfo | None = None
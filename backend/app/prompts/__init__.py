@@ -4,6 +4,7 @@
 - `system.py`：通用翻译 system prompt 骨架。
 - `spec.py`：将前端 blueprint 转为额外指令（additional instructions）。
 - `vibe.py`：候选译文打分 + 融合生成最终译文的提示词。
+- `batch.py`：多条短文本打包翻译的提示词与编号格式。
 """
 
-__all__ = ["spec", "system", "vibe"]
+__all__ = ["batch", "spec", "system", "vibe"]
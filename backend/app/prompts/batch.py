@@ -0,0 +1,33 @@
+"""批量翻译提示词。
+
+多条短文本打包进一次调用：user 内容为带编号的 JSON 数组，
+要求模型按相同编号返回 JSON，便于逐条对齐与校验。
+"""
+
+from __future__ import annotations
+
+import json
+
+
+def build_batch_translation_system_prompt(
+    *,
+    source_lang: str,
+    target_lang: str,
+    additional_instructions: str = "",
+) -> str:
+    base = (
+        "你是一名专业翻译。"
+        f"请将用户提供的每一条文本从 {source_lang} 翻译成 {target_lang}。\n"
+        '输入是 JSON 数组，每项形如 {"i": 编号, "t": "原文"}，各条目相互独立。\n'
+        '只输出一个 JSON 对象：{"translations": [{"i": 编号, "t": "译文"}, ...]}，'
+        "编号与输入一一对应，不得合并、拆分或遗漏条目，不要包含任何解释。"
+    )
+    extra = (additional_instructions or "").strip()
+    if not extra:
+        return base
+    return base + f"\n\n补充要求：\n{extra}"
+
+
+def build_batch_user_content(items: list[tuple[int, str]]) -> str:
+    """把 (编号, 原文) 列表编码为 user 内容"""
+    return json.dumps([{"i": i, "t": text} for i, text in items], ensure_ascii=False)
@@ -1,5 +1,3 @@
-from __future__ import annotations
-
 """Spec Translation 蓝图生成相关提示词与分块构建。
 
 - 生成对等理论建议（AI）
@@ -7,6 +5,8 @@ from __future__ import annotations
 - 根据蓝图字段生成默认 prompt_blocks（供用户逐块编辑）
 """
 
+from __future__ import annotations
+
 from app.models.blueprint import PromptBlock, PromptBlockId, TranslationBlueprint
 
 
@@ -1,11 +1,11 @@
-from __future__ import annotations
-
 """Spec Translation 蓝图到“最终翻译提示词”的转换。
 
 该文件仅负责把 blueprint（尤其是 prompt_blocks）转换为用于最终翻译的“额外指令”文本。
 蓝图生成阶段所用的提示词与默认分块构建，统一放在 `app/prompts/blueprint.py`。
 """
 
+from __future__ import annotations
+
 from app.models.blueprint import PromptBlock, TranslationBlueprint
 from app.prompts.blueprint import build_blueprint_default_prompt_blocks
 
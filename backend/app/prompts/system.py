@@ -1,11 +1,11 @@
-from __future__ import annotations
-
 """通用 system prompt 构建。用于简单翻译与氛围翻译中的单词翻译
 
 此处的 system prompt 主要用于约束“翻译任务”的角色与输出形式，
 并支持在末尾追加来自 blueprint/业务规则的额外指令。
 """
 
+from __future__ import annotations
+
 def build_translation_system_prompt(
     *,
     source_lang: str,
@@ -27,3 +27,37 @@ def build_translation_system_prompt(
         return base
     # 统一以一个分隔段落追加，便于日志/调试中快速定位附加约束。
     return base + f"\n\n补充要求：\n{extra}"
+
+
+def build_segment_context_block(context: str) -> str:
+    """分段翻译时附加的上文片段（仅供理解语境）。
+
+    放在 system prompt 末尾，使前面稳定的指令部分在各片段之间保持一致。
+    """
+    return (
+        "上文（仅供理解语境与保持术语、人称一致，不要翻译或输出这部分内容）：\n"
+        f"{context.strip()}"
+    )
+
+
+def build_translation_memory_block(references: list[tuple[str, str]]) -> str:
+    """翻译记忆中与原文相似的既有译文（仅供参考措辞与术语）。
+
+    与上文片段一样放在 system prompt 末尾，不影响前面稳定前缀的提示词缓存。
+    """
+    lines = ["翻译记忆参考（与原文相似的既有译文，可沿用其中的术语与措辞，但必须按当前原文翻译）："]
+    for index, (source, target) in enumerate(references, 1):
+        lines.append(f"[{index}] 原文：{source.strip()}\n    译文：{target.strip()}")
+    return "\n".join(lines)
+
+
+def build_glossary_block(terms: list[tuple[str, str, str]]) -> str:
+    """原文中出现的术语及其指定译法（只包含本片段命中的术语，而不是整张术语表）。
+
+    随原文变化，因此同样放在 system prompt 末尾。
+    """
+    lines = ["术语表（原文中出现的以下术语必须使用指定译法）："]
+    for source, target, note in terms:
+        line = f"- {source.strip()} → {target.strip()}"
+        lines.append(f"{line}（{note.strip()}）" if note and note.strip() else line)
+    return "\n".join(lines)
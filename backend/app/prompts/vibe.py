@@ -1,10 +1,10 @@
-from __future__ import annotations
-
 """Vibe 评审（Judge）提示词构建。
 - `build_vibe_judge_system_prompt`：system prompt，主要负责约束输出格式（例如必须返回 JSON）。
 - `build_vibe_judge_prompt`：user prompt，包含具体评分维度、候选译文与输出 JSON 结构约束。
 """
 
+from __future__ import annotations
+
 from typing import Iterable
 
 from app.models.translation import ScoredEngineResult
@@ -1,4 +1,4 @@
 # Routers module
-from app.routers import health, translate, engines
+from app.routers import health, translate, engines, stats
 
-__all__ = ["health", "translate", "engines"]
+__all__ = ["health", "translate", "engines", "stats"]
@@ -1,5 +1,10 @@
-from fastapi import APIRouter
+from typing import Any
 
+from fastapi import APIRouter, Body, Depends, Header
+
+from app.config import settings
+from app.dependencies import profile_token_valid, require_admin_token
+from app.engines.profiles import engine_profiles, parse_profile
 from app.engines.registry import engine_registry
 from app.errors import ApiError
 
@@ -13,6 +18,54 @@ async def list_engines():
     return {"engines": engines}
 
 
+async def _require_profiles_api(
+    x_admin_token: str | None = Header(default=None, alias="X-Admin-Token"),
+) -> None:
+    """修改配置档需开启 `engine_profiles_api_enabled` 并通过管理令牌鉴权"""
+    if not settings.engine_profiles_api_enabled:
+        raise ApiError(403, "engine_profiles_readonly", "引擎配置档只能通过配置文件管理")
+    await require_admin_token(x_admin_token)
+
+
+@router.get("/profiles")
+async def list_engine_profiles(
+    x_engine_profile_token: str | None = Header(default=None, alias="X-Engine-Profile-Token"),
+):
+    """获取服务端引擎配置档列表（不含 apiKey；未带有效 X-Engine-Profile-Token 时只列出公开配置档）"""
+    authorized = profile_token_valid(x_engine_profile_token)
+    return {"profiles": [p.public() for p in engine_profiles.list_profiles(authorized=authorized)]}
+
+
+@router.get("/profiles/{profile_id}")
+async def get_engine_profile(
+    profile_id: str,
+    x_engine_profile_token: str | None = Header(default=None, alias="X-Engine-Profile-Token"),
+):
+    """获取指定引擎配置档（不含 apiKey；非公开配置档需有效的 X-Engine-Profile-Token）"""
+    return engine_profiles.resolve(profile_id, authorized=profile_token_valid(x_engine_profile_token)).public()
+
+
+@router.put("/profiles/{profile_id}", dependencies=[Depends(_require_profiles_api)])
+async def put_engine_profile(profile_id: str, body: dict[str, Any] = Body(...)):
+    """创建或替换引擎配置档
+
+    请求体格式与 X-Engine-Config 相同，另可带 `limits`（maxInFlight / requestsPerMinute /
+    tokensPerMinute / queueTimeout）、`description` 与 `public`。注册后即可用 `X-Engine-Profile: <id>` 引用；
+    未标记 `public: true` 的配置档引用时需带 X-Engine-Profile-Token。
+    apiKey 必须直接给出：apiKeyEnv（读取服务端环境变量）只在配置文件中生效。
+    """
+    profile = parse_profile(profile_id, body)
+    engine_profiles.put(profile)
+    return profile.public()
+
+
+@router.delete("/profiles/{profile_id}", dependencies=[Depends(_require_profiles_api)])
+async def delete_engine_profile(profile_id: str):
+    """删除引擎配置档"""
+    engine_profiles.remove(profile_id)
+    return {"id": profile_id, "deleted": True}
+
+
 @router.get("/{engine_id}")
 async def get_engine(engine_id: str):
     """获取指定引擎的详细信息"""
@@ -0,0 +1,78 @@
+import asyncio
+from typing import Literal
+
+from fastapi import APIRouter, Depends, Header, Request
+
+from app.config import settings
+from app.dependencies import require_admin_token
+from app.errors import ApiError
+from app.glossary import build_glossary, glossaries
+
+router = APIRouter(prefix="/glossaries", tags=["glossaries"])
+
+
+async def _require_glossaries_api(
+    x_admin_token: str | None = Header(default=None, alias="X-Admin-Token"),
+) -> None:
+    """修改术语表需开启 `glossaries_api_enabled` 并通过管理令牌鉴权"""
+    if not settings.glossaries_api_enabled:
+        raise ApiError(403, "glossaries_readonly", "术语表只能通过 glossary_dir 目录管理")
+    await require_admin_token(x_admin_token)
+
+
+async def _read_upload(request: Request) -> bytes:
+    """读取上传的术语表文件，超过 `glossary_max_upload_bytes` 时返回 413"""
+    limit = settings.glossary_max_upload_bytes
+    too_large = ApiError(413, "glossary_too_large", "术语表文件过大", {"max_bytes": limit})
+    declared = request.headers.get("content-length")
+    if declared and declared.isdigit() and int(declared) > limit:
+        raise too_large
+    # Content-Length 可能缺失（分块传输）或与实际不符，按实际读取的字节数再限制一次
+    content = bytearray()
+    async for chunk in request.stream():
+        content += chunk
+        if len(content) > limit:
+            raise too_large
+    return bytes(content)
+
+
+@router.get("")
+async def list_glossaries():
+    """获取已加载的术语表列表"""
+    return {"glossaries": [g.info() for g in glossaries.list_glossaries()]}
+
+
+@router.get("/{glossary_id}")
+async def get_glossary(glossary_id: str):
+    """获取指定术语表的信息"""
+    return glossaries.get(glossary_id).info()
+
+
+@router.put("/{glossary_id}", dependencies=[Depends(_require_glossaries_api)])
+async def put_glossary(
+    glossary_id: str,
+    request: Request,
+    format: Literal["csv", "tbx"] = "csv",
+    source_lang: str | None = None,
+    target_lang: str | None = None,
+):
+    """上传并创建（或替换）术语表
+
+    请求体为 CSV 或 TBX 文件原文（`?format=csv|tbx`）。TBX 未指定语言时取第一个条目的前两个语言。
+    注册后即可在 Easy 请求的 `glossary`、Spec 蓝图的 `techniques.terminologySource` 中引用；
+    标注了语言的术语表只能用于相同语言对的请求。
+    """
+    content = await _read_upload(request)
+    # 大术语表的解析与自动机构建是 CPU 密集的，放到线程池中避免阻塞事件循环
+    glossary = await asyncio.to_thread(
+        build_glossary, glossary_id, content, format=format, source_lang=source_lang, target_lang=target_lang
+    )
+    glossaries.put(glossary)
+    return glossary.info()
+
+
+@router.delete("/{glossary_id}", dependencies=[Depends(_require_glossaries_api)])
+async def delete_glossary(glossary_id: str):
+    """删除术语表"""
+    glossaries.remove(glossary_id)
+    return {"id": glossary_id, "deleted": True}
@@ -1,4 +1,7 @@
 from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from app.engines.warmup import connection_warmer
 
 router = APIRouter(tags=["health"])
 
@@ -7,3 +10,17 @@ router = APIRouter(tags=["health"])
 async def health_check():
     """健康检查端点"""
     return {"status": "healthy", "service": "nexttranslation-api"}
+
+
+@router.get("/ready")
+async def readiness_check():
+    """就绪检查端点：启动时的首轮上游连接预热结束前返回 503
+
+    预热失败的目标不影响就绪状态，其错误与耗时见 `warmup.targets`。
+    """
+    warmup = connection_warmer.snapshot()
+    ready = warmup["ready"]
+    return JSONResponse(
+        {"status": "ready" if ready else "warming_up", "service": "nexttranslation-api", "warmup": warmup},
+        status_code=200 if ready else 503,
+    )
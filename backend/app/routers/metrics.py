@@ -0,0 +1,155 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.cache import analysis_cache, translation_cache
+from app.cancellation import cancellation_stats
+from app.engines.admission import admission
+from app.engines.hedging import hedge_stats
+from app.engines.resilience import retry_stats
+from app.engines.usage import usage_stats
+from app.engines.warmup import connection_warmer
+from app.metrics import registry
+from app.translation_memory import translation_memory
+
+router = APIRouter(tags=["metrics"])
+
+
+def _caches():
+    for name, cache in (("translation", translation_cache), ("analysis", analysis_cache)):
+        if cache is not None:
+            yield name, cache.snapshot()
+
+
+registry.collected(
+    "cache_requests",
+    "缓存查询次数（result 为 hit / miss）",
+    "counter",
+    lambda: [
+        ({"cache": name, "result": result}, snapshot[key])
+        for name, snapshot in _caches()
+        for result, key in (("hit", "hits"), ("miss", "misses"))
+    ],
+)
+registry.collected(
+    "cache_hit_ratio",
+    "缓存命中率",
+    "gauge",
+    lambda: [({"cache": name}, snapshot["hit_ratio"]) for name, snapshot in _caches()],
+)
+registry.collected(
+    "cache_entries",
+    "缓存条目数",
+    "gauge",
+    lambda: [({"cache": name}, snapshot["entries"]) for name, snapshot in _caches()],
+)
+registry.collected(
+    "translation_memory_lookups",
+    "翻译记忆查询次数（result 为 exact / fuzzy / miss）",
+    "counter",
+    lambda: [
+        ({"result": result}, getattr(translation_memory.stats, field))
+        for result, field in (("exact", "exact_hits"), ("fuzzy", "fuzzy_hits"), ("miss", "misses"))
+    ]
+    if translation_memory
+    else [],
+)
+registry.collected(
+    "translation_memory_segments",
+    "翻译记忆中的片段数",
+    "gauge",
+    lambda: [({}, translation_memory.snapshot()["segments"])] if translation_memory else [],
+)
+registry.collected(
+    "upstream_attempts",
+    "上游调用尝试次数（含重试）",
+    "counter",
+    lambda: [({}, retry_stats.attempts)],
+)
+registry.collected(
+    "upstream_retries",
+    "上游调用重试次数",
+    "counter",
+    lambda: [({}, retry_stats.retries)],
+)
+registry.collected(
+    "upstream_timeouts",
+    "上游调用超时次数",
+    "counter",
+    lambda: [({}, retry_stats.timeouts)],
+)
+registry.collected(
+    "upstream_gave_up",
+    "重试耗尽后失败的上游调用数",
+    "counter",
+    lambda: [({}, retry_stats.gave_up)],
+)
+registry.collected(
+    "upstream_tokens",
+    "上游 token 用量（kind 为 input / output / cache_read / cache_write）",
+    "counter",
+    lambda: [
+        ({"channel": channel, "kind": kind}, usage[f"{kind}_tokens"])
+        for channel, usage in usage_stats.snapshot().items()
+        for kind in ("input", "output", "cache_read", "cache_write")
+    ],
+)
+registry.collected(
+    "prompt_cache_hit_ratio",
+    "provider 提示词缓存命中率（按输入 token 计）",
+    "gauge",
+    lambda: [({"channel": channel}, usage["cache_hit_ratio"]) for channel, usage in usage_stats.snapshot().items()],
+)
+registry.collected(
+    "admission_in_flight",
+    "已取得准入名额的上游调用数",
+    "gauge",
+    lambda: [({}, admission.snapshot()["in_flight"])],
+)
+registry.collected(
+    "admission_queue_depth",
+    "排队等待准入名额的上游调用数",
+    "gauge",
+    lambda: [({}, admission.snapshot()["queue_depth"])],
+)
+registry.collected(
+    "hedged_requests",
+    "发出对冲请求的次数",
+    "counter",
+    lambda: [({}, hedge_stats.hedged)],
+)
+registry.collected(
+    "sse_disconnects",
+    "客户端提前断开的 SSE 响应数",
+    "counter",
+    lambda: [({"endpoint": endpoint}, count) for endpoint, count in cancellation_stats.by_endpoint.items()],
+)
+registry.collected(
+    "upstream_calls_cancelled",
+    "因客户端断开而取消的上游调用数",
+    "counter",
+    lambda: [({}, cancellation_stats.upstream_calls_cancelled)],
+)
+registry.collected(
+    "upstream_warmup_ok",
+    "最近一次连接预热是否成功（1 / 0）",
+    "gauge",
+    lambda: [
+        ({"channel": t["channel"], "base_url": t["base_url"]}, 1 if t["ok"] else 0)
+        for t in connection_warmer.snapshot()["targets"]
+    ],
+)
+registry.collected(
+    "upstream_warmup_seconds",
+    "最近一次连接预热耗时",
+    "gauge",
+    lambda: [
+        ({"channel": t["channel"], "base_url": t["base_url"]}, t["latency"])
+        for t in connection_warmer.snapshot()["targets"]
+    ],
+)
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus 文本格式的运行指标"""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -0,0 +1,37 @@
+from fastapi import APIRouter
+
+from app.cache import analysis_cache, translation_cache
+from app.cancellation import cancellation_stats
+from app.engines.admission import admission
+from app.engines.client_pool import client_pool
+from app.engines.hedging import hedge_stats, latency_tracker
+from app.engines.profiles import engine_profiles
+from app.engines.resilience import retry_stats
+from app.engines.usage import usage_stats
+from app.engines.warmup import connection_warmer
+from app.glossary import glossaries
+from app.llm_debug import payload_logger
+from app.translation_memory import translation_memory
+
+router = APIRouter(prefix="/stats", tags=["stats"])
+
+
+@router.get("")
+async def get_stats():
+    """运行时统计：翻译缓存命中率、翻译记忆命中、术语表、上游客户端池、引擎配置档、连接预热、重试、准入排队、对冲请求、token 用量与提示词缓存命中、客户端断开取消等"""
+    return {
+        "translation_cache": translation_cache.snapshot() if translation_cache else None,
+        "analysis_cache": analysis_cache.snapshot() if analysis_cache else None,
+        "translation_memory": translation_memory.snapshot() if translation_memory else None,
+        "glossaries": glossaries.snapshot(),
+        "client_pool": client_pool.snapshot(),
+        "engine_profiles": engine_profiles.snapshot(),
+        "warmup": connection_warmer.snapshot(),
+        "retries": retry_stats.snapshot(),
+        "admission": admission.snapshot(),
+        "hedging": hedge_stats.snapshot(),
+        "latency": latency_tracker.snapshot(),
+        "usage": usage_stats.snapshot(),
+        "cancellation": cancellation_stats.snapshot(),
+        "llm_log": payload_logger.stats.snapshot(),
+    }
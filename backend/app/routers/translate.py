@@ -1,9 +1,11 @@
 """翻译 API 路由"""
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
 from fastapi.responses import StreamingResponse
 
 from app.models.translation import (
+    BatchTranslateRequest,
+    BatchTranslateResponse,
     EasyTranslateRequest,
     EasyTranslateResponse,
     VibeTranslateRequest,
@@ -13,16 +15,21 @@ from app.models.translation import (
 )
 from app.models.blueprint import SpecBlueprintRequest, SpecBlueprintResponse
 from app.dependencies import (
+    CachePolicy,
     EngineConfig,
+    get_cache_policy,
     get_engine_config,
     get_engine_configs,
+    get_optional_hedge_engine_config,
     get_optional_judge_engine_config,
 )
+from app.services.translation.batch import BatchTranslationService
 from app.services.translation.easy import EasyTranslationService
 from app.services.translation.vibe import VibeTranslationService
 from app.services.translation.spec import SpecTranslationService
 from app.services.translation.spec_blueprint import SpecBlueprintService
-from app.sse import sse_event
+from app.errors import ApiError
+from app.sse import SSE_HEADERS, sse_error, sse_event, stream_until_disconnect
 
 router = APIRouter(prefix="/translate", tags=["translation"])
 
@@ -31,6 +38,8 @@ router = APIRouter(prefix="/translate", tags=["translation"])
 async def easy_translate(
     request: EasyTranslateRequest,
     engine_config: EngineConfig = Depends(get_engine_config),
+    cache_policy: CachePolicy = Depends(get_cache_policy),
+    hedge_config: EngineConfig | None = Depends(get_optional_hedge_engine_config),
 ):
     """简易翻译端点 - 单引擎快速翻译
 
@@ -52,11 +61,86 @@ async def easy_translate(
     1. 从请求头获取引擎配置 (X-Engine-Config)
     2. 根据 channel 创建翻译引擎实例
     3. 构建系统提示词（包含自定义提示）
-    4. 调用 LLM API 执行翻译
+    4. 查询翻译缓存，未命中时调用 LLM API 执行翻译
     5. 返回翻译结果
+
+    请求头 `Cache-Control: no-cache` 可跳过缓存读取，`no-store` 则完全不使用缓存。
+    开启对冲请求（`hedging_enabled`）时，可用 `X-Hedge-Engine-Config` 指定对冲请求的备用引擎。
+    """
+    service = EasyTranslationService()
+    return await service.translate(request, engine_config, cache_policy, hedge_config)
+
+
+@router.post("/easy/stream")
+async def easy_translate_stream(
+    request: EasyTranslateRequest,
+    http_request: Request,
+    engine_config: EngineConfig = Depends(get_engine_config),
+    cache_policy: CachePolicy = Depends(get_cache_policy),
+    hedge_config: EngineConfig | None = Depends(get_optional_hedge_engine_config),
+):
+    """简易翻译（流式）：
+
+    - 上游模型每产出一段译文即推送（delta 事件，`{"delta": "..."}`）
+    - 完成后推送完整结果（final 事件，结构同 `/easy` 响应）
+    - 上游失败时推送 error 事件，结构同 JSON 错误响应中的 `error` 字段
+
+    前端需要用 fetch 读取流（EventSource 无法 POST）。
+    客户端断开后立即取消所有进行中的上游调用。
     """
     service = EasyTranslationService()
-    return await service.translate(request, engine_config)
+
+    async def event_stream():
+        try:
+            async for kind, payload in service.translate_stream(
+                request, engine_config, cache_policy, hedge_config
+            ):
+                if kind == "delta":
+                    yield sse_event("delta", {"delta": payload})
+                elif kind == "final":
+                    yield sse_event("final", payload.model_dump())
+        except ApiError as e:
+            yield sse_error(e)
+            return
+        yield sse_event("done", {"ok": True})
+
+    return StreamingResponse(
+        stream_until_disconnect(http_request, event_stream(), endpoint="easy/stream"),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS,
+    )
+
+
+@router.post("/batch", response_model=BatchTranslateResponse)
+async def batch_translate(
+    request: BatchTranslateRequest,
+    engine_config: EngineConfig = Depends(get_engine_config),
+    cache_policy: CachePolicy = Depends(get_cache_policy),
+    hedge_config: EngineConfig | None = Depends(get_optional_hedge_engine_config),
+):
+    """批量翻译端点 - 大量短文本打包进少量 LLM 调用
+
+    请求示例:
+    ```
+    POST /api/translate/batch
+    Headers:
+        X-Engine-Config: {"apiKey": "sk-...", "baseUrl": "https://api.openai.com/v1", "channel": "openai", "model": "gpt-4o"}
+    Body:
+        {
+            "items": [{"id": "menu.save", "text": "Save"}, {"id": "menu.open", "text": "Open"}],
+            "source_lang": "en",
+            "target_lang": "zh"
+        }
+    ```
+
+    流程:
+    1. 逐条查询翻译缓存（与 `/easy` 共用）
+    2. 未命中的条目按 token 预算打包，编号后以 JSON 形式发给 LLM
+    3. 按编号对齐回复，错位/缺失的条目回退为单条翻译
+    4. 按请求顺序返回每条结果
+    """
+    service = BatchTranslationService()
+    return await service.translate(request, engine_config, cache_policy, hedge_config)
 
 
 @router.post("/vibe", response_model=VibeTranslateResponse)
@@ -64,6 +148,7 @@ async def vibe_translate(
     request: VibeTranslateRequest,
     engine_configs: list[EngineConfig] = Depends(get_engine_configs),
     judge_config: EngineConfig | None = Depends(get_optional_judge_engine_config),
+    cache_policy: CachePolicy = Depends(get_cache_policy),
 ):
     """氛围翻译端点 - 多引擎并行翻译 + AI 评分
 
@@ -86,47 +171,72 @@ async def vibe_translate(
 
     流程:
     1. 从请求头获取多个引擎配置 (X-Engine-Configs)
-    2. 并行调用所有引擎执行翻译
+    2. 并行调用所有引擎执行翻译（成功候选达到 quorum 个或超过 candidate_deadline 即停止等待，
+       其余候选取消并标记 timed_out）
     3. 使用 Judge LLM 对每个翻译结果评分
     4. 找出评分最高的结果作为推荐
     5. 返回所有结果及评分
+
+    翻译记忆中的相似译文作为参考注入各候选；请求头 `Cache-Control: no-cache` / `no-store` 时不查询。
     """
     service = VibeTranslationService()
-    return await service.translate(request, engine_configs, judge_config=judge_config)
+    return await service.translate(
+        request, engine_configs, judge_config=judge_config, cache_policy=cache_policy
+    )
 
 
 @router.post("/vibe/stream")
 async def vibe_translate_stream(
     request: VibeTranslateRequest,
+    http_request: Request,
     engine_configs: list[EngineConfig] = Depends(get_engine_configs),
     judge_config: EngineConfig | None = Depends(get_optional_judge_engine_config),
+    cache_policy: CachePolicy = Depends(get_cache_policy),
 ):
     """氛围翻译（流式）：
 
-    - 任一引擎译文先返回（partial 事件）
-    - 全部完成后由裁判模型统一打分 + 50字内评语 + 综合生成最终最佳译文（final 事件）
+    - 各引擎边生成边推送增量译文（delta 事件，`{"engine_id": "...", "delta": "..."}`）
+    - 任一引擎完成即返回完整译文（partial 事件）
+    - 成功候选达到 quorum 个或超过 candidate_deadline 时，其余候选被取消，
+      以 `timed_out=true` 的 partial 事件推送
+    - 随后由裁判模型统一打分：每个候选的评分一生成即推送（score 事件），
+      综合译文以 `engine_id="judge"` 的 delta 事件逐段推送
+    - 裁判完成后推送评分 + 评语 + 综合最终最佳译文（final 事件）
 
     前端需要用 fetch 读取流（EventSource 无法 POST）。
+    客户端断开后立即取消所有进行中的上游调用。
     """
     service = VibeTranslationService()
 
     async def event_stream():
-        async for kind, payload in service.translate_stream(
-            request, engine_configs, judge_config=judge_config
-        ):
-            if kind == "partial":
-                yield sse_event("partial", payload.model_dump())
-            elif kind == "final":
-                yield sse_event("final", payload.model_dump())
+        try:
+            async for kind, payload in service.translate_stream(
+                request, engine_configs, judge_config=judge_config, cache_policy=cache_policy
+            ):
+                if kind in ("delta", "score"):
+                    yield sse_event(kind, payload)
+                elif kind == "partial":
+                    yield sse_event("partial", payload.model_dump())
+                elif kind == "final":
+                    yield sse_event("final", payload.model_dump())
+        except ApiError as e:
+            yield sse_error(e)
+            return
         yield sse_event("done", {"ok": True})
 
-    return StreamingResponse(event_stream(), media_type="text/event-stream")
+    return StreamingResponse(
+        stream_until_disconnect(http_request, event_stream(), endpoint="vibe/stream"),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS,
+    )
 
 
 @router.post("/spec", response_model=SpecTranslateResponse)
 async def spec_translate(
     request: SpecTranslateRequest,
     engine_config: EngineConfig = Depends(get_engine_config),
+    cache_policy: CachePolicy = Depends(get_cache_policy),
+    hedge_config: EngineConfig | None = Depends(get_optional_hedge_engine_config),
 ):
     """规范翻译端点 - 基于翻译蓝图的专业翻译
 
@@ -155,20 +265,113 @@ async def spec_translate(
     流程:
     1. 从请求头获取引擎配置 (X-Engine-Config)
     2. 将蓝图配置转换为 LLM 可理解的系统提示词
-    3. 调用 LLM API 执行翻译
+    3. 查询翻译缓存，未命中时调用 LLM API 执行翻译
     4. 生成翻译决策说明
     5. 返回翻译结果及决策说明
+
+    请求头 `Cache-Control: no-cache` 可跳过缓存读取，`no-store` 则完全不使用缓存。
+    """
+    service = SpecTranslationService()
+    return await service.translate(request, engine_config, cache_policy, hedge_config)
+
+
+@router.post("/spec/auto")
+async def spec_translate_auto(
+    request: SpecTranslateRequest,
+    http_request: Request,
+    engine_config: EngineConfig = Depends(get_engine_config),
+    cache_policy: CachePolicy = Depends(get_cache_policy),
+    hedge_config: EngineConfig | None = Depends(get_optional_hedge_engine_config),
+):
+    """规范翻译（自动蓝图 + 流式）：一次请求完成 `/spec/blueprint` 与 `/spec`
+
+    - 已启用但缺少 AI 结果的理论分析并发生成：theory_delta / analysis / theory_error 事件
+      （结构同 `/spec/blueprint/stream` 的 delta / analysis / theory_error）
+    - 分析完成后推送组装好的蓝图（blueprint 事件，结构同 `/spec/blueprint` 响应）
+    - 随后流式翻译：delta 事件（`{"delta": "..."}`），完成后推送 final 事件（结构同 `/spec` 响应）
+    - 翻译失败时推送 error 事件
+
+    前端需要用 fetch 读取流（EventSource 无法 POST）。
+    客户端断开后立即取消所有进行中的上游调用。
     """
     service = SpecTranslationService()
-    return await service.translate(request, engine_config)
+
+    async def event_stream():
+        try:
+            async for kind, payload in service.translate_auto_stream(
+                request, engine_config, cache_policy, hedge_config
+            ):
+                if kind in ("theory_delta", "analysis"):
+                    yield sse_event(kind, payload)
+                elif kind == "delta":
+                    yield sse_event("delta", {"delta": payload})
+                else:
+                    yield sse_event(kind, payload.model_dump(by_alias=True))
+        except ApiError as e:
+            yield sse_error(e)
+            return
+        yield sse_event("done", {"ok": True})
+
+    return StreamingResponse(
+        stream_until_disconnect(http_request, event_stream(), endpoint="spec/auto"),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS,
+    )
 
 
 @router.post("/spec/blueprint", response_model=SpecBlueprintResponse)
 async def spec_generate_blueprint(
     request: SpecBlueprintRequest,
     engine_config: EngineConfig = Depends(get_engine_config),
+    cache_policy: CachePolicy = Depends(get_cache_policy),
 ):
-    """生成 Spec Translation 蓝图（提示词分块 + 理论建议/分析）"""
+    """生成 Spec Translation 蓝图（提示词分块 + 理论建议/分析）
+
+    各理论的 AI 分析并发执行；某个理论分析失败时其余结果照常返回，失败信息见 `errors`。
+    分析结果按内容缓存（`Cache-Control: no-cache` / `no-store` 语义同 `/easy`）。
+    """
+    service = SpecBlueprintService()
+    return await service.generate_blueprint(request, engine_config, cache_policy)
+
+
+@router.post("/spec/blueprint/stream")
+async def spec_generate_blueprint_stream(
+    request: SpecBlueprintRequest,
+    http_request: Request,
+    engine_config: EngineConfig = Depends(get_engine_config),
+    cache_policy: CachePolicy = Depends(get_cache_policy),
+):
+    """生成 Spec Translation 蓝图（流式）：
+
+    - 各理论的 AI 分析并发生成，增量逐段推送（delta 事件，`{"theory_id": "...", "delta": "..."}`）
+    - 某个理论分析完成即推送完整内容（analysis 事件，`{"theory_id", "field", "content"}`，
+      field 为 `ai_suggestion` / `ai_analysis`）
+    - 某个理论分析失败时推送 theory_error 事件（结构同响应中的 `errors` 项），其余理论继续
+    - 全部完成后推送组装好的蓝图与 prompt_blocks（final 事件，结构同 `/spec/blueprint` 响应）
+    - 命中分析缓存的理论没有 delta，直接推送 analysis 事件
+
+    前端需要用 fetch 读取流（EventSource 无法 POST）。
+    客户端断开后立即取消所有进行中的上游调用。
+    """
     service = SpecBlueprintService()
-    blueprint = await service.generate_blueprint(request, engine_config)
-    return SpecBlueprintResponse(blueprint=blueprint)
+
+    async def event_stream():
+        try:
+            async for kind, payload in service.generate_blueprint_stream(
+                request, engine_config, cache_policy
+            ):
+                if kind in ("delta", "analysis"):
+                    yield sse_event(kind, payload)
+                elif kind in ("theory_error", "final"):
+                    # 与 JSON 响应一致使用字段别名（referenceSource、useTerminology 等）
+                    yield sse_event(kind, payload.model_dump(by_alias=True))
+        except ApiError as e:
+            yield sse_error(e)
+            return
+        yield sse_event("done", {"ok": True})
+
+    return StreamingResponse(
+        stream_until_disconnect(http_request, event_stream(), endpoint="spec/blueprint/stream"),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS,
+    )
@@ -3,9 +3,11 @@
 from app.services.translation.easy import EasyTranslationService
 from app.services.translation.vibe import VibeTranslationService
 from app.services.translation.spec import SpecTranslationService
+from app.services.translation.batch import BatchTranslationService
 
 __all__ = [
     "EasyTranslationService",
     "VibeTranslationService",
     "SpecTranslationService",
+    "BatchTranslationService",
 ]
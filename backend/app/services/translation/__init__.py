@@ -3,11 +3,13 @@
 from app.services.translation.easy import EasyTranslationService
 from app.services.translation.vibe import VibeTranslationService
 from app.services.translation.spec import SpecTranslationService
+from app.services.translation.batch import BatchTranslationService
 from app.services.translation.base import BaseTranslationService
 
 __all__ = [
     "EasyTranslationService",
     "VibeTranslationService",
     "SpecTranslationService",
+    "BatchTranslationService",
     "BaseTranslationService",
 ]
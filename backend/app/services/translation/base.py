@@ -1,27 +1,55 @@
 """翻译服务基类"""
 
+import asyncio
+from contextlib import aclosing
+from dataclasses import asdict
+from typing import AsyncIterator
+
+from app.cache import build_translation_cache_key, translation_cache
+from app.engines.base import TranslationResult, resolve_system_parts, resolve_system_prompt
+from app.engines.usage import TokenUsage
 from app.engines.openai_engine import OpenAIEngine
 from app.engines.anthropic_engine import AnthropicEngine
-from app.dependencies import EngineConfig
+from app.engines.client_pool import client_pool
+from app.engines.hedging import HedgedEngine
+from app.config import settings
+from app.dependencies import CachePolicy, EngineConfig
 from app.errors import ApiError
+from app.models.translation import TokenUsageInfo
+from app.prompts.system import build_glossary_block
+from app.services.translation.segmenter import Segment, join_segments, split_segments
+from app.services.translation.streaming import merge_streams
+from app.translation_memory import MemoryLookup, memory_fingerprint, translation_memory
 
 
 class BaseTranslationService:
     """翻译服务基类"""
 
-    def create_engine(self, config: EngineConfig):
-        """根据配置创建引擎实例"""
+    def create_engine(self, config: EngineConfig, hedge_config: EngineConfig | None = None):
+        """根据配置创建引擎实例
+
+        开启 `hedging_enabled` 时包装为对冲引擎，对冲请求发往 hedge_config（默认同主引擎）。
+        """
+        engine = self._build_engine(config)
+        if not settings.hedging_enabled:
+            return engine
+        fallback = self._build_engine(hedge_config) if hedge_config else None
+        return HedgedEngine(engine, fallback)
+
+    def _build_engine(self, config: EngineConfig):
         if config.channel == "openai":
             return OpenAIEngine(
                 api_key=config.api_key,
                 base_url=config.base_url,
                 model=config.model,
+                pool=client_pool,
             )
         elif config.channel == "anthropic":
             return AnthropicEngine(
                 api_key=config.api_key,
                 base_url=config.base_url,
                 model=config.model,
+                pool=client_pool,
             )
         else:
             raise ApiError(
@@ -30,3 +58,376 @@ class BaseTranslationService:
                 f"不支持的引擎渠道：{config.channel}",
                 {"supported": ["openai", "anthropic"]},
             )
+
+    def cache_key(
+        self,
+        engine,
+        config: EngineConfig,
+        *,
+        text: str,
+        source_lang: str,
+        target_lang: str,
+        options: dict | None = None,
+    ) -> str:
+        """生成翻译缓存键（基于最终 system prompt，而非原始请求字段）"""
+        return build_translation_cache_key(
+            channel=config.channel,
+            model=(options or {}).get("model") or engine.default_model,
+            base_url=config.base_url,
+            system_prompt=resolve_system_prompt(source_lang, target_lang, options),
+            text=text,
+        )
+
+    async def translate_with_cache(
+        self,
+        engine,
+        config: EngineConfig,
+        *,
+        text: str,
+        source_lang: str,
+        target_lang: str,
+        options: dict | None = None,
+        cache_policy: CachePolicy | None = None,
+    ) -> TranslationResult:
+        """带缓存与翻译记忆的 engine.translate
+
+        依次查询翻译缓存与翻译记忆：精确命中时不调用上游，模糊命中的条目作为参考译文注入提示词。
+        只有成功且非空的结果会写入缓存与翻译记忆。
+        """
+        options = self.with_glossary_terms(text, options)
+        cache_policy = cache_policy or CachePolicy()
+        key = None
+        if translation_cache is not None and (cache_policy.read or cache_policy.write):
+            key = self.cache_key(
+                engine, config, text=text, source_lang=source_lang, target_lang=target_lang, options=options
+            )
+        if key is not None and cache_policy.read:
+            cached = await translation_cache.get(key)
+            if cached is not None:
+                return TranslationResult(
+                    text=cached, source_lang=source_lang, target_lang=target_lang, success=True
+                )
+
+        memory = await self.recall(
+            text=text, source_lang=source_lang, target_lang=target_lang, options=options, cache_policy=cache_policy
+        )
+        if memory is not None and memory.exact is not None:
+            return TranslationResult(
+                text=memory.exact.target, source_lang=source_lang, target_lang=target_lang, success=True
+            )
+
+        result = await engine.translate(
+            text=text,
+            source_lang=source_lang,
+            target_lang=target_lang,
+            options=self.with_references(options, memory),
+        )
+        if result.success:
+            # 空译文（内容过滤、长度截断等）不缓存，否则 TTL 内都会被当作命中返回
+            if result.text and key is not None and cache_policy.write:
+                await translation_cache.set(key, result.text)
+            await self.remember(
+                engine,
+                config,
+                text=text,
+                translation=result.text,
+                source_lang=source_lang,
+                target_lang=target_lang,
+                options=options,
+                cache_policy=cache_policy,
+            )
+        return result
+
+    async def stream_with_cache(
+        self,
+        engine,
+        config: EngineConfig,
+        *,
+        text: str,
+        source_lang: str,
+        target_lang: str,
+        options: dict | None = None,
+        cache_policy: CachePolicy | None = None,
+    ) -> AsyncIterator[str]:
+        """带缓存与翻译记忆的 engine.translate_stream：命中时整段译文作为一个增量产出"""
+        options = self.with_glossary_terms(text, options)
+        cache_policy = cache_policy or CachePolicy()
+        key = None
+        if translation_cache is not None and (cache_policy.read or cache_policy.write):
+            key = self.cache_key(
+                engine, config, text=text, source_lang=source_lang, target_lang=target_lang, options=options
+            )
+        if key is not None and cache_policy.read:
+            cached = await translation_cache.get(key)
+            if cached is not None:
+                yield cached
+                return
+
+        memory = await self.recall(
+            text=text, source_lang=source_lang, target_lang=target_lang, options=options, cache_policy=cache_policy
+        )
+        if memory is not None and memory.exact is not None:
+            yield memory.exact.target
+            return
+
+        parts: list[str] = []
+        async for delta in engine.translate_stream(
+            text=text,
+            source_lang=source_lang,
+            target_lang=target_lang,
+            options=self.with_references(options, memory),
+        ):
+            parts.append(delta)
+            yield delta
+        translated = "".join(parts).strip()
+        if translated and key is not None and cache_policy.write:
+            await translation_cache.set(key, translated)
+        await self.remember(
+            engine,
+            config,
+            text=text,
+            translation=translated,
+            source_lang=source_lang,
+            target_lang=target_lang,
+            options=options,
+            cache_policy=cache_policy,
+        )
+
+    @staticmethod
+    def memory_fingerprint(source_lang: str, target_lang: str, options: dict | None) -> str:
+        """翻译记忆的提示词指纹（稳定前缀加命中的术语，不含参考译文与分段上文）"""
+        stable, _ = resolve_system_parts(source_lang, target_lang, options)
+        terms = (options or {}).get("terms")
+        if terms:
+            stable = f"{stable}\n\n{build_glossary_block(terms)}"
+        return memory_fingerprint(stable)
+
+    async def recall(
+        self,
+        *,
+        text: str,
+        source_lang: str,
+        target_lang: str,
+        options: dict | None = None,
+        cache_policy: CachePolicy | None = None,
+        fuzzy: bool = True,
+    ) -> MemoryLookup | None:
+        """查询翻译记忆；未启用、跳过缓存读取或片段过长时返回 None"""
+        cache_policy = cache_policy or CachePolicy()
+        if translation_memory is None or not cache_policy.read or not translation_memory.accepts(text):
+            return None
+        return await translation_memory.lookup(
+            text,
+            source_lang=source_lang,
+            target_lang=target_lang,
+            fingerprint=self.memory_fingerprint(source_lang, target_lang, options),
+            fuzzy=fuzzy,
+        )
+
+    async def remember(
+        self,
+        engine,
+        config: EngineConfig,
+        *,
+        text: str,
+        translation: str,
+        source_lang: str,
+        target_lang: str,
+        options: dict | None = None,
+        cache_policy: CachePolicy | None = None,
+    ) -> None:
+        """把成功的译文写入翻译记忆（`no-store` 时不写入）"""
+        cache_policy = cache_policy or CachePolicy()
+        if translation_memory is None or not cache_policy.write or not translation.strip():
+            return
+        if not translation_memory.accepts(text):
+            return
+        model = (options or {}).get("model") or engine.default_model
+        await translation_memory.add(
+            text,
+            translation,
+            source_lang=source_lang,
+            target_lang=target_lang,
+            fingerprint=self.memory_fingerprint(source_lang, target_lang, options),
+            engine=f"{config.channel}:{model}",
+        )
+
+    @staticmethod
+    def with_glossary_terms(text: str, options: dict | None) -> dict | None:
+        """把 options 中的术语表（`glossary`）换成本片段实际出现的术语（`terms`）
+
+        在计算缓存键之前调用，因此缓存与翻译记忆都按注入的术语区分。
+        """
+        glossary = (options or {}).get("glossary")
+        if glossary is None:
+            return options
+        resolved = {k: v for k, v in options.items() if k != "glossary"}
+        terms = glossary.find(text, limit=settings.glossary_max_prompt_terms)
+        if terms:
+            resolved["terms"] = [(t.source, t.target, t.note) for t in terms]
+        return resolved
+
+    @staticmethod
+    def extracted_terms(text: str, options: dict | None) -> list[dict[str, str]] | None:
+        """全文命中的术语（Spec `extractTerms`）；未使用术语表时返回 None"""
+        glossary = (options or {}).get("glossary")
+        if glossary is None:
+            return None
+        return [asdict(term) for term in glossary.find(text)]
+
+    @staticmethod
+    def with_references(options: dict | None, memory: MemoryLookup | None) -> dict | None:
+        """把翻译记忆的模糊命中作为参考译文加入 options"""
+        if memory is None or not memory.matches:
+            return options
+        return {**(options or {}), "references": memory.references()}
+
+    async def translate_segmented(
+        self,
+        engine,
+        config: EngineConfig,
+        *,
+        text: str,
+        source_lang: str,
+        target_lang: str,
+        options: dict | None = None,
+        cache_policy: CachePolicy | None = None,
+    ) -> TranslationResult:
+        """长文本分段并发翻译（短文本等价于 translate_with_cache）
+
+        片段在信号量限制下并发翻译，按原顺序与原分隔符拼回；任一片段失败则整体失败。
+        """
+        segments = split_segments(text, settings.segment_max_tokens)
+        if len(segments) <= 1:
+            return await self.translate_with_cache(
+                engine,
+                config,
+                text=text,
+                source_lang=source_lang,
+                target_lang=target_lang,
+                options=options,
+                cache_policy=cache_policy,
+            )
+
+        semaphore = asyncio.Semaphore(max(1, settings.segment_concurrency))
+
+        async def run(index: int) -> TranslationResult:
+            async with semaphore:
+                return await self.translate_with_cache(
+                    engine,
+                    config,
+                    text=segments[index].text,
+                    source_lang=source_lang,
+                    target_lang=target_lang,
+                    options=self._segment_options(options, segments, index),
+                    cache_policy=cache_policy,
+                )
+
+        results = await asyncio.gather(*(run(i) for i in range(len(segments))))
+        for i, result in enumerate(results):
+            if not result.success:
+                return TranslationResult(
+                    text="",
+                    source_lang=source_lang,
+                    target_lang=target_lang,
+                    success=False,
+                    error=f"第 {i + 1}/{len(segments)} 段翻译失败：{result.error}",
+                )
+
+        usage: TokenUsage | None = None
+        for result in results:
+            if result.usage is not None:
+                usage = usage or TokenUsage()
+                usage.add(result.usage)
+
+        return TranslationResult(
+            text=join_segments([r.text for r in results], segments),
+            source_lang=source_lang,
+            target_lang=target_lang,
+            success=True,
+            usage=usage,
+        )
+
+    async def stream_segmented(
+        self,
+        engine,
+        config: EngineConfig,
+        *,
+        text: str,
+        source_lang: str,
+        target_lang: str,
+        options: dict | None = None,
+        cache_policy: CachePolicy | None = None,
+    ) -> AsyncIterator[str]:
+        """长文本分段并发流式翻译，增量严格按原文顺序产出
+
+        所有片段同时开始生成（受信号量限制）；当前片段的增量直接转发，
+        后续片段的增量先缓冲，轮到它时再一次性补发。上游异常直接抛出。
+        """
+        segments = split_segments(text, settings.segment_max_tokens)
+        if len(segments) <= 1:
+            async for delta in self.stream_with_cache(
+                engine,
+                config,
+                text=text,
+                source_lang=source_lang,
+                target_lang=target_lang,
+                options=options,
+                cache_policy=cache_policy,
+            ):
+                yield delta
+            return
+
+        semaphore = asyncio.Semaphore(max(1, settings.segment_concurrency))
+
+        async def run(index: int) -> AsyncIterator[str]:
+            async with semaphore:
+                async for delta in self.stream_with_cache(
+                    engine,
+                    config,
+                    text=segments[index].text,
+                    source_lang=source_lang,
+                    target_lang=target_lang,
+                    options=self._segment_options(options, segments, index),
+                    cache_policy=cache_policy,
+                ):
+                    yield delta
+
+        buffers: dict[int, list[str]] = {i: [] for i in range(len(segments))}
+        finished: set[int] = set()
+        current = 0
+        streams = {i: run(i) for i in range(len(segments))}
+        async with aclosing(merge_streams(streams)) as events:
+            async for index, kind, value in events:
+                if kind == "error":
+                    raise value
+                if kind == "item":
+                    if index == current:
+                        yield value
+                    else:
+                        buffers[index].append(value)
+                    continue
+
+                finished.add(index)
+                while current in finished:
+                    if segments[current].separator:
+                        yield segments[current].separator
+                    current += 1
+                    if current < len(segments):
+                        for delta in buffers.pop(current):
+                            yield delta
+
+    @staticmethod
+    def usage_info(usage: TokenUsage | None) -> TokenUsageInfo | None:
+        """转换为响应中的用量字段；没有发生上游调用（全部命中缓存）时为 None"""
+        if usage is None or usage == TokenUsage():
+            return None
+        return TokenUsageInfo(**asdict(usage))
+
+    @staticmethod
+    def _segment_options(options: dict | None, segments: list[Segment], index: int) -> dict:
+        """为片段附加上一片段的原文作为上文（仅供理解语境）"""
+        segment_options = dict(options or {})
+        if index > 0 and settings.segment_context_chars > 0:
+            segment_options["context"] = segments[index - 1].text[-settings.segment_context_chars :]
+        return segment_options
@@ -0,0 +1,278 @@
+"""批量翻译服务"""
+
+import asyncio
+import json
+import re
+from typing import Any
+
+from app.cache import translation_cache
+from app.config import settings
+from app.dependencies import CachePolicy, EngineConfig
+from app.engines.base import TranslationResult
+from app.models.translation import (
+    BatchItemResult,
+    BatchTranslateRequest,
+    BatchTranslateResponse,
+)
+from app.prompts.batch import build_batch_translation_system_prompt, build_batch_user_content
+from app.services.translation.base import BaseTranslationService
+from app.services.translation.segmenter import estimate_tokens
+
+# 每个条目在 JSON 框架中的额外开销（编号、引号、键名）
+_ITEM_OVERHEAD_TOKENS = 8
+# JSON 解析失败时兜底识别 “1. 译文” / “[1] 译文” 形式的编号行
+_NUMBERED_LINE = re.compile(r"^\s*\[?(\d+)\]?\s*[.)、:：]?\s+(.*\S)\s*$")
+
+
+class BatchTranslationService(BaseTranslationService):
+    """批量翻译服务
+
+    批量翻译模式：把大量短文本按 token 预算打包进尽量少的 LLM 调用
+    1. 先查翻译缓存与翻译记忆（仅精确命中），命中的条目不再请求上游；批量回复只写入
+       以批量提示词为键的条目，不会被简易翻译复用，而简易翻译的结果可被批量复用
+    2. 未命中条目按 `batch_max_tokens` / `batch_max_items` 分组，并发调用
+    3. 回复按编号逐条对齐，缺失/错位的条目回退为单条翻译
+    """
+
+    async def translate(
+        self,
+        request: BatchTranslateRequest,
+        engine_config: EngineConfig,
+        cache_policy: CachePolicy | None = None,
+        hedge_config: EngineConfig | None = None,
+    ) -> BatchTranslateResponse:
+        engine = self.create_engine(engine_config, hedge_config)
+        cache_policy = cache_policy or CachePolicy()
+        options: dict[str, Any] = {}
+        if request.prompt:
+            options["prompt"] = request.prompt
+
+        # 批量回复按实际使用的批量提示词写入翻译缓存与翻译记忆，简易翻译不会命中这些条目；
+        # 读取时两种键都查：单条翻译（含本服务的单条回退）的结果对批量同样适用
+        batch_options = {
+            "system_prompt": build_batch_translation_system_prompt(
+                source_lang=request.source_lang,
+                target_lang=request.target_lang,
+                additional_instructions=request.prompt or "",
+            )
+        }
+
+        texts = [item.text for item in request.items]
+        translations: dict[int, TranslationResult] = {}
+        pending: list[int] = []
+        for index, text in enumerate(texts):
+            if not text.strip():
+                translations[index] = self._result(text="", request=request)
+                continue
+            reused = await self._reuse(
+                engine,
+                engine_config,
+                text=text,
+                request=request,
+                variants=(batch_options, options),
+                cache_policy=cache_policy,
+            )
+            if reused is not None:
+                translations[index] = self._result(text=reused, request=request)
+                continue
+            pending.append(index)
+
+        semaphore = asyncio.Semaphore(max(1, settings.batch_concurrency))
+        llm_calls = 0
+
+        async def run_group(group: list[int]) -> list[int]:
+            """翻译一组条目，返回需要单条回退的下标"""
+            nonlocal llm_calls
+            if len(group) == 1:
+                return group
+            numbered = [(n, texts[index]) for n, index in enumerate(group, start=1)]
+            async with semaphore:
+                llm_calls += 1
+                result = await engine.translate(
+                    text=build_batch_user_content(numbered),
+                    source_lang=request.source_lang,
+                    target_lang=request.target_lang,
+                    options=batch_options,
+                )
+            if not result.success:
+                return group
+
+            aligned = self._parse_batch_reply(result.text, expected=len(group))
+            missing: list[int] = []
+            for n, index in enumerate(group, start=1):
+                text = aligned.get(n)
+                if text is None:
+                    missing.append(index)
+                    continue
+                translations[index] = self._result(text=text, request=request)
+                if translation_cache is not None and cache_policy.write:
+                    key = self.cache_key(
+                        engine,
+                        engine_config,
+                        text=texts[index],
+                        source_lang=request.source_lang,
+                        target_lang=request.target_lang,
+                        options=batch_options,
+                    )
+                    await translation_cache.set(key, text)
+                await self.remember(
+                    engine,
+                    engine_config,
+                    text=texts[index],
+                    translation=text,
+                    source_lang=request.source_lang,
+                    target_lang=request.target_lang,
+                    options=batch_options,
+                    cache_policy=cache_policy,
+                )
+            return missing
+
+        async def run_single(index: int) -> None:
+            nonlocal llm_calls
+            async with semaphore:
+                llm_calls += 1
+                translations[index] = await self.translate_with_cache(
+                    engine,
+                    engine_config,
+                    text=texts[index],
+                    source_lang=request.source_lang,
+                    target_lang=request.target_lang,
+                    options=options,
+                    cache_policy=CachePolicy(read=False, write=cache_policy.write),
+                )
+
+        groups = self._pack(pending, texts)
+        fallbacks = await asyncio.gather(*(run_group(group) for group in groups))
+        await asyncio.gather(*(run_single(index) for missing in fallbacks for index in missing))
+
+        results: list[BatchItemResult] = []
+        for index, item in enumerate(request.items):
+            r = translations[index]
+            results.append(
+                BatchItemResult(
+                    index=index,
+                    id=item.id,
+                    translated_text=r.text,
+                    success=r.success,
+                    error=r.error,
+                )
+            )
+
+        return BatchTranslateResponse(
+            results=results,
+            source_lang=request.source_lang,
+            target_lang=request.target_lang,
+            engine=request.engine or "custom",
+            llm_calls=llm_calls,
+        )
+
+    async def _reuse(
+        self,
+        engine,
+        engine_config: EngineConfig,
+        *,
+        text: str,
+        request: BatchTranslateRequest,
+        variants: tuple[dict[str, Any], ...],
+        cache_policy: CachePolicy,
+    ) -> str | None:
+        """依次按各组提示词选项查询翻译缓存与翻译记忆（仅精确命中），返回可复用的译文"""
+        if translation_cache is not None and cache_policy.read:
+            # 各组选项一次查完，每个条目只计一次命中或未命中
+            keys = [
+                self.cache_key(
+                    engine,
+                    engine_config,
+                    text=text,
+                    source_lang=request.source_lang,
+                    target_lang=request.target_lang,
+                    options=variant,
+                )
+                for variant in variants
+            ]
+            cached = await translation_cache.get_first(keys)
+            if cached is not None:
+                return cached
+        for variant in variants:
+            memory = await self.recall(
+                text=text,
+                source_lang=request.source_lang,
+                target_lang=request.target_lang,
+                options=variant,
+                cache_policy=cache_policy,
+                fuzzy=False,
+            )
+            if memory is not None and memory.exact is not None:
+                return memory.exact.target
+        return None
+
+    @staticmethod
+    def _result(*, text: str, request: BatchTranslateRequest) -> TranslationResult:
+        return TranslationResult(
+            text=text,
+            source_lang=request.source_lang,
+            target_lang=request.target_lang,
+            success=True,
+        )
+
+    @staticmethod
+    def _pack(indices: list[int], texts: list[str]) -> list[list[int]]:
+        """按 token 预算与条数上限把条目贪心打包成组（保持原顺序）"""
+        groups: list[list[int]] = []
+        current: list[int] = []
+        budget = 0
+        for index in indices:
+            cost = estimate_tokens(texts[index]) + _ITEM_OVERHEAD_TOKENS
+            if current and (
+                budget + cost > settings.batch_max_tokens or len(current) >= settings.batch_max_items
+            ):
+                groups.append(current)
+                current, budget = [], 0
+            current.append(index)
+            budget += cost
+        if current:
+            groups.append(current)
+        return groups
+
+    @staticmethod
+    def _parse_batch_reply(text: str, *, expected: int) -> dict[int, str]:
+        """解析批量回复，返回 {编号: 译文}；编号越界、重复或译文为空的条目视为未对齐"""
+        pairs: list[tuple[Any, Any]] = []
+        raw = (text or "").strip()
+        start = min((i for i in (raw.find("{"), raw.find("[")) if i >= 0), default=-1)
+        end = max(raw.rfind("}"), raw.rfind("]"))
+        parsed: Any = None
+        if start >= 0 and end > start:
+            try:
+                parsed = json.loads(raw[start : end + 1])
+            except ValueError:
+                parsed = None
+
+        if isinstance(parsed, dict):
+            parsed = parsed.get("translations")
+        if isinstance(parsed, list):
+            for entry in parsed:
+                if isinstance(entry, dict):
+                    pairs.append((entry.get("i"), entry.get("t")))
+        if not pairs:
+            # 不是预期的 JSON（包括 “[2] 译文” 这类行被误当成 JSON 数组的情况）时按编号行解析
+            for line in raw.splitlines():
+                match = _NUMBERED_LINE.match(line)
+                if match:
+                    pairs.append((match.group(1), match.group(2)))
+
+        aligned: dict[int, str] = {}
+        duplicated: set[int] = set()
+        for number, translated in pairs:
+            try:
+                n = int(number)
+            except (TypeError, ValueError):
+                continue
+            if not 1 <= n <= expected or not isinstance(translated, str) or not translated.strip():
+                continue
+            if n in aligned:
+                duplicated.add(n)
+            aligned[n] = translated.strip()
+        for n in duplicated:
+            aligned.pop(n, None)
+        return aligned
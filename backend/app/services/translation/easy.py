@@ -1,45 +1,60 @@
 """简易翻译服务"""
 
+from typing import Any, AsyncIterator
+
+from app.engines.usage import TokenUsage
 from app.models.translation import (
     EasyTranslateRequest,
     EasyTranslateResponse,
 )
 from app.services.translation.base import BaseTranslationService
-from app.dependencies import EngineConfig
+from app.dependencies import CachePolicy, EngineConfig
 from app.errors import ApiError
+from app.glossary import glossaries
 
 
 class EasyTranslationService(BaseTranslationService):
     """简易翻译服务
 
-    简易翻译模式：单引擎快速翻译，支持自定义提示词
+    简易翻译模式：单引擎快速翻译，支持自定义提示词与术语表
     """
 
     async def translate(
         self,
         request: EasyTranslateRequest,
         engine_config: EngineConfig,
+        cache_policy: CachePolicy | None = None,
+        hedge_config: EngineConfig | None = None,
     ) -> EasyTranslateResponse:
         """执行简易翻译
 
         Args:
             request: 翻译请求
             engine_config: 引擎配置
+            cache_policy: 缓存策略（默认读写缓存）
+            hedge_config: 对冲请求的备用引擎配置（可选）
 
         Returns:
             翻译响应
         """
-        engine = self.create_engine(engine_config)
+        engine = self.create_engine(engine_config, hedge_config)
 
         options = {}
         if request.prompt:
             options["prompt"] = request.prompt
+        if request.glossary:
+            options["glossary"] = glossaries.resolve(
+                request.glossary, source_lang=request.source_lang, target_lang=request.target_lang
+            )
 
-        result = await engine.translate(
+        result = await self.translate_segmented(
+            engine,
+            engine_config,
             text=request.text,
             source_lang=request.source_lang,
             target_lang=request.target_lang,
             options=options,
+            cache_policy=cache_policy,
         )
 
         if not result.success:
@@ -55,4 +70,65 @@ class EasyTranslationService(BaseTranslationService):
             source_lang=result.source_lang,
             target_lang=result.target_lang,
             engine=request.engine or "custom",
+            usage=self.usage_info(result.usage),
+        )
+
+    async def translate_stream(
+        self,
+        request: EasyTranslateRequest,
+        engine_config: EngineConfig,
+        cache_policy: CachePolicy | None = None,
+        hedge_config: EngineConfig | None = None,
+    ) -> AsyncIterator[tuple[str, Any]]:
+        """执行流式简易翻译
+
+        依次产出：
+        - ("delta", str)：增量译文
+        - ("final", EasyTranslateResponse)：完整结果
+
+        长文本会分段并发生成，增量仍按原文顺序产出；命中缓存时整段译文作为一个 delta 产出。
+        上游调用失败时抛出 ApiError（由路由转成 error 事件）。
+        """
+        engine = self.create_engine(engine_config, hedge_config)
+
+        usage = TokenUsage()
+        options: dict = {"usage": usage}
+        if request.prompt:
+            options["prompt"] = request.prompt
+        if request.glossary:
+            options["glossary"] = glossaries.resolve(
+                request.glossary, source_lang=request.source_lang, target_lang=request.target_lang
+            )
+
+        parts: list[str] = []
+        try:
+            async for delta in self.stream_segmented(
+                engine,
+                engine_config,
+                text=request.text,
+                source_lang=request.source_lang,
+                target_lang=request.target_lang,
+                options=options,
+                cache_policy=cache_policy,
+            ):
+                parts.append(delta)
+                yield ("delta", delta)
+        except Exception as e:
+            raise ApiError(
+                502,
+                "upstream_translation_failed",
+                "上游翻译服务调用失败",
+                {"error": str(e)},
+            )
+        translated_text = "".join(parts).strip()
+
+        yield (
+            "final",
+            EasyTranslateResponse(
+                translated_text=translated_text,
+                source_lang=request.source_lang,
+                target_lang=request.target_lang,
+                engine=request.engine or "custom",
+                usage=self.usage_info(usage),
+            ),
         )
@@ -0,0 +1,190 @@
+"""Vibe 裁判输出的增量 JSON 解析
+
+裁判模型按 `app/prompts/vibe.py` 约定的结构输出：
+
+    {"scores": [{...}, {...}], "final": {"translation": "...", ...}}
+
+流式接收时，`IncrementalJudgeParser` 逐字符扫描已到达的文本：
+- `scores` 数组中的每个对象一闭合，立即产出 ("score", dict)
+- `final.translation` 字符串边到达边解码，产出 ("final_delta", str)
+
+完整文本仍由调用方在结束后整体解析，增量事件只用于提前展示。
+"""
+
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from typing import Any, Literal
+
+JudgeStreamEvent = tuple[Literal["score", "final_delta"], Any]
+
+_SIMPLE_ESCAPES = {
+    '"': '"',
+    "\\": "\\",
+    "/": "/",
+    "b": "\b",
+    "f": "\f",
+    "n": "\n",
+    "r": "\r",
+    "t": "\t",
+}
+
+
+@dataclass
+class _Frame:
+    kind: Literal["obj", "arr"]
+    start: int
+    key: str | None = None
+    expect_key: bool = False
+
+
+class IncrementalJudgeParser:
+    """裁判 JSON 的增量解析器（容忍 JSON 前后的代码块标记等杂项文本）"""
+
+    def __init__(self) -> None:
+        self._buffer: list[str] = []
+        self._pos = 0
+        self._stack: list[_Frame] = []
+        self._finished = False
+        self._top_span: tuple[int, int] | None = None
+
+        self._in_string = False
+        self._string_is_key = False
+        self._string_raw: list[str] = []
+        self._escape: str | None = None
+        self._stream_string = False
+        self._pending_high_surrogate: str | None = None
+
+    @property
+    def text(self) -> str:
+        """目前为止收到的完整原始文本"""
+        return "".join(self._buffer)
+
+    def result(self) -> dict[str, Any]:
+        """顶层对象已闭合时返回解析结果，否则返回空字典"""
+        if self._top_span is None:
+            return {}
+        start, end = self._top_span
+        try:
+            parsed = json.loads("".join(self._buffer[start:end]))
+        except ValueError:
+            return {}
+        return parsed if isinstance(parsed, dict) else {}
+
+    def feed(self, chunk: str) -> list[JudgeStreamEvent]:
+        events: list[JudgeStreamEvent] = []
+        decoded: list[str] = []
+        for ch in chunk:
+            self._buffer.append(ch)
+            self._step(ch, events, decoded)
+            self._pos += 1
+        if decoded:
+            events.append(("final_delta", "".join(decoded)))
+        return events
+
+    def _step(self, ch: str, events: list[JudgeStreamEvent], decoded: list[str]) -> None:
+        if self._finished:
+            return
+
+        if self._in_string:
+            self._string_raw.append(ch)
+            if self._escape is not None:
+                self._escape += ch
+                self._consume_escape(decoded)
+                return
+            if ch == "\\":
+                self._escape = ""
+                return
+            if ch == '"':
+                self._string_raw.pop()
+                self._close_string()
+                return
+            if self._stream_string:
+                decoded.append(ch)
+            return
+
+        if not self._stack:
+            # 顶层对象开始前的杂项（例如 ```json）直接忽略
+            if ch == "{":
+                self._stack.append(_Frame("obj", self._pos, expect_key=True))
+            return
+
+        frame = self._stack[-1]
+        if ch == '"':
+            self._in_string = True
+            self._string_is_key = frame.kind == "obj" and frame.expect_key
+            self._string_raw = []
+            self._stream_string = not self._string_is_key and self._path() == ["final", "translation"]
+        elif ch == "{":
+            self._stack.append(_Frame("obj", self._pos, expect_key=True))
+        elif ch == "[":
+            self._stack.append(_Frame("arr", self._pos))
+        elif ch == ",":
+            if frame.kind == "obj":
+                frame.expect_key = True
+                frame.key = None
+        elif ch in "}]":
+            closed = self._stack.pop()
+            if closed.kind == "obj" and self._path() == ["scores", None]:
+                self._emit_score(closed, events)
+            if not self._stack:
+                self._finished = True
+                self._top_span = (closed.start, self._pos + 1)
+
+    def _path(self) -> list[str | None]:
+        """当前所在位置的键路径（数组层记为 None）"""
+        return [f.key if f.kind == "obj" else None for f in self._stack]
+
+    def _close_string(self) -> None:
+        self._in_string = False
+        self._stream_string = False
+        if not self._string_is_key:
+            return
+        try:
+            key = json.loads('"' + "".join(self._string_raw) + '"')
+        except ValueError:
+            key = "".join(self._string_raw)
+        frame = self._stack[-1]
+        frame.key = key
+        frame.expect_key = False
+
+    def _consume_escape(self, decoded: list[str]) -> None:
+        seq = self._escape or ""
+        if seq[0] == "u":
+            if len(seq) < 5:
+                return
+            char = chr(int(seq[1:5], 16)) if _is_hex(seq[1:5]) else ""
+        else:
+            char = _SIMPLE_ESCAPES.get(seq[0], seq[0])
+        self._escape = None
+        if not self._stream_string or not char:
+            return
+
+        # 代理对（\\uD83D\\uDE00）需要两段合并后再输出
+        code = ord(char)
+        if 0xD800 <= code <= 0xDBFF:
+            self._pending_high_surrogate = char
+            return
+        if 0xDC00 <= code <= 0xDFFF and self._pending_high_surrogate:
+            high = ord(self._pending_high_surrogate)
+            self._pending_high_surrogate = None
+            char = chr(0x10000 + ((high - 0xD800) << 10) + (code - 0xDC00))
+        decoded.append(char)
+
+    def _emit_score(self, frame: _Frame, events: list[JudgeStreamEvent]) -> None:
+        raw = "".join(self._buffer[frame.start : self._pos + 1])
+        try:
+            item = json.loads(raw)
+        except ValueError:
+            return
+        if isinstance(item, dict):
+            events.append(("score", item))
+
+
+def _is_hex(value: str) -> bool:
+    try:
+        int(value, 16)
+    except ValueError:
+        return False
+    return True
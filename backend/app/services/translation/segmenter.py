@@ -0,0 +1,118 @@
+"""长文本分段
+
+按段落 → 句子 → 字符的顺序把长文本切成不超过 token 预算的片段，
+各片段可并发翻译后按原顺序、原分隔符拼回。
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+
+from app.engines.base import estimate_tokens
+
+# 段落之间的空行（保留原样作为分隔符）
+_PARAGRAPH_BREAK = re.compile(r"\n[ \t]*\n\s*")
+# 句末标点（含其后紧跟的引号/括号）及随后的空白
+_SENTENCE_END = re.compile(r"(?<=[。！？!?；;…])[”’」』）)\"']*\s*|(?<=\.)[”’\"')]*\s+")
+
+
+@dataclass
+class Segment:
+    """一个待翻译片段；separator 为其后紧跟的原文分隔空白"""
+
+    text: str
+    separator: str = ""
+
+
+def split_segments(text: str, max_tokens: int) -> list[Segment]:
+    """把文本切分为不超过 max_tokens 的片段（无需切分时返回单个片段）"""
+    body = text.strip()
+    if not body:
+        return []
+    if max_tokens <= 0 or estimate_tokens(body) <= max_tokens:
+        return [Segment(body)]
+
+    units: list[Segment] = []
+    for paragraph in _split_keep(body, _PARAGRAPH_BREAK):
+        if estimate_tokens(paragraph.text) <= max_tokens:
+            units.append(paragraph)
+            continue
+        sentences = _split_keep(paragraph.text, _SENTENCE_END)
+        sentences[-1].separator += paragraph.separator
+        for sentence in sentences:
+            if estimate_tokens(sentence.text) <= max_tokens:
+                units.append(sentence)
+            else:
+                units.extend(_hard_split(sentence, max_tokens))
+
+    return _pack(units, max_tokens)
+
+
+def join_segments(translations: list[str], segments: list[Segment]) -> str:
+    """按原分隔符拼接各片段译文"""
+    return "".join(t + seg.separator for t, seg in zip(translations, segments)).strip()
+
+
+def _split_keep(text: str, pattern: re.Pattern[str]) -> list[Segment]:
+    pieces: list[Segment] = []
+    pos = 0
+    for match in pattern.finditer(text):
+        if match.start() <= pos:
+            if pieces:
+                pieces[-1].separator += match.group(0)
+            pos = max(pos, match.end())
+            continue
+        pieces.append(Segment(text[pos : match.start()], match.group(0)))
+        pos = match.end()
+    if pos < len(text):
+        pieces.append(Segment(text[pos:]))
+    return pieces or [Segment(text)]
+
+
+def _hard_split(segment: Segment, max_tokens: int) -> list[Segment]:
+    """没有可用断句点时按字符硬切（尽量在空白处断开）"""
+    pieces: list[Segment] = []
+    rest = segment.text
+    while estimate_tokens(rest) > max_tokens:
+        cut = _max_prefix(rest, max_tokens)
+        space = rest.rfind(" ", 0, cut)
+        if space > cut // 2:
+            cut = space
+        head, tail = rest[:cut], rest[cut:]
+        body, next_rest = head.rstrip(), tail.lstrip()
+        pieces.append(Segment(body, head[len(body) :] + tail[: len(tail) - len(next_rest)]))
+        rest = next_rest
+    pieces.append(Segment(rest, segment.separator))
+    return pieces
+
+
+def _max_prefix(text: str, max_tokens: int) -> int:
+    """满足 token 预算的最长前缀长度（二分查找）"""
+    lo, hi = 1, len(text)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if estimate_tokens(text[:mid]) <= max_tokens:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+def _pack(units: list[Segment], max_tokens: int) -> list[Segment]:
+    """贪心合并相邻单元，使每个片段尽量接近预算"""
+    segments: list[Segment] = []
+    current: Segment | None = None
+    for unit in units:
+        if current is None:
+            current = Segment(unit.text, unit.separator)
+            continue
+        merged = current.text + current.separator + unit.text
+        if estimate_tokens(merged) <= max_tokens:
+            current = Segment(merged, unit.separator)
+        else:
+            segments.append(current)
+            current = Segment(unit.text, unit.separator)
+    if current is not None:
+        segments.append(current)
+    return segments
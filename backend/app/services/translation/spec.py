@@ -1,13 +1,20 @@
 """规范翻译服务"""
 
+from contextlib import aclosing
+from typing import Any, AsyncIterator
+
+from app.engines.usage import TokenUsage
+from app.models.blueprint import SpecBlueprintRequest, SpecBlueprintResponse
 from app.models.translation import (
     SpecTranslateRequest,
     SpecTranslateResponse,
     TranslationDecision,
 )
 from app.services.translation.base import BaseTranslationService
-from app.dependencies import EngineConfig
+from app.services.translation.spec_blueprint import SpecBlueprintService
+from app.dependencies import CachePolicy, EngineConfig
 from app.errors import ApiError
+from app.glossary import glossaries
 from app.prompts.spec import build_spec_blueprint_instructions
 
 
@@ -20,32 +27,40 @@ class SpecTranslationService(BaseTranslationService):
     - 翻译方法：直译、意译、平衡
     - 翻译策略：归化、异化
     - 额外上下文信息
+    - 术语表（techniques.useTerminology + terminologySource）
     """
 
     async def translate(
         self,
         request: SpecTranslateRequest,
         engine_config: EngineConfig,
+        cache_policy: CachePolicy | None = None,
+        hedge_config: EngineConfig | None = None,
     ) -> SpecTranslateResponse:
         """执行规范翻译
 
         Args:
             request: 翻译请求（包含蓝图配置）
             engine_config: 引擎配置
+            cache_policy: 缓存策略（默认读写缓存）
+            hedge_config: 对冲请求的备用引擎配置（可选）
 
         Returns:
             包含翻译结果和决策说明的响应
         """
-        engine = self.create_engine(engine_config)
+        engine = self.create_engine(engine_config, hedge_config)
 
-        # 构建基于蓝图的提示词
-        blueprint_prompt = build_spec_blueprint_instructions(request.blueprint)
+        # 构建基于蓝图的提示词与术语表
+        options = self._blueprint_options(request)
 
-        result = await engine.translate(
+        result = await self.translate_segmented(
+            engine,
+            engine_config,
             text=request.text,
             source_lang=request.source_lang,
             target_lang=request.target_lang,
-            options={"prompt": blueprint_prompt},
+            options=options,
+            cache_policy=cache_policy,
         )
 
         if not result.success:
@@ -65,8 +80,130 @@ class SpecTranslationService(BaseTranslationService):
             target_lang=result.target_lang,
             blueprint_applied=request.blueprint,
             decisions=decisions,
+            extracted_terms=self._extracted_terms(request, options),
+            usage=self.usage_info(result.usage),
         )
 
+    async def translate_stream(
+        self,
+        request: SpecTranslateRequest,
+        engine_config: EngineConfig,
+        cache_policy: CachePolicy | None = None,
+        hedge_config: EngineConfig | None = None,
+    ) -> AsyncIterator[tuple[str, Any]]:
+        """执行流式规范翻译
+
+        依次产出：
+        - ("delta", str)：增量译文
+        - ("final", SpecTranslateResponse)：完整结果
+
+        上游调用失败时抛出 ApiError。
+        """
+        engine = self.create_engine(engine_config, hedge_config)
+
+        usage = TokenUsage()
+        options = {**self._blueprint_options(request), "usage": usage}
+        parts: list[str] = []
+        try:
+            async for delta in self.stream_segmented(
+                engine,
+                engine_config,
+                text=request.text,
+                source_lang=request.source_lang,
+                target_lang=request.target_lang,
+                options=options,
+                cache_policy=cache_policy,
+            ):
+                parts.append(delta)
+                yield ("delta", delta)
+        except Exception as e:
+            raise ApiError(
+                502,
+                "upstream_translation_failed",
+                "上游翻译服务调用失败",
+                {"error": str(e)},
+            )
+
+        yield (
+            "final",
+            SpecTranslateResponse(
+                translated_text="".join(parts).strip(),
+                source_lang=request.source_lang,
+                target_lang=request.target_lang,
+                blueprint_applied=request.blueprint,
+                decisions=self._generate_decisions(request.blueprint),
+                extracted_terms=self._extracted_terms(request, options),
+                usage=self.usage_info(usage),
+            ),
+        )
+
+    async def translate_auto_stream(
+        self,
+        request: SpecTranslateRequest,
+        engine_config: EngineConfig,
+        cache_policy: CachePolicy | None = None,
+        hedge_config: EngineConfig | None = None,
+    ) -> AsyncIterator[tuple[str, Any]]:
+        """一次调用完成“生成蓝图 + 规范翻译”（流式）
+
+        1. 为已启用但尚无 AI 结果的理论并发生成分析（复用 SpecBlueprintService，命中分析缓存时跳过）
+        2. 最后一个分析完成后立即在本地组装提示词分块并开始翻译，省去前端的第二次往返
+
+        依次产出：
+        - ("theory_delta" / "analysis" / "theory_error", ...)：同 SpecBlueprintService 的流式事件
+        - ("blueprint", SpecBlueprintResponse)：生成完成的蓝图（含 prompt_blocks）
+        - ("delta", str) / ("final", SpecTranslateResponse)：同 translate_stream
+        """
+        blueprint_service = SpecBlueprintService()
+        blueprint_events = blueprint_service.generate_blueprint_stream(
+            SpecBlueprintRequest(
+                text=request.text,
+                source_lang=request.source_lang,
+                target_lang=request.target_lang,
+                blueprint=request.blueprint,
+            ),
+            engine_config,
+            cache_policy,
+            missing_only=True,
+        )
+
+        blueprint_response: SpecBlueprintResponse | None = None
+        async with aclosing(blueprint_events) as events:
+            async for kind, payload in events:
+                if kind == "delta":
+                    yield ("theory_delta", payload)
+                elif kind == "final":
+                    blueprint_response = payload
+                    yield ("blueprint", payload)
+                else:
+                    yield (kind, payload)
+
+        async for event in self.translate_stream(
+            request.model_copy(update={"blueprint": blueprint_response.blueprint}),
+            engine_config,
+            cache_policy,
+            hedge_config,
+        ):
+            yield event
+
+    @staticmethod
+    def _blueprint_options(request: SpecTranslateRequest) -> dict:
+        """蓝图对应的翻译选项：提示词分块，以及启用术语时引用的术语表（须与请求语言对一致）"""
+        blueprint = request.blueprint
+        options: dict = {"prompt": build_spec_blueprint_instructions(blueprint)}
+        techniques = blueprint.techniques
+        if techniques.use_terminology and techniques.terminology_source:
+            options["glossary"] = glossaries.resolve(
+                techniques.terminology_source, source_lang=request.source_lang, target_lang=request.target_lang
+            )
+        return options
+
+    def _extracted_terms(self, request: SpecTranslateRequest, options: dict) -> list[dict] | None:
+        """techniques.extractTerms 开启时返回原文中命中的术语表条目"""
+        if not request.blueprint.techniques.extract_terms:
+            return None
+        return self.extracted_terms(request.text, options)
+
     def _generate_decisions(self, blueprint) -> list[TranslationDecision]:
         """生成翻译决策说明
 
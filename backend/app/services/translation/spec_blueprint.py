@@ -2,13 +2,22 @@
 
 from __future__ import annotations
 
-from app.dependencies import EngineConfig
+import asyncio
+from contextlib import aclosing
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable
+
+from app.cache import analysis_cache, build_analysis_cache_key
+from app.dependencies import CachePolicy, EngineConfig
 from app.errors import ApiError
 from app.models.blueprint import (
     DTSTheoryConfig,
     EquivalenceTheoryConfig,
     FunctionalismTheoryConfig,
     SpecBlueprintRequest,
+    SpecBlueprintResponse,
+    PromptBlock,
+    TheoryAnalysisError,
     TranslationBlueprint,
 )
 from app.prompts.blueprint import (
@@ -18,51 +27,264 @@ from app.prompts.blueprint import (
     build_equivalence_suggestion_prompts,
 )
 from app.services.translation.base import BaseTranslationService
+from app.services.translation.streaming import merge_streams
+
+
+@dataclass(frozen=True)
+class TheoryAnalyzer:
+    """需要 AI 分析的理论：构建提示词，结果写回理论配置的 result_field 字段"""
+
+    theory_id: str
+    config_type: type
+    result_field: str
+    error_message: str
+    build_prompts: Callable[[Any, SpecBlueprintRequest], tuple[str, str]]
+
+
+def _equivalence_prompts(cfg: EquivalenceTheoryConfig, request: SpecBlueprintRequest) -> tuple[str, str]:
+    if not cfg.definition:
+        cfg.definition = EQUIVALENCE_DEFINITION
+    return build_equivalence_suggestion_prompts(
+        definition=cfg.definition,
+        source_lang=request.source_lang,
+        target_lang=request.target_lang,
+        source_text=request.text,
+    )
+
+
+def _dts_prompts(cfg: DTSTheoryConfig, request: SpecBlueprintRequest) -> tuple[str, str]:
+    return build_dts_analysis_prompts(
+        source_lang=request.source_lang,
+        target_lang=request.target_lang,
+        reference_source=cfg.reference_source,
+        reference_translation=cfg.reference_translation,
+        source_text=request.text,
+    )
+
+
+# 理论分析注册表：新增需要 AI 分析的理论时在这里登记即可
+THEORY_ANALYZERS: dict[str, TheoryAnalyzer] = {
+    "equivalence": TheoryAnalyzer(
+        theory_id="equivalence",
+        config_type=EquivalenceTheoryConfig,
+        result_field="ai_suggestion",
+        error_message="上游模型生成对等理论建议失败",
+        build_prompts=_equivalence_prompts,
+    ),
+    "dts": TheoryAnalyzer(
+        theory_id="dts",
+        config_type=DTSTheoryConfig,
+        result_field="ai_analysis",
+        error_message="上游模型生成 DTS 分析失败",
+        build_prompts=_dts_prompts,
+    ),
+}
+
+
+@dataclass
+class AnalysisJob:
+    """一次待执行的理论分析"""
+
+    analyzer: TheoryAnalyzer
+    config: Any
+    system_prompt: str
+    user_content: str
+    cache_key: str | None = None
 
 
 class SpecBlueprintService(BaseTranslationService):
     async def generate_blueprint(
-        self, request: SpecBlueprintRequest, engine_config: EngineConfig
-    ) -> TranslationBlueprint:
+        self,
+        request: SpecBlueprintRequest,
+        engine_config: EngineConfig,
+        cache_policy: CachePolicy | None = None,
+    ) -> SpecBlueprintResponse:
+        """生成蓝图：所有启用理论的 AI 分析并发执行，单个理论失败只记录在 errors 中
+
+        理论分析结果按内容缓存：只调整方法/策略权重后重新生成蓝图时，
+        分析直接命中缓存，只有 prompt_blocks 在本地重新组装。
+        """
         engine = self.create_engine(engine_config)
+        cache_policy = cache_policy or CachePolicy()
 
         blueprint = request.blueprint
         self._normalize_theory_configs(blueprint)
 
-        eq_cfg = self._get_cfg(blueprint, "equivalence")
-        dts_cfg = self._get_cfg(blueprint, "dts")
+        jobs = self._analysis_jobs(request, engine, engine_config)
+        outcomes = await asyncio.gather(
+            *(self._run_analysis(engine, job, request, cache_policy) for job in jobs)
+        )
+        errors = [error for error in outcomes if error is not None]
+
+        blueprint.prompt_blocks = build_blueprint_default_prompt_blocks(blueprint)
+        return SpecBlueprintResponse(blueprint=blueprint, errors=errors)
 
-        if isinstance(eq_cfg, EquivalenceTheoryConfig) and eq_cfg.enabled:
-            if not eq_cfg.definition:
-                eq_cfg.definition = EQUIVALENCE_DEFINITION
-            eq_cfg.ai_suggestion = await self._generate_equivalence_suggestion(
-                engine=engine,
-                definition=eq_cfg.definition,
+    async def generate_blueprint_stream(
+        self,
+        request: SpecBlueprintRequest,
+        engine_config: EngineConfig,
+        cache_policy: CachePolicy | None = None,
+        *,
+        missing_only: bool = False,
+    ) -> AsyncIterator[tuple[str, Any]]:
+        """流式生成蓝图：各理论分析并发生成，逐段推送
+
+        依次产出（各理论之间交错）：
+        - ("delta", {"theory_id", "delta"})：某个理论分析的增量文本
+        - ("analysis", {"theory_id", "field", "content"})：某个理论分析完成
+        - ("theory_error", TheoryAnalysisError)：某个理论分析失败（不影响其他理论）
+        - ("final", SpecBlueprintResponse)：全部完成后的蓝图（含 prompt_blocks）
+
+        命中分析缓存的理论不产出 delta，直接产出 analysis。
+        missing_only 为 True 时跳过请求中已带有 AI 结果的理论，并保留请求中（可能被用户编辑过的）
+        prompt_blocks，只替换本次补全了分析的理论分块。
+        """
+        engine = self.create_engine(engine_config)
+        cache_policy = cache_policy or CachePolicy()
+
+        blueprint = request.blueprint
+        self._normalize_theory_configs(blueprint)
+
+        jobs: dict[str, AnalysisJob] = {}
+        refreshed: set[str] = set()
+        for job in self._analysis_jobs(request, engine, engine_config):
+            if missing_only and getattr(job.config, job.analyzer.result_field):
+                continue
+            cached = await self._cached_analysis(job, cache_policy)
+            if cached is None:
+                jobs[job.analyzer.theory_id] = job
+                continue
+            setattr(job.config, job.analyzer.result_field, cached)
+            refreshed.add(job.analyzer.theory_id)
+            yield ("analysis", self._analysis_payload(job, cached))
+
+        streams = {
+            theory_id: engine.translate_stream(
+                text=job.user_content,
                 source_lang=request.source_lang,
                 target_lang=request.target_lang,
-                source_text=request.text,
+                options={"system_prompt": job.system_prompt},
             )
+            for theory_id, job in jobs.items()
+        }
+        parts: dict[str, list[str]] = {theory_id: [] for theory_id in jobs}
+        errors: list[TheoryAnalysisError] = []
+        async with aclosing(merge_streams(streams)) as events:
+            async for theory_id, kind, value in events:
+                job = jobs[theory_id]
+                if kind == "item":
+                    parts[theory_id].append(value)
+                    yield ("delta", {"theory_id": theory_id, "delta": value})
+                elif kind == "done":
+                    content = "".join(parts[theory_id]).strip()
+                    setattr(job.config, job.analyzer.result_field, content)
+                    refreshed.add(theory_id)
+                    await self._store_analysis(job, content, cache_policy)
+                    yield ("analysis", self._analysis_payload(job, content))
+                else:
+                    error = self._analysis_error(
+                        job,
+                        ApiError(
+                            502,
+                            "upstream_blueprint_failed",
+                            job.analyzer.error_message,
+                            {"error": str(value)},
+                        ),
+                    )
+                    errors.append(error)
+                    yield ("theory_error", error)
 
-        if isinstance(dts_cfg, DTSTheoryConfig) and dts_cfg.enabled:
-            dts_cfg.ai_analysis = await self._generate_dts_analysis(
-                engine=engine,
-                reference_source=dts_cfg.reference_source,
-                reference_translation=dts_cfg.reference_translation,
-                source_text=request.text,
-                source_lang=request.source_lang,
-                target_lang=request.target_lang,
+        defaults = build_blueprint_default_prompt_blocks(blueprint)
+        if missing_only and blueprint.prompt_blocks:
+            blueprint.prompt_blocks = self._merge_prompt_blocks(
+                blueprint.prompt_blocks, defaults, {f"theory.{theory_id}" for theory_id in refreshed}
             )
+        else:
+            blueprint.prompt_blocks = defaults
+        yield ("final", SpecBlueprintResponse(blueprint=blueprint, errors=errors))
 
-        blueprint.prompt_blocks = build_blueprint_default_prompt_blocks(blueprint)
-        return blueprint
+    @staticmethod
+    def _merge_prompt_blocks(
+        existing: list[PromptBlock], defaults: list[PromptBlock], refreshed: set[str]
+    ) -> list[PromptBlock]:
+        """保留已有分块，只用默认分块替换（或补上）refreshed 中的分块"""
+        replacements = {block.id: block for block in defaults if block.id in refreshed}
+        merged = [replacements.pop(block.id, block) for block in existing]
+        return merged + list(replacements.values())
+
+    def _analysis_jobs(
+        self, request: SpecBlueprintRequest, engine, engine_config: EngineConfig
+    ) -> list[AnalysisJob]:
+        """列出已启用且注册了分析器的理论（需先 _normalize_theory_configs）"""
+        jobs: list[AnalysisJob] = []
+        for cfg in request.blueprint.theory.configs:
+            analyzer = THEORY_ANALYZERS.get(cfg.id)
+            if analyzer is None or not isinstance(cfg, analyzer.config_type) or not cfg.enabled:
+                continue
+            system_prompt, user_content = analyzer.build_prompts(cfg, request)
+            cache_key = None
+            if analysis_cache is not None:
+                cache_key = build_analysis_cache_key(
+                    theory_id=analyzer.theory_id,
+                    channel=engine_config.channel,
+                    model=engine.default_model,
+                    base_url=engine_config.base_url,
+                    system_prompt=system_prompt,
+                    user_content=user_content,
+                )
+            jobs.append(AnalysisJob(analyzer, cfg, system_prompt, user_content, cache_key))
+        return jobs
+
+    @staticmethod
+    async def _cached_analysis(job: AnalysisJob, cache_policy: CachePolicy) -> str | None:
+        if job.cache_key is None or not cache_policy.read:
+            return None
+        return await analysis_cache.get(job.cache_key)
+
+    @staticmethod
+    async def _store_analysis(job: AnalysisJob, content: str, cache_policy: CachePolicy) -> None:
+        if job.cache_key is not None and cache_policy.write and content:
+            await analysis_cache.set(job.cache_key, content)
 
     @staticmethod
-    def _get_cfg(blueprint: TranslationBlueprint, theory_id: str):
-        for cfg in blueprint.theory.configs:
-            if cfg.id == theory_id:
-                return cfg
+    def _analysis_payload(job: AnalysisJob, content: str) -> dict[str, str]:
+        return {
+            "theory_id": job.analyzer.theory_id,
+            "field": job.analyzer.result_field,
+            "content": content,
+        }
+
+    async def _run_analysis(
+        self,
+        engine,
+        job: AnalysisJob,
+        request: SpecBlueprintRequest,
+        cache_policy: CachePolicy,
+    ) -> TheoryAnalysisError | None:
+        """执行一次理论分析（优先读缓存）并回写结果；失败时返回错误信息而不抛出"""
+        cached = await self._cached_analysis(job, cache_policy)
+        if cached is not None:
+            setattr(job.config, job.analyzer.result_field, cached)
+            return None
+        try:
+            text = await self._generate_analysis(
+                engine,
+                job,
+                source_lang=request.source_lang,
+                target_lang=request.target_lang,
+            )
+        except ApiError as e:
+            return self._analysis_error(job, e)
+        setattr(job.config, job.analyzer.result_field, text)
+        await self._store_analysis(job, text, cache_policy)
         return None
 
+    @staticmethod
+    def _analysis_error(job: AnalysisJob, e: ApiError) -> TheoryAnalysisError:
+        return TheoryAnalysisError(
+            theory_id=job.analyzer.theory_id, code=e.code, message=e.message, details=e.details
+        )
+
     @staticmethod
     def _normalize_theory_configs(blueprint: TranslationBlueprint) -> None:
         """确保 theory.configs 至少包含三个理论项，并兼容旧 primary 单选字段。"""
@@ -88,64 +310,20 @@ class SpecBlueprintService(BaseTranslationService):
             existing["dts"],
         ]
 
-    async def _generate_equivalence_suggestion(
-        self,
-        engine,
-        definition: str,
-        source_lang: str,
-        target_lang: str,
-        source_text: str,
+    async def _generate_analysis(
+        self, engine, job: AnalysisJob, *, source_lang: str, target_lang: str
     ) -> str:
-        system_prompt, user_content = build_equivalence_suggestion_prompts(
-            definition=definition,
-            source_lang=source_lang,
-            target_lang=target_lang,
-            source_text=source_text,
-        )
-
-        result = await engine.translate(
-            text=user_content,
-            source_lang=source_lang,
-            target_lang=target_lang,
-            options={"system_prompt": system_prompt},
-        )
-        if not result.success:
-            raise ApiError(
-                502,
-                "upstream_blueprint_failed",
-                "上游模型生成对等理论建议失败",
-                {"error": result.error},
-            )
-        return (result.text or "").strip()
-
-    async def _generate_dts_analysis(
-        self,
-        engine,
-        reference_source: str | None,
-        reference_translation: str | None,
-        source_text: str,
-        source_lang: str,
-        target_lang: str,
-    ) -> str:
-        system_prompt, user_content = build_dts_analysis_prompts(
-            source_lang=source_lang,
-            target_lang=target_lang,
-            reference_source=reference_source,
-            reference_translation=reference_translation,
-            source_text=source_text,
-        )
-
         result = await engine.translate(
-            text=user_content,
+            text=job.user_content,
             source_lang=source_lang,
             target_lang=target_lang,
-            options={"system_prompt": system_prompt},
+            options={"system_prompt": job.system_prompt},
         )
         if not result.success:
             raise ApiError(
                 502,
                 "upstream_blueprint_failed",
-                "上游模型生成 DTS 分析失败",
+                job.analyzer.error_message,
                 {"error": result.error},
             )
         return (result.text or "").strip()
@@ -0,0 +1,57 @@
+"""多路流合并工具
+
+把多个引擎的增量输出合并为一条事件流，供多引擎（Vibe）与多理论分析等场景使用。
+"""
+
+from __future__ import annotations
+
+import asyncio
+from contextlib import aclosing
+from typing import Any, AsyncIterator, Hashable, Literal
+
+StreamEventKind = Literal["item", "done", "error"]
+
+
+async def merge_streams(
+    streams: dict[Hashable, AsyncIterator[Any]],
+    *,
+    max_buffered: int = 64,
+) -> AsyncIterator[tuple[Hashable, StreamEventKind, Any]]:
+    """并发消费多条异步流，按到达顺序交错产出事件
+
+    产出 `(key, kind, value)`：
+    - `("item", value)`：某条流产出的一项
+    - `("done", None)`：该流正常结束
+    - `("error", exc)`：该流抛出异常（不影响其它流）
+
+    各流共享一个有界 FIFO 队列：谁先产出谁先被转发，队列满时快的流会被阻塞，
+    从而避免单个快引擎独占输出。调用方提前退出（或被取消）时，会取消全部未完成的流，
+    并显式关闭各条流（即使取消发生在等待入队时），使其持有的准入名额与上游连接立即释放。
+    """
+    queue: asyncio.Queue[tuple[Hashable, StreamEventKind, Any]] = asyncio.Queue(maxsize=max_buffered)
+
+    async def pump(key: Hashable, stream: AsyncIterator[Any]) -> None:
+        try:
+            async with aclosing(stream):
+                async for item in stream:
+                    await queue.put((key, "item", item))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            await queue.put((key, "error", e))
+            return
+        await queue.put((key, "done", None))
+
+    tasks = [asyncio.create_task(pump(key, stream)) for key, stream in streams.items()]
+    remaining = len(tasks)
+    try:
+        while remaining:
+            key, kind, value = await queue.get()
+            if kind != "item":
+                remaining -= 1
+            yield key, kind, value
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,139 @@
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from app.cache import MemoryTranslationCache
+from app.dependencies import CachePolicy, EngineConfig
+from app.engines.base import TranslationResult
+from app.models.translation import BatchTranslateRequest
+from app.services.translation.batch import BatchTranslationService
+from app.translation_memory import TranslationMemory
+
+
+class _BatchEngine:
+    """批量调用按 reply(items) 回复，单条调用返回 "单:原文" """
+
+    default_model = "m"
+
+    def __init__(self, reply=None):
+        self.reply = reply or (lambda items: json.dumps({"translations": [{"i": i, "t": f"批:{t}"} for i, t in items]}))
+        self.batch_calls = 0
+        self.single_calls: list[str] = []
+
+    async def translate(self, text, source_lang, target_lang, options=None):
+        if "system_prompt" in (options or {}):
+            self.batch_calls += 1
+            items = [(entry["i"], entry["t"]) for entry in json.loads(text)]
+            return TranslationResult(text=self.reply(items), source_lang=source_lang, target_lang=target_lang)
+        self.single_calls.append(text)
+        return TranslationResult(text=f"单:{text}", source_lang=source_lang, target_lang=target_lang)
+
+
+class TestParseBatchReply(unittest.TestCase):
+    parse = staticmethod(BatchTranslationService._parse_batch_reply)
+
+    def test_json_object_with_surrounding_text(self):
+        reply = '好的：\n```json\n{"translations": [{"i": 2, "t": "乙"}, {"i": 1, "t": " 甲 "}]}\n```'
+        self.assertEqual(self.parse(reply, expected=2), {1: "甲", 2: "乙"})
+
+    def test_json_array(self):
+        self.assertEqual(self.parse('[{"i": "1", "t": "甲"}]', expected=1), {1: "甲"})
+
+    def test_drops_missing_duplicated_extra_and_empty_ids(self):
+        reply = json.dumps(
+            {
+                "translations": [
+                    {"i": 1, "t": "甲"},
+                    {"i": 2, "t": "乙"},
+                    {"i": 2, "t": "乙2"},
+                    {"i": 4, "t": "越界"},
+                    {"i": 3, "t": "  "},
+                    {"i": "x", "t": "无效"},
+                ]
+            },
+            ensure_ascii=False,
+        )
+        self.assertEqual(self.parse(reply, expected=3), {1: "甲"})
+
+    def test_numbered_lines_fallback(self):
+        self.assertEqual(self.parse("1. 甲\n[2] 乙\n3) 丙\n说明文字", expected=3), {1: "甲", 2: "乙", 3: "丙"})
+
+    def test_non_json_reply(self):
+        self.assertEqual(self.parse("抱歉，无法翻译。", expected=2), {})
+        self.assertEqual(self.parse('{"translations": [', expected=2), {})
+
+
+class TestBatchTranslationService(unittest.TestCase):
+    def setUp(self):
+        self.config = EngineConfig(api_key="k", base_url="", channel="openai")
+        self.cache = MemoryTranslationCache()
+        self.engine = _BatchEngine()
+        patches = [
+            mock.patch.object(BatchTranslationService, "create_engine", lambda *_: self.engine),
+            mock.patch("app.services.translation.batch.translation_cache", self.cache),
+            mock.patch("app.services.translation.base.translation_cache", self.cache),
+            mock.patch("app.services.translation.base.translation_memory", None),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def run_batch(self, texts, cache_policy=None):
+        request = BatchTranslateRequest(
+            items=[{"id": str(i), "text": text} for i, text in enumerate(texts)], source_lang="en", target_lang="zh"
+        )
+        return asyncio.run(BatchTranslationService().translate(request, self.config, cache_policy))
+
+    def test_groups_items_and_keeps_order(self):
+        response = self.run_batch(["a", "", "b", "c"])
+        self.assertEqual([r.translated_text for r in response.results], ["批:a", "", "批:b", "批:c"])
+        self.assertEqual([r.id for r in response.results], ["0", "1", "2", "3"])
+        self.assertEqual((response.llm_calls, self.engine.batch_calls, self.engine.single_calls), (1, 1, []))
+
+    def test_misaligned_items_fall_back_to_single_calls(self):
+        self.engine.reply = lambda items: json.dumps({"translations": [{"i": 1, "t": "批:a"}, {"i": 1, "t": "x"}]})
+        response = self.run_batch(["a", "b", "c"])
+        self.assertEqual([r.translated_text for r in response.results], ["单:a", "单:b", "单:c"])
+        self.assertEqual(response.llm_calls, 4)
+
+        self.engine.reply = lambda items: "not json"
+        response = self.run_batch(["d", "e"], CachePolicy(read=False, write=False))
+        self.assertEqual([r.translated_text for r in response.results], ["单:d", "单:e"])
+
+    def test_cache_short_circuit_without_leaking_batch_output_to_easy(self):
+        self.run_batch(["a", "b"])
+        again = self.run_batch(["a", "b"])
+        self.assertEqual(again.llm_calls, 0)
+        self.assertEqual([r.translated_text for r in again.results], ["批:a", "批:b"])
+        # 每个条目只计一次命中或未命中（不因按多组提示词选项查找而重复计数）
+        self.assertEqual((self.cache.stats.misses, self.cache.stats.hits), (2, 2))
+
+        # 批量回复不会出现在简易翻译的缓存键下
+        service = BatchTranslationService()
+        easy = asyncio.run(
+            service.translate_with_cache(self.engine, self.config, text="a", source_lang="en", target_lang="zh")
+        )
+        self.assertEqual(easy.text, "单:a")
+        # 而简易翻译的结果可被批量复用
+        mixed = self.run_batch(["a", "z"])
+        self.assertEqual([r.translated_text for r in mixed.results], ["批:a", "单:z"])
+        self.assertEqual(mixed.llm_calls, 1)
+
+    def test_translation_memory_exact_hits_skip_engine(self):
+        fd, path = tempfile.mkstemp(suffix=".sqlite3")
+        os.close(fd)
+        self.addCleanup(lambda: [os.remove(path + s) for s in ("", "-wal", "-shm") if os.path.exists(path + s)])
+        with mock.patch("app.services.translation.base.translation_memory", TranslationMemory(path)):
+            self.run_batch(["one", "two"], CachePolicy(read=True, write=True))
+            self.cache = MemoryTranslationCache()
+            with mock.patch("app.services.translation.batch.translation_cache", None):
+                again = self.run_batch(["one", "two"])
+        self.assertEqual(again.llm_calls, 0)
+        self.assertEqual([r.translated_text for r in again.results], ["批:one", "批:two"])
+
+
+if __name__ == "__main__":
+    unittest.main()
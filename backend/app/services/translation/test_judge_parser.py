@@ -0,0 +1,51 @@
+import json
+import unittest
+
+from app.services.translation.judge_parser import IncrementalJudgeParser
+
+
+def _feed_in_chunks(parser: IncrementalJudgeParser, text: str, size: int):
+    events = []
+    for i in range(0, len(text), size):
+        events.extend(parser.feed(text[i : i + size]))
+    return events
+
+
+class TestIncrementalJudgeParser(unittest.TestCase):
+    def test_scores_and_final_translation_stream(self):
+        payload = {
+            "scores": [
+                {"engine_id": "openai", "accuracy": 8, "comment": "用词 \"准确\""},
+                {"engine_id": "anthropic", "accuracy": 7, "nested": {"a": [1, 2]}},
+            ],
+            "final": {
+                "translation": "第一行\n第二行 😀 \"引号\"",
+                "comment": "不应出现在增量中",
+                "overall": 9,
+            },
+        }
+        text = "```json\n" + json.dumps(payload, ensure_ascii=True) + "\n```"
+
+        for size in (1, 3, 7, len(text)):
+            parser = IncrementalJudgeParser()
+            events = _feed_in_chunks(parser, text, size)
+
+            scores = [value for kind, value in events if kind == "score"]
+            self.assertEqual(scores, payload["scores"])
+
+            translation = "".join(value for kind, value in events if kind == "final_delta")
+            self.assertEqual(translation, payload["final"]["translation"])
+            self.assertEqual(parser.text, text)
+            self.assertEqual(parser.result(), payload)
+
+    def test_scores_emitted_before_final(self):
+        parser = IncrementalJudgeParser()
+        events = parser.feed('{"scores": [{"engine_id": "a", "accuracy": 5}')
+        self.assertEqual(events, [("score", {"engine_id": "a", "accuracy": 5})])
+        events = parser.feed(', {"engine_id": "b"}], "final": {"translation": "你')
+        self.assertEqual(events, [("score", {"engine_id": "b"}), ("final_delta", "你")])
+        self.assertEqual(parser.feed('好"}}'), [("final_delta", "好")])
+
+
+if __name__ == "__main__":
+    unittest.main()
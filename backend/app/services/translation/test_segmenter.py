@@ -0,0 +1,36 @@
+import unittest
+
+from app.services.translation.segmenter import estimate_tokens, join_segments, split_segments
+
+
+class TestSegmenter(unittest.TestCase):
+    def test_short_text_is_single_segment(self):
+        segments = split_segments("  Hello world.  ", 100)
+        self.assertEqual(len(segments), 1)
+        self.assertEqual(segments[0].text, "Hello world.")
+
+    def test_split_respects_budget_and_roundtrips(self):
+        text = (
+            "第一段。这是句子！还有一句？\n\n"
+            + "Second paragraph. It has sentences. " * 20
+            + "\n\n"
+            + "x" * 300
+            + "\n\n末尾。"
+        )
+        segments = split_segments(text, 40)
+
+        self.assertGreater(len(segments), 1)
+        for seg in segments:
+            self.assertLessEqual(estimate_tokens(seg.text), 40)
+        self.assertEqual(join_segments([s.text for s in segments], segments), text.strip())
+
+    def test_paragraph_breaks_are_kept_as_separators(self):
+        text = "A" * 40 + "\n\n" + "B" * 40
+        segments = split_segments(text, 12)
+        self.assertEqual([s.text for s in segments], ["A" * 40, "B" * 40])
+        self.assertEqual(segments[0].separator, "\n\n")
+        self.assertEqual(join_segments(["甲", "乙"], segments), "甲\n\n乙")
+
+
+if __name__ == "__main__":
+    unittest.main()
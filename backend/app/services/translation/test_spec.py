@@ -0,0 +1,116 @@
+import asyncio
+import json
+import unittest
+from unittest import mock
+
+from fastapi.testclient import TestClient
+
+from app.dependencies import EngineConfig
+from app.models.translation import SpecTranslateRequest
+from app.services.translation.base import BaseTranslationService
+from app.services.translation.spec import SpecTranslationService
+
+EDITED = "用户编辑过的功能主义要求"
+
+
+class _StreamEngine:
+    """理论分析（带 system_prompt）产出建议文本，翻译调用产出译文并记录提示词"""
+
+    default_model = "m"
+
+    def __init__(self):
+        self.translation_prompts: list[str] = []
+
+    async def translate_stream(self, text, source_lang, target_lang, options=None):
+        options = options or {}
+        if "system_prompt" in options:
+            for part in ("对等", "建议"):
+                yield part
+            return
+        self.translation_prompts.append(options.get("prompt", ""))
+        for part in ("译", "文"):
+            yield part
+
+
+def _request() -> SpecTranslateRequest:
+    return SpecTranslateRequest.model_validate(
+        {
+            "text": "Hello",
+            "source_lang": "en",
+            "target_lang": "zh",
+            "blueprint": {
+                "theory": {
+                    "configs": [
+                        {"id": "equivalence", "enabled": True},
+                        {"id": "functionalism", "enabled": True, "purpose": "p"},
+                    ]
+                },
+                "prompt_blocks": [
+                    {"id": "theory.equivalence", "title": "对等", "content": "旧内容"},
+                    {"id": "theory.functionalism", "title": "功能", "content": EDITED},
+                    {"id": "method", "title": "方法", "content": "方法要求", "enabled": False},
+                ],
+            },
+        }
+    )
+
+
+class TestSpecAutoStream(unittest.TestCase):
+    def setUp(self):
+        self.engine = _StreamEngine()
+        patches = [
+            mock.patch.object(BaseTranslationService, "create_engine", lambda *_: self.engine),
+            mock.patch("app.services.translation.spec_blueprint.analysis_cache", None),
+            mock.patch("app.services.translation.base.translation_cache", None),
+            mock.patch("app.services.translation.base.translation_memory", None),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.config = EngineConfig(api_key="k", base_url="", channel="openai")
+
+    def test_event_sequence_and_edited_blocks_are_kept(self):
+        async def run():
+            return [
+                event
+                async for event in SpecTranslationService().translate_auto_stream(_request(), self.config)
+            ]
+
+        events = asyncio.run(run())
+        self.assertEqual(
+            [kind for kind, _ in events],
+            ["theory_delta", "theory_delta", "analysis", "blueprint", "delta", "delta", "final"],
+        )
+        self.assertEqual(events[2][1]["content"], "对等建议")
+
+        blocks = {block.id: block for block in events[3][1].blueprint.prompt_blocks}
+        # 只重建补全了分析的对等理论分块，用户编辑与停用的分块原样保留
+        self.assertIn("对等建议", blocks["theory.equivalence"].content)
+        self.assertEqual(blocks["theory.functionalism"].content, EDITED)
+        self.assertFalse(blocks["method"].enabled)
+
+        final = events[-1][1]
+        self.assertEqual(final.translated_text, "译文")
+        (prompt,) = self.engine.translation_prompts
+        self.assertIn(EDITED, prompt)
+        self.assertIn("对等建议", prompt)
+        self.assertNotIn("方法要求", prompt)
+
+    def test_endpoint_emits_sse_events_in_order(self):
+        from app.main import app
+
+        headers = {"X-Engine-Config": json.dumps({"apiKey": "k", "channel": "openai"})}
+        with TestClient(app) as client:
+            response = client.post(
+                "/api/translate/spec/auto", headers=headers, json=_request().model_dump(by_alias=True)
+            )
+        self.assertEqual(response.status_code, 200)
+        names = [line[len("event: ") :] for line in response.text.splitlines() if line.startswith("event: ")]
+        self.assertEqual(
+            names,
+            ["theory_delta", "theory_delta", "analysis", "blueprint", "delta", "delta", "final", "done"],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+import asyncio
+import unittest
+from contextlib import aclosing
+
+from app.services.translation.streaming import merge_streams
+
+
+class TestMergeStreams(unittest.TestCase):
+    def test_interleaves_and_reports_errors(self):
+        async def items(values, fail=False):
+            for value in values:
+                yield value
+                await asyncio.sleep(0)
+            if fail:
+                raise RuntimeError("boom")
+
+        async def run():
+            events = []
+            async for key, kind, value in merge_streams({"a": items([1, 2]), "b": items([3], fail=True)}):
+                events.append((key, kind, value if kind != "error" else str(value)))
+            return events
+
+        events = asyncio.run(run())
+        self.assertEqual([e for e in events if e[0] == "a"], [("a", "item", 1), ("a", "item", 2), ("a", "done", None)])
+        self.assertEqual([e for e in events if e[0] == "b"], [("b", "item", 3), ("b", "error", "boom")])
+
+    def test_early_exit_closes_inner_streams(self):
+        closed: list[str] = []
+
+        async def endless(key):
+            try:
+                while True:
+                    yield key
+            finally:
+                closed.append(key)
+
+        async def run():
+            merged = merge_streams({"a": endless("a"), "b": endless("b")}, max_buffered=1)
+            async with aclosing(merged) as events:
+                async for _ in events:
+                    # 此时另一条流阻塞在入队上
+                    await asyncio.sleep(0)
+                    break
+            # 在事件循环结束（asyncgen 统一收尾）之前就应已关闭
+            return sorted(closed)
+
+        self.assertEqual(asyncio.run(run()), ["a", "b"])
+
+
+if __name__ == "__main__":
+    unittest.main()
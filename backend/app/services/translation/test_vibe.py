@@ -0,0 +1,101 @@
+import asyncio
+import unittest
+from unittest import mock
+
+from app.dependencies import CachePolicy, EngineConfig
+from app.engines.base import TranslationResult
+from app.models.translation import VibeTranslateRequest
+from app.services.translation import base
+from app.services.translation.vibe import VibeTranslationService
+
+
+class _SleepyEngine:
+    def __init__(self, text: str, delay: float):
+        self.text = text
+        self.delay = delay
+        self.cancelled = False
+
+    async def translate(self, text, source_lang, target_lang, options=None):
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        return TranslationResult(text=self.text, source_lang=source_lang, target_lang=target_lang)
+
+    async def translate_stream(self, text, source_lang, target_lang, options=None):
+        yield self.text[:1]
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        yield self.text[1:]
+
+
+class TestVibeCandidatePolicy(unittest.TestCase):
+    def setUp(self):
+        self.engines = {"fast": _SleepyEngine("fast", 0.0), "hung": _SleepyEngine("hung", 10.0)}
+        self.configs = [
+            EngineConfig(api_key="k", base_url="", channel="openai", model=model)
+            for model in self.engines
+        ]
+        patches = [
+            mock.patch.object(
+                VibeTranslationService, "create_engine", lambda _, config: self.engines[config.model]
+            ),
+            mock.patch.object(VibeTranslationService, "_find_judge_config", lambda *_: None),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def request(self, **kwargs) -> VibeTranslateRequest:
+        return VibeTranslateRequest(
+            text="hi", target_lang="zh", intent="i", engines=["a", "b"], **kwargs
+        )
+
+    def test_quorum_cancels_stragglers(self):
+        response = asyncio.run(VibeTranslationService().translate(self.request(quorum=1), self.configs))
+        fast, hung = response.results
+        self.assertTrue(fast.success)
+        self.assertEqual(fast.translated_text, "fast")
+        self.assertTrue(hung.timed_out)
+        self.assertFalse(hung.success)
+        self.assertTrue(self.engines["hung"].cancelled)
+
+    def test_stream_deadline_reports_timed_out_partial(self):
+        async def run():
+            service = VibeTranslationService()
+            return [e async for e in service.translate_stream(self.request(candidate_deadline=0.05), self.configs)]
+
+        events = asyncio.run(run())
+        partials = {r.engine_id: r for kind, r in events if kind == "partial"}
+        self.assertTrue(partials["a"].success)
+        self.assertTrue(partials["b"].timed_out)
+        self.assertTrue(self.engines["hung"].cancelled)
+        self.assertEqual([r.engine_id for r in events[-1][1].results], ["a", "b"])
+
+    def test_no_cache_skips_memory_lookup(self):
+        memory = mock.Mock()
+        memory.accepts.return_value = True
+        memory.lookup = mock.AsyncMock(return_value=None)
+        service = VibeTranslationService()
+        with mock.patch.object(base, "translation_memory", memory):
+            asyncio.run(service.translate(self.request(quorum=1), self.configs, cache_policy=CachePolicy(read=False)))
+            memory.lookup.assert_not_called()
+
+            async def run():
+                return [e async for e in service.translate_stream(
+                    self.request(quorum=1), self.configs, cache_policy=CachePolicy(read=False)
+                )]
+
+            asyncio.run(run())
+            memory.lookup.assert_not_called()
+
+            asyncio.run(service.translate(self.request(quorum=1), self.configs))
+            memory.lookup.assert_awaited_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,11 +3,10 @@
 import asyncio
 import json
 import re
+from contextlib import aclosing
+from dataclasses import dataclass
 from typing import Any
 
-from anthropic import AsyncAnthropic
-from openai import AsyncOpenAI
-
 from app.models.translation import (
     VibeTranslateRequest,
     VibeTranslateResponse,
@@ -15,11 +14,48 @@ from app.models.translation import (
     TranslationScore,
 )
 from app.services.translation.base import BaseTranslationService
-from app.dependencies import EngineConfig
+from app.config import settings
+from app.dependencies import CachePolicy, EngineConfig
+from app.engines.admission import admission, call_tokens
+from app.engines.client_pool import client_pool, engine_client_key
+from app.engines.resilience import call_with_retry, stream_with_retry
+from app.errors import ApiError
 from app.llm_debug import log_ai_sdk_params
+from app.metrics import judge_parse_failures
+from app.services.translation.judge_parser import IncrementalJudgeParser
+from app.services.translation.streaming import merge_streams
 from app.prompts.vibe import build_vibe_judge_prompt, build_vibe_judge_system_prompt
 
 
+@dataclass(frozen=True)
+class CandidatePolicy:
+    """候选等待策略：何时停止等待剩余候选、开始评分
+
+    - quorum：成功候选达到该数量即开始评分（0 表示等待全部候选）
+    - deadline：自开始起最多等待的秒数（0 表示不限制）
+    """
+
+    quorum: int = 0
+    deadline: float = 0.0
+
+    @classmethod
+    def from_request(cls, request: VibeTranslateRequest) -> "CandidatePolicy":
+        return cls(
+            quorum=settings.vibe_quorum if request.quorum is None else request.quorum,
+            deadline=(
+                settings.vibe_candidate_deadline
+                if request.candidate_deadline is None
+                else request.candidate_deadline
+            ),
+        )
+
+    def deadline_at(self, now: float) -> float | None:
+        return now + self.deadline if self.deadline > 0 else None
+
+    def reached(self, succeeded: int) -> bool:
+        return self.quorum > 0 and succeeded >= self.quorum
+
+
 class VibeTranslationService(BaseTranslationService):
     """氛围翻译服务
 
@@ -28,6 +64,7 @@ class VibeTranslationService(BaseTranslationService):
     1. 并行调用多个翻译引擎
     2. 使用 Judge LLM 对翻译结果评分
     3. 根据翻译意图(intent)选择最佳翻译
+    4. 成功候选达到法定数量或超过截止时间即开始评分，其余候选取消并标记超时
     """
 
     async def translate(
@@ -35,6 +72,7 @@ class VibeTranslationService(BaseTranslationService):
         request: VibeTranslateRequest,
         engine_configs: list[EngineConfig],
         judge_config: EngineConfig | None = None,
+        cache_policy: CachePolicy | None = None,
     ) -> VibeTranslateResponse:
         """执行氛围翻译
 
@@ -42,34 +80,58 @@ class VibeTranslationService(BaseTranslationService):
             request: 翻译请求
             engine_configs: 多个引擎配置列表
             judge_config: 用于评分的引擎配置（默认使用第一个引擎）
+            cache_policy: 缓存策略（决定是否查询翻译记忆，默认查询）
 
         Returns:
             包含所有引擎结果和最佳推荐的响应
         """
+        policy = CandidatePolicy.from_request(request)
+        loop = asyncio.get_running_loop()
+        deadline = policy.deadline_at(loop.time())
+
         # 并行执行所有引擎的翻译
-        tasks = []
-        for i, config in enumerate(engine_configs):
-            engine_id = request.engines[i] if i < len(request.engines) else f"engine_{i}"
-            tasks.append(self._translate_with_config(config, engine_id, request))
-
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-
-        # 处理结果
-        scored_results: list[ScoredEngineResult] = []
-        for i, result in enumerate(results):
-            engine_id = request.engines[i] if i < len(request.engines) else f"engine_{i}"
-            if isinstance(result, Exception):
-                scored_results.append(
-                    ScoredEngineResult(
-                        engine_id=engine_id,
-                        engine_name=engine_id,
+        options = await self._memory_options(request, cache_policy)
+        engine_ids = [self._engine_id(request, i) for i in range(len(engine_configs))]
+        tasks = {
+            asyncio.create_task(self._translate_with_config(config, engine_ids[i], request, options)): i
+            for i, config in enumerate(engine_configs)
+        }
+
+        # 等到法定数量的候选成功、截止时间到或全部完成
+        finished: dict[int, ScoredEngineResult] = {}
+        pending = set(tasks)
+        reason = "deadline"
+        while pending:
+            if policy.reached(sum(r.success for r in finished.values())):
+                reason = "quorum"
+                break
+            timeout = None if deadline is None else max(0.0, deadline - loop.time())
+            done, pending = await asyncio.wait(
+                pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+            )
+            if not done:
+                break
+            for task in done:
+                i = tasks[task]
+                if task.exception() is not None:
+                    finished[i] = ScoredEngineResult(
+                        engine_id=engine_ids[i],
+                        engine_name=engine_ids[i],
                         translated_text="",
                         success=False,
-                        error=str(result),
+                        error=str(task.exception()),
                     )
-                )
-            elif isinstance(result, ScoredEngineResult):
-                scored_results.append(result)
+                else:
+                    finished[i] = task.result()
+        await self._cancel(pending)
+
+        scored_results: list[ScoredEngineResult] = [
+            finished.get(i)
+            or self._timed_out_result(
+                engine_ids[i], engine_configs[i].model or engine_configs[i].channel, reason
+            )
+            for i in range(len(engine_configs))
+        ]
 
         # 使用 Judge LLM 评分
         judge = judge_config or self._find_judge_config(engine_configs)
@@ -99,34 +161,89 @@ class VibeTranslationService(BaseTranslationService):
         request: VibeTranslateRequest,
         engine_configs: list[EngineConfig],
         judge_config: EngineConfig | None = None,
+        cache_policy: CachePolicy | None = None,
     ):
-        async def run_one(engine_id: str, config: EngineConfig):
-            try:
-                result = await self._translate_with_config(config, engine_id, request)
-            except Exception as e:
-                result = ScoredEngineResult(
-                    engine_id=engine_id,
-                    engine_name=engine_id,
-                    translated_text="",
-                    success=False,
-                    error=str(e),
-                )
-            return engine_id, result
+        """执行流式氛围翻译
+
+        依次产出：
+        - ("delta", {"engine_id", "delta"})：各引擎的增量译文，按到达顺序交错
+        - ("partial", ScoredEngineResult)：某个引擎完成（成功或失败）
+        - ("score", {"engine_id", "score"})：裁判对某个候选的评分（边生成边产出）
+        - ("delta", {"engine_id": "judge", "delta"})：裁判综合译文的增量
+        - ("final", VibeTranslateResponse)：裁判打分与综合结果
 
-        tasks: list[asyncio.Task[tuple[str, ScoredEngineResult]]] = []
+        达到法定数量或截止时间时，未完成的候选被取消，并以 timed_out=True 的 partial 产出。
+        裁判调用失败时抛出 ApiError。
+        """
+        policy = CandidatePolicy.from_request(request)
+        loop = asyncio.get_running_loop()
+        deadline = policy.deadline_at(loop.time())
+
+        # 以下标为键，允许同一 engine_id 出现多次
+        options = await self._memory_options(request, cache_policy)
+        engine_ids: list[str] = []
+        streams: dict[int, Any] = {}
         for i, config in enumerate(engine_configs):
-            engine_id = request.engines[i] if i < len(request.engines) else f"engine_{i}"
-            tasks.append(asyncio.create_task(run_one(engine_id, config)))
+            engine_ids.append(self._engine_id(request, i))
+            streams[i] = self._stream_with_config(config, request, options)
+
+        parts: dict[int, list[str]] = {i: [] for i in streams}
+        finished: dict[int, ScoredEngineResult] = {}
+        reason = "deadline"
+        async with aclosing(merge_streams(streams)) as events:
+            while len(finished) < len(streams):
+                if policy.reached(sum(r.success for r in finished.values())):
+                    reason = "quorum"
+                    break
+                timeout = None if deadline is None else max(0.0, deadline - loop.time())
+                try:
+                    # 超时会取消合并流，进而取消所有未完成的候选
+                    i, kind, value = await asyncio.wait_for(anext(events), timeout)
+                except TimeoutError:
+                    break
+                engine_id = engine_ids[i]
+                engine_name = engine_configs[i].model or engine_configs[i].channel
+                if kind == "item":
+                    parts[i].append(value)
+                    yield ("delta", {"engine_id": engine_id, "delta": value})
+                    continue
 
-        results: list[ScoredEngineResult] = []
-        for task in asyncio.as_completed(tasks):
-            _, r = await task
-            results.append(r)
-            yield ("partial", r)
+                if kind == "done":
+                    r = ScoredEngineResult(
+                        engine_id=engine_id,
+                        engine_name=engine_name,
+                        translated_text="".join(parts[i]).strip(),
+                    )
+                else:
+                    r = ScoredEngineResult(
+                        engine_id=engine_id,
+                        engine_name=engine_name,
+                        translated_text="",
+                        success=False,
+                        error=str(value),
+                    )
+                finished[i] = r
+                yield ("partial", r)
+
+        # 退出 aclosing 时未完成的候选已被取消
+        for i in streams:
+            if i not in finished:
+                finished[i] = self._timed_out_result(
+                    engine_ids[i], engine_configs[i].model or engine_configs[i].channel, reason
+                )
+                yield ("partial", finished[i])
+        results = [finished[i] for i in sorted(finished)]
 
         judge = judge_config or self._find_judge_config(engine_configs)
         if judge:
-            judged = await self._judge_and_synthesize(judge, request.text, request.intent, results)
+            judged: dict[str, Any] = {}
+            async for kind, value in self._judge_and_synthesize_stream(
+                judge, request.text, request.intent, results
+            ):
+                if kind == "judged":
+                    judged = value
+                else:
+                    yield (kind, value)
             response = VibeTranslateResponse(
                 source_lang=request.source_lang,
                 target_lang=request.target_lang,
@@ -147,11 +264,67 @@ class VibeTranslationService(BaseTranslationService):
 
         yield ("final", response)
 
+    @staticmethod
+    def _engine_id(request: VibeTranslateRequest, index: int) -> str:
+        return request.engines[index] if index < len(request.engines) else f"engine_{index}"
+
+    @staticmethod
+    def _timed_out_result(engine_id: str, engine_name: str, reason: str) -> ScoredEngineResult:
+        """未能在评分开始前完成、已被取消的候选"""
+        if reason == "quorum":
+            error = "已有足够候选完成，未完成的候选已取消"
+        else:
+            error = "候选未在截止时间内完成，已取消"
+        return ScoredEngineResult(
+            engine_id=engine_id,
+            engine_name=engine_name,
+            translated_text="",
+            success=False,
+            error=error,
+            timed_out=True,
+        )
+
+    @staticmethod
+    async def _cancel(tasks) -> None:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _memory_options(
+        self, request: VibeTranslateRequest, cache_policy: CachePolicy | None = None
+    ) -> dict | None:
+        """翻译记忆中的相似译文作为各候选的参考译文
+
+        Vibe 需要多个候选相互比较，精确命中同样只作为参考，不跳过上游调用；
+        Cache-Control: no-cache / no-store 时不查询。
+        """
+        memory = await self.recall(
+            text=request.text,
+            source_lang=request.source_lang,
+            target_lang=request.target_lang,
+            cache_policy=cache_policy,
+        )
+        references = memory.references() if memory is not None else []
+        return {"references": references} if references else None
+
+    def _stream_with_config(
+        self, config: EngineConfig, request: VibeTranslateRequest, options: dict | None = None
+    ):
+        """使用指定配置流式翻译（产出增量译文）"""
+        engine = self.create_engine(config)
+        return engine.translate_stream(
+            text=request.text,
+            source_lang=request.source_lang,
+            target_lang=request.target_lang,
+            options=options,
+        )
+
     async def _translate_with_config(
         self,
         config: EngineConfig,
         engine_id: str,
         request: VibeTranslateRequest,
+        options: dict | None = None,
     ) -> ScoredEngineResult:
         """使用指定配置翻译"""
         engine = self.create_engine(config)
@@ -160,6 +333,7 @@ class VibeTranslationService(BaseTranslationService):
             text=request.text,
             source_lang=request.source_lang,
             target_lang=request.target_lang,
+            options=options,
         )
 
         return ScoredEngineResult(
@@ -195,7 +369,51 @@ class VibeTranslationService(BaseTranslationService):
     ) -> dict[str, Any]:
         prompt = build_vibe_judge_prompt(source_text=source_text, intent=intent, results=results)
         scores_payload = await self._score_with_judge(judge_config, prompt, operation="judge_vibe")
+        if not scores_payload:
+            judge_parse_failures.inc(stream="false")
+        return self._apply_judge_payload(judge_config, results, scores_payload)
+
+    async def _judge_and_synthesize_stream(
+        self,
+        judge_config: EngineConfig,
+        source_text: str,
+        intent: str,
+        results: list[ScoredEngineResult],
+    ):
+        """流式裁判：评分对象一闭合即产出 score，综合译文逐段产出 delta，最后产出 judged"""
+        prompt = build_vibe_judge_prompt(source_text=source_text, intent=intent, results=results)
+        successful = {r.engine_id for r in results if r.success}
+        parser = IncrementalJudgeParser()
+        try:
+            async for chunk in self._stream_judge(judge_config, prompt):
+                for kind, value in parser.feed(chunk):
+                    if kind == "final_delta":
+                        yield ("delta", {"engine_id": "judge", "delta": value})
+                        continue
+                    engine_id = str(value.get("engine_id", "")).strip()
+                    if engine_id in successful:
+                        score = self._build_score(value)
+                        yield ("score", {"engine_id": engine_id, "score": score.model_dump()})
+        except Exception as e:
+            raise ApiError(
+                502,
+                "upstream_judge_failed",
+                "上游裁判模型调用失败",
+                {"error": str(e)},
+            )
 
+        scores_payload = parser.result() or self._safe_parse_json_object(parser.text)
+        if not scores_payload:
+            judge_parse_failures.inc(stream="true")
+        yield ("judged", self._apply_judge_payload(judge_config, results, scores_payload))
+
+    def _apply_judge_payload(
+        self,
+        judge_config: EngineConfig,
+        results: list[ScoredEngineResult],
+        scores_payload: dict[str, Any],
+    ) -> dict[str, Any]:
+        """把裁判输出的 JSON 应用到候选结果上，并构建综合结果"""
         score_list = scores_payload.get("scores", [])
         final = scores_payload.get("final", {}) if isinstance(scores_payload.get("final"), dict) else {}
 
@@ -215,22 +433,7 @@ class VibeTranslationService(BaseTranslationService):
             score_item = scores_by_engine.get(r.engine_id)
             if not isinstance(score_item, dict):
                 continue
-            accuracy = self._to_score(score_item.get("accuracy"))
-            fluency = self._to_score(score_item.get("fluency"))
-            style_match = self._to_score(score_item.get("style_match"))
-            terminology = self._to_score(score_item.get("terminology"))
-            overall = (accuracy + fluency + style_match + terminology) / 4
-            comment = score_item.get("comment")
-            if isinstance(comment, str) and len(comment) > 999:
-                comment = comment[:999]
-            r.score = TranslationScore(
-                accuracy=accuracy,
-                fluency=fluency,
-                style_match=style_match,
-                terminology=terminology,
-                overall=overall,
-                comment=comment if isinstance(comment, str) else None,
-            )
+            r.score = self._build_score(score_item)
 
         synthesized_translation = None
         if isinstance(final.get("translation"), str) and final.get("translation").strip():
@@ -266,6 +469,24 @@ class VibeTranslationService(BaseTranslationService):
             "synthesis_rationale": synthesis_rationale,
         }
 
+    def _build_score(self, score_item: dict[str, Any]) -> TranslationScore:
+        accuracy = self._to_score(score_item.get("accuracy"))
+        fluency = self._to_score(score_item.get("fluency"))
+        style_match = self._to_score(score_item.get("style_match"))
+        terminology = self._to_score(score_item.get("terminology"))
+        overall = (accuracy + fluency + style_match + terminology) / 4
+        comment = score_item.get("comment")
+        if isinstance(comment, str) and len(comment) > 999:
+            comment = comment[:999]
+        return TranslationScore(
+            accuracy=accuracy,
+            fluency=fluency,
+            style_match=style_match,
+            terminology=terminology,
+            overall=overall,
+            comment=comment if isinstance(comment, str) else None,
+        )
+
     async def _score_with_judge(
         self, judge_config: EngineConfig, prompt: str, *, operation: str
     ) -> dict[str, Any]:
@@ -275,13 +496,55 @@ class VibeTranslationService(BaseTranslationService):
             return await self._score_with_anthropic(judge_config, prompt, operation=operation)
         return {}
 
-    async def _score_with_openai(self, judge_config: EngineConfig, prompt: str, *, operation: str) -> dict[str, Any]:
-        client = AsyncOpenAI(
-            api_key=judge_config.api_key,
-            base_url=judge_config.base_url if judge_config.base_url else None,
-        )
+    async def _stream_judge(self, judge_config: EngineConfig, prompt: str):
+        """流式调用裁判模型，逐段产出原始文本（首个增量前失败会按策略重试）
+
+        客户端在最后的重试循环中从客户端池借出，open_stream 在借出期间才会被调用。
+        """
+        if judge_config.channel == "openai":
+            params = self._openai_judge_params(judge_config, prompt)
+            params["stream"] = True
+            log_ai_sdk_params("openai", params)
+
+            async def open_stream():
+                stream = await client.chat.completions.create(**params)
+                async with stream:
+                    async for chunk in stream:
+                        if chunk.choices and chunk.choices[0].delta.content:
+                            yield chunk.choices[0].delta.content
+
+        elif judge_config.channel == "anthropic":
+            params = self._anthropic_judge_params(judge_config, prompt)
+            params["stream"] = True
+            log_ai_sdk_params("anthropic", params)
+
+            async def open_stream():
+                stream = await client.messages.create(**params)
+                async with stream:
+                    async for event in stream:
+                        if event.type == "content_block_delta" and getattr(event.delta, "text", None):
+                            yield event.delta.text
+
+        else:
+            return
+
+        with client_pool.lease(judge_config) as client:
+            async for text in stream_with_retry(
+                open_stream,
+                admit=self._judge_admit(judge_config, prompt),
+                metric_labels=(judge_config.channel, params["model"]),
+            ):
+                yield text
+
+    @staticmethod
+    def _judge_admit(judge_config: EngineConfig, prompt: str):
+        """裁判调用与翻译调用共用按凭据计的准入控制"""
+        tokens = call_tokens(build_vibe_judge_system_prompt(), prompt)
+        return lambda: admission.acquire(engine_client_key(judge_config), tokens)
+
+    def _openai_judge_params(self, judge_config: EngineConfig, prompt: str) -> dict[str, Any]:
         system = build_vibe_judge_system_prompt()
-        params = {
+        return {
             "model": judge_config.model or "gpt-4o-mini",
             "messages": [
                 {"role": "system", "content": system},
@@ -290,28 +553,40 @@ class VibeTranslationService(BaseTranslationService):
             "temperature": 0.3,
             "response_format": {"type": "json_object"},
         }
-        log_ai_sdk_params("openai", params)
-        judge_result = await client.chat.completions.create(**params)
-        content = judge_result.choices[0].message.content or ""
-        return self._safe_parse_json_object(content)
 
-    async def _score_with_anthropic(
-        self, judge_config: EngineConfig, prompt: str, *, operation: str
-    ) -> dict[str, Any]:
-        client = AsyncAnthropic(
-            api_key=judge_config.api_key,
-            base_url=judge_config.base_url if judge_config.base_url else None,
-        )
+    def _anthropic_judge_params(self, judge_config: EngineConfig, prompt: str) -> dict[str, Any]:
         system = build_vibe_judge_system_prompt()
-        params = {
+        return {
             "model": judge_config.model or "claude-sonnet-4-20250514",
             "max_tokens": 2048,
             "system": system,
             "messages": [{"role": "user", "content": prompt}],
             "temperature": 0.2,
         }
+
+    async def _score_with_openai(self, judge_config: EngineConfig, prompt: str, *, operation: str) -> dict[str, Any]:
+        params = self._openai_judge_params(judge_config, prompt)
+        log_ai_sdk_params("openai", params)
+        with client_pool.lease(judge_config) as client:
+            judge_result = await call_with_retry(
+                lambda: client.chat.completions.create(**params),
+                admit=self._judge_admit(judge_config, prompt),
+                metric_labels=("openai", params["model"]),
+            )
+        content = judge_result.choices[0].message.content or ""
+        return self._safe_parse_json_object(content)
+
+    async def _score_with_anthropic(
+        self, judge_config: EngineConfig, prompt: str, *, operation: str
+    ) -> dict[str, Any]:
+        params = self._anthropic_judge_params(judge_config, prompt)
         log_ai_sdk_params("anthropic", params)
-        response = await client.messages.create(**params)
+        with client_pool.lease(judge_config) as client:
+            response = await call_with_retry(
+                lambda: client.messages.create(**params),
+                admit=self._judge_admit(judge_config, prompt),
+                metric_labels=("anthropic", params["model"]),
+            )
         text = ""
         if response.content:
             text = "".join(getattr(block, "text", "") for block in response.content)
@@ -1,10 +1,92 @@
 from __future__ import annotations
 
+import asyncio
 import json
-from typing import Any
+import time
+from typing import Any, AsyncIterator
+
+from starlette.requests import Request
+
+from app.cancellation import RequestWork, cancellation_stats, current_work
+from app.config import settings
+from app.errors import ApiError
+from app.metrics import sse_stream_duration
+
+
+# 关闭代理/浏览器缓冲，保证首个事件尽快到达客户端
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no",
+}
 
 
 def sse_event(event: str, data: Any) -> bytes:
     payload = json.dumps(data, ensure_ascii=False)
     return f"event: {event}\ndata: {payload}\n\n".encode("utf-8")
 
+
+def sse_error(exc: ApiError) -> bytes:
+    """把 ApiError 编码为 error 事件（结构与 JSON 错误响应的 error 字段一致）"""
+    payload: dict[str, Any] = {"code": exc.code, "message": exc.message}
+    if exc.details is not None:
+        payload["details"] = exc.details
+    return sse_event("error", payload)
+
+
+async def stream_until_disconnect(
+    request: Request,
+    events: AsyncIterator[bytes],
+    *,
+    endpoint: str,
+) -> AsyncIterator[bytes]:
+    """转发事件流，客户端断开时立即取消事件生成
+
+    事件在独立任务中生成，同时轮询客户端连接状态；一旦断开（或响应本身被取消），
+    生成任务被取消，取消会沿调用链传到所有进行中的引擎/裁判调用。
+    不依赖服务器在下一次写入时才发现断开——裁判思考等长时间无输出的阶段同样能及时中止。
+    """
+    work = RequestWork()
+    started = time.perf_counter()
+    queue: asyncio.Queue[bytes] = asyncio.Queue(maxsize=1)
+
+    async def produce() -> None:
+        current_work.set(work)
+        try:
+            async for chunk in events:
+                await queue.put(chunk)
+        finally:
+            await events.aclose()
+
+    async def watch() -> None:
+        while not await request.is_disconnected():
+            await asyncio.sleep(settings.sse_disconnect_poll_interval)
+
+    producer = asyncio.create_task(produce())
+    watcher = asyncio.create_task(watch())
+    try:
+        while True:
+            getter = asyncio.ensure_future(queue.get())
+            done, _ = await asyncio.wait(
+                {getter, producer, watcher}, return_when=asyncio.FIRST_COMPLETED
+            )
+            if getter in done:
+                yield getter.result()
+                continue
+            getter.cancel()
+            if watcher in done:
+                return
+            while not queue.empty():
+                yield queue.get_nowait()
+            producer.result()
+            return
+    finally:
+        if producer.done():
+            cancellation_stats.record_finished()
+            outcome = "completed"
+        else:
+            cancellation_stats.record_disconnect(endpoint, work)
+            producer.cancel()
+            outcome = "disconnected"
+        sse_stream_duration.observe(time.perf_counter() - started, endpoint=endpoint, outcome=outcome)
+        watcher.cancel()
+        await asyncio.gather(producer, watcher, return_exceptions=True)
@@ -0,0 +1,119 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from app.cache import (
+    MemoryTranslationCache,
+    SqliteTranslationCache,
+    build_analysis_cache_key,
+    build_translation_cache_key,
+)
+from app.dependencies import EngineConfig
+from app.engines.base import TranslationResult
+
+
+class TestTranslationCache(unittest.TestCase):
+    def test_key_depends_on_final_prompt(self):
+        common = dict(channel="openai", model="gpt-4o-mini", base_url="", text="Hello")
+        a = build_translation_cache_key(system_prompt="A", **common)
+        b = build_translation_cache_key(system_prompt="B", **common)
+        self.assertNotEqual(a, b)
+        self.assertEqual(a, build_translation_cache_key(system_prompt="A", **common))
+
+    def test_analysis_key_is_separate_per_theory(self):
+        common = dict(channel="openai", model="m", base_url="", system_prompt="S", user_content="U")
+        eq = build_analysis_cache_key(theory_id="equivalence", **common)
+        self.assertNotEqual(eq, build_analysis_cache_key(theory_id="dts", **common))
+        self.assertNotEqual(
+            eq,
+            build_translation_cache_key(
+                channel="openai", model="m", base_url="", system_prompt="S", text="U"
+            ),
+        )
+
+    def test_memory_lru_and_byte_limit(self):
+        async def run():
+            cache = MemoryTranslationCache(max_entries=2, max_bytes=1024, ttl=60)
+            await cache.set("a", "1")
+            await cache.set("b", "2")
+            self.assertEqual(await cache.get("a"), "1")
+            await cache.set("c", "3")  # 淘汰最久未使用的 b
+            self.assertIsNone(await cache.get("b"))
+            self.assertEqual(await cache.get("a"), "1")
+
+            await cache.set("big", "x" * 2000)  # 超过总字节数的条目不缓存
+            self.assertIsNone(await cache.get("big"))
+            self.assertEqual(cache.stats.evictions, 1)
+
+        asyncio.run(run())
+
+    def test_memory_ttl(self):
+        async def run():
+            cache = MemoryTranslationCache(ttl=-1)
+            await cache.set("a", "1")
+            self.assertIsNone(await cache.get("a"))
+
+        asyncio.run(run())
+
+    def test_sqlite_roundtrip(self):
+        async def run():
+            with tempfile.TemporaryDirectory() as tmp:
+                cache = SqliteTranslationCache(os.path.join(tmp, "cache.sqlite3"), max_entries=1)
+                await cache.set("a", "你好")
+                self.assertEqual(await cache.get("a"), "你好")
+                await cache.set("b", "世界")
+                self.assertIsNone(await cache.get("a"))
+                self.assertEqual(cache.stats.hits, 1)
+
+        asyncio.run(run())
+
+    def test_sqlite_reads_are_read_only_and_touches_are_batched(self):
+        async def run():
+            with tempfile.TemporaryDirectory() as tmp:
+                cache = SqliteTranslationCache(os.path.join(tmp, "cache.sqlite3"), max_entries=2)
+                await cache.set("a", "1")
+                await cache.set("b", "2")
+                changes = cache._conn.total_changes
+                self.assertEqual(await cache.get("a"), "1")
+                self.assertIsNone(await cache.get("missing"))
+                self.assertEqual(cache._conn.total_changes, changes)
+                self.assertEqual(await cache.get_first(["missing", "a"]), "1")
+                self.assertEqual((cache.stats.hits, cache.stats.misses), (2, 1))
+                # 写入时先回写访问时间，因此淘汰的是未被读取的 b
+                await cache.set("c", "3")
+                self.assertEqual(await cache.get("a"), "1")
+                self.assertIsNone(await cache.get("b"))
+                self.assertEqual(cache.stats.evictions, 1)
+
+        asyncio.run(run())
+
+    def test_empty_translations_are_not_cached(self):
+        from app.services.translation.base import BaseTranslationService
+
+        class _EmptyEngine:
+            default_model = "m"
+
+            async def translate(self, text, source_lang, target_lang, options=None):
+                return TranslationResult(text="", source_lang=source_lang, target_lang=target_lang)
+
+            async def translate_stream(self, text, source_lang, target_lang, options=None):
+                yield " "
+
+        service = BaseTranslationService()
+        config = EngineConfig(api_key="k", base_url="", channel="openai")
+        common = dict(text="Hello", source_lang="en", target_lang="zh")
+
+        async def run():
+            cache = MemoryTranslationCache(max_entries=10, max_bytes=1024, ttl=60)
+            with mock.patch("app.services.translation.base.translation_cache", cache):
+                await service.translate_with_cache(_EmptyEngine(), config, **common)
+                [_ async for _ in service.stream_with_cache(_EmptyEngine(), config, **common)]
+            return cache
+
+        self.assertEqual(asyncio.run(run()).stats.sets, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,165 @@
+import asyncio
+import unittest
+from unittest import mock
+
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.dependencies import EngineConfig
+from app.engines.base import TranslationResult, resolve_system_prompt
+from app.errors import ApiError
+from app.glossary import Glossary, GlossaryTerm, TermMatcher, build_glossary, glossaries, parse_csv, parse_tbx
+
+TBX = """<?xml version="1.0" encoding="UTF-8"?>
+<martif type="TBX" xml:lang="en">
+  <text><body>
+    <termEntry id="1">
+      <descrip type="definition">UI element</descrip>
+      <langSet xml:lang="en-US"><tig><term>button</term></tig><tig><term>push button</term></tig></langSet>
+      <langSet xml:lang="zh-CN"><tig><term>按钮</term></tig></langSet>
+    </termEntry>
+    <termEntry id="2">
+      <langSet xml:lang="zh-CN"><tig><term>窗口</term></tig></langSet>
+      <langSet xml:lang="en-US"><tig><term>window</term></tig></langSet>
+    </termEntry>
+    <termEntry id="3">
+      <langSet xml:lang="de"><tig><term>Fenster</term></tig></langSet>
+    </termEntry>
+  </body></text>
+</martif>
+""".encode()
+
+
+class _Engine:
+    default_model = "m"
+
+    def __init__(self):
+        self.calls: list[dict | None] = []
+
+    async def translate(self, text, source_lang, target_lang, options=None):
+        self.calls.append(options)
+        return TranslationResult(text=f"译:{text}", source_lang=source_lang, target_lang=target_lang)
+
+
+class TestTermMatcher(unittest.TestCase):
+    def test_reports_overlapping_and_suffix_matches(self):
+        matcher = TermMatcher(["he", "she", "his", "hers"])
+        self.assertEqual(
+            sorted(matcher.iter_matches("ushers")),
+            [(1, 1), (2, 0), (2, 3)],
+        )
+        self.assertEqual(list(matcher.iter_matches("xyz")), [])
+
+
+class TestGlossary(unittest.TestCase):
+    def setUp(self):
+        self.glossary = Glossary(
+            "ui",
+            [
+                GlossaryTerm("Save", "保存"),
+                GlossaryTerm("save button", "保存按钮", "工具栏"),
+                GlossaryTerm("cat", "猫"),
+                GlossaryTerm("机器学习", "machine learning"),
+            ],
+        )
+
+    def test_finds_longest_terms_with_word_boundaries(self):
+        found = self.glossary.find("Click the SAVE button, then save. No category here; 机器学习很有趣")
+        self.assertEqual([t.source for t in found], ["save button", "Save", "机器学习"])
+        self.assertEqual(self.glossary.find("Save the cat", limit=1), [GlossaryTerm("Save", "保存")])
+
+    def test_parse_csv_with_and_without_header(self):
+        self.assertEqual(
+            parse_csv("﻿note,Source,Target\n界面,Save,保存\n,broken\n"),
+            [GlossaryTerm("Save", "保存", "界面")],
+        )
+        self.assertEqual(parse_csv("Save,保存\nOpen,打开,菜单\n")[1], GlossaryTerm("Open", "打开", "菜单"))
+
+    def test_parse_tbx_detects_languages_and_synonyms(self):
+        terms, source_lang, target_lang = parse_tbx(TBX)
+        self.assertEqual((source_lang, target_lang), ("en-US", "zh-CN"))
+        self.assertEqual(
+            terms,
+            [
+                GlossaryTerm("button", "按钮", "UI element"),
+                GlossaryTerm("push button", "按钮", "UI element"),
+                GlossaryTerm("window", "窗口"),
+            ],
+        )
+        reverse, _, _ = parse_tbx(TBX, source_lang="zh", target_lang="en")
+        self.assertEqual(reverse[-1], GlossaryTerm("窗口", "window"))
+
+    def test_build_glossary_rejects_bad_input(self):
+        with self.assertRaises(ApiError):
+            build_glossary("bad id", b"a,b", format="csv")
+        with self.assertRaises(ApiError):
+            build_glossary("ui", b"<martif>", format="tbx")
+
+    def test_service_injects_only_matched_terms(self):
+        from app.services.translation.base import BaseTranslationService
+
+        service = BaseTranslationService()
+        config = EngineConfig(api_key="k", base_url="", channel="openai")
+        options = {"prompt": "p", "glossary": self.glossary}
+
+        async def run():
+            engine = _Engine()
+            with mock.patch("app.services.translation.base.translation_cache", None):
+                await service.translate_with_cache(
+                    engine, config, text="Press save button", source_lang="en", target_lang="zh", options=options
+                )
+                await service.translate_with_cache(
+                    engine, config, text="Nothing to see", source_lang="en", target_lang="zh", options=options
+                )
+            return engine.calls
+
+        with_terms, without_terms = asyncio.run(run())
+        self.assertEqual(with_terms["terms"], [("save button", "保存按钮", "工具栏")])
+        self.assertNotIn("glossary", with_terms)
+        self.assertIn("save button → 保存按钮（工具栏）", resolve_system_prompt("en", "zh", with_terms))
+        self.assertNotIn("terms", without_terms)
+        self.assertIs(options["glossary"], self.glossary)
+
+    def test_rejects_mismatched_language_pair(self):
+        glossary = Glossary("enzh", [GlossaryTerm("cat", "猫")], source_lang="en-US", target_lang="zh-CN")
+        glossary.check_languages("en", "zh")
+        glossary.check_languages("auto", "zh-TW")
+        for source_lang, target_lang in [("en", "ja"), ("de", "zh")]:
+            with self.assertRaises(ApiError) as ctx:
+                glossary.check_languages(source_lang, target_lang)
+            self.assertEqual(ctx.exception.status_code, 400)
+            self.assertEqual(ctx.exception.code, "glossary_language_mismatch")
+        # 未标注语言的术语表不校验
+        self.glossary.check_languages("fr", "ja")
+
+    def test_http_api_requires_admin_token_and_caps_upload(self):
+        from app.main import app
+
+        content = "source,target\ncat,猫\n".encode()
+        with TestClient(app) as client:
+            url = "/api/glossaries/http-test"
+            # 默认关闭：HTTP 接口只读
+            self.assertEqual(client.put(url, content=content).status_code, 403)
+            with mock.patch.object(settings, "glossaries_api_enabled", True):
+                self.assertEqual(client.put(url, content=content).status_code, 403)
+                with mock.patch.object(settings, "admin_token", "admin-secret"):
+                    self.assertEqual(client.put(url, content=content, headers={"X-Admin-Token": "x"}).status_code, 401)
+                    headers = {"X-Admin-Token": "admin-secret"}
+                    with mock.patch.object(settings, "glossary_max_upload_bytes", 8):
+                        rejected = client.put(url, content=content, headers=headers)
+                        self.assertEqual(rejected.status_code, 413)
+                        self.assertEqual(rejected.json()["error"]["code"], "glossary_too_large")
+                        chunked = client.put(url, content=iter([content[:6], content[6:]]), headers=headers)
+                        self.assertEqual(chunked.status_code, 413)
+                    self.assertEqual(client.get(url).status_code, 404)
+
+                    created = client.put(url, content=content, params={"source_lang": "en"}, headers=headers)
+                    self.assertEqual(created.status_code, 200)
+                    self.assertEqual(created.json()["terms"], 1)
+                    self.addCleanup(lambda: glossaries._glossaries.pop("http-test", None))
+                    self.assertEqual(client.delete(url).status_code, 401)
+                    self.assertEqual(client.delete(url, headers=headers).status_code, 200)
+
+
+if __name__ == "__main__":
+    unittest.main()
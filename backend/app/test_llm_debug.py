@@ -0,0 +1,84 @@
+import logging
+import unittest
+from unittest import mock
+
+from app.config import settings
+from app.llm_debug import PayloadLogger, format_payload
+
+
+class _Capture(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.messages: list[str] = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+def make_logger(name: str, level: int = logging.INFO) -> tuple[logging.Logger, _Capture]:
+    logger = logging.getLogger(f"test.llm_debug.{name}")
+    logger.setLevel(level)
+    logger.propagate = False
+    handler = _Capture()
+    logger.handlers = [handler]
+    return logger, handler
+
+
+class TestPayloadLogger(unittest.TestCase):
+    def test_disabled_is_a_no_op(self):
+        logger, _ = make_logger("disabled", logging.WARNING)
+        payload_logger = PayloadLogger(logger, 10)
+        payload_logger.submit("openai", {"model": "m"})
+        with mock.patch.object(settings, "llm_log_enabled", False):
+            payload_logger.submit("openai", {"model": "m"})
+            self.assertFalse(PayloadLogger(make_logger("on")[0], 10).enabled)
+        self.assertIsNone(payload_logger._thread)
+        self.assertEqual(payload_logger.stats.snapshot(), {"submitted": 0, "sampled_out": 0, "dropped": 0, "written": 0})
+
+    def test_sampled_out_records_are_counted(self):
+        logger, _ = make_logger("sampled")
+        payload_logger = PayloadLogger(logger, 10)
+        with mock.patch.object(settings, "llm_log_sample_rate", 0.0):
+            for _ in range(3):
+                payload_logger.submit("openai", {"model": "m"})
+        self.assertEqual((payload_logger.stats.sampled_out, payload_logger.stats.submitted), (3, 0))
+        self.assertIsNone(payload_logger._thread)
+
+    def test_full_queue_drops_and_stop_flushes_pending(self):
+        logger, handler = make_logger("full")
+        payload_logger = PayloadLogger(logger, 2)
+        # 后台线程尚未消费时队列很快写满
+        with mock.patch.object(PayloadLogger, "start"):
+            for i in range(5):
+                payload_logger.submit("openai", {"i": i})
+        self.assertEqual((payload_logger.stats.submitted, payload_logger.stats.dropped), (2, 3))
+
+        payload_logger.start()
+        payload_logger.stop()
+        self.assertEqual(payload_logger.stats.written, 2)
+        self.assertEqual(len(handler.messages), 2)
+        self.assertTrue(handler.messages[0].startswith("AI_SDK_PARAMS[openai]"))
+        self.assertIsNone(payload_logger._thread)
+
+
+class TestFormatPayload(unittest.TestCase):
+    def test_redacts_and_truncates_strings(self):
+        body = format_payload(
+            {"api_key": "sk-secret", "messages": [{"role": "user", "content": "x" * 50}]},
+            max_chars=10,
+            max_bytes=0,
+        )
+        self.assertNotIn("sk-secret", body)
+        self.assertIn("***REDACTED***", body)
+        self.assertIn('"xxxxxxxxxx...(truncated, total=50)"', body)
+
+    def test_truncates_by_bytes(self):
+        body = format_payload({"content": "译" * 100}, max_chars=1000, max_bytes=40)
+        head, _, tail = body.partition("\n...(truncated, total=")
+        self.assertLessEqual(len(head.encode("utf-8")), 40)
+        self.assertTrue(tail.endswith(" bytes)"))
+        self.assertEqual(format_payload({"a": "b"}, max_chars=10, max_bytes=1000), '{\n  "a": "b"\n}')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,39 @@
+import unittest
+
+from app.metrics import Registry, _Metric, route_mode
+
+
+class TestRegistry(unittest.TestCase):
+    def test_histogram_buckets_are_cumulative(self):
+        registry = Registry(prefix="t_")
+        histogram = registry.histogram("latency_seconds", "耗时", ("channel",), buckets=(0.1, 1))
+        for value in (0.05, 0.1, 0.5, 3):
+            histogram.observe(value, channel="openai")
+
+        lines = registry.render().splitlines()
+        self.assertIn('t_latency_seconds_bucket{channel="openai",le="0.1"} 2', lines)
+        self.assertIn('t_latency_seconds_bucket{channel="openai",le="1"} 3', lines)
+        self.assertIn('t_latency_seconds_bucket{channel="openai",le="+Inf"} 4', lines)
+        self.assertIn('t_latency_seconds_count{channel="openai"} 4', lines)
+
+    def test_counter_and_label_escaping(self):
+        registry = Registry()
+        counter = registry.counter("requests", "请求数", ("route",))
+        counter.inc(route='a"b')
+        counter.inc(2, route='a"b')
+        self.assertIn('requests_total{route="a\\"b"} 3', registry.render().splitlines())
+
+    def test_metric_without_samples_cannot_be_created(self):
+        class Incomplete(_Metric):
+            type = "gauge"
+
+        with self.assertRaises(TypeError):
+            Incomplete("x", "缺少 samples")
+
+    def test_route_mode(self):
+        self.assertEqual(route_mode("/api/translate/vibe/stream"), "vibe")
+        self.assertEqual(route_mode("/health"), "")
+
+
+if __name__ == "__main__":
+    unittest.main()
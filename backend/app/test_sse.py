@@ -0,0 +1,66 @@
+import asyncio
+import unittest
+from unittest import mock
+
+from app.cancellation import CancellationStats, track_upstream_call
+from app.sse import stream_until_disconnect
+
+
+class _FakeRequest:
+    def __init__(self):
+        self.disconnected = False
+
+    async def is_disconnected(self) -> bool:
+        return self.disconnected
+
+
+@mock.patch("app.sse.settings.sse_disconnect_poll_interval", 0.01)
+class TestStreamUntilDisconnect(unittest.TestCase):
+    def setUp(self):
+        self.stats = CancellationStats()
+        patch = mock.patch("app.sse.cancellation_stats", self.stats)
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def test_disconnect_cancels_upstream_work(self):
+        request = _FakeRequest()
+        cancelled = asyncio.Event()
+
+        async def events():
+            yield b"first"
+            with track_upstream_call():
+                try:
+                    await asyncio.sleep(10)
+                except asyncio.CancelledError:
+                    cancelled.set()
+                    raise
+            yield b"never"
+
+        async def run():
+            received = []
+            async for chunk in stream_until_disconnect(request, events(), endpoint="test"):
+                received.append(chunk)
+                request.disconnected = True
+            return received, cancelled.is_set()
+
+        received, was_cancelled = asyncio.run(run())
+        self.assertEqual(received, [b"first"])
+        self.assertTrue(was_cancelled)
+        self.assertEqual(self.stats.disconnects, 1)
+        self.assertEqual(self.stats.upstream_calls_cancelled, 1)
+
+    def test_completed_stream_is_forwarded(self):
+        async def events():
+            for chunk in (b"a", b"b", b"c"):
+                yield chunk
+
+        async def run():
+            return [c async for c in stream_until_disconnect(_FakeRequest(), events(), endpoint="test")]
+
+        self.assertEqual(asyncio.run(run()), [b"a", b"b", b"c"])
+        self.assertEqual(self.stats.snapshot()["streams"], 1)
+        self.assertEqual(self.stats.disconnects, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
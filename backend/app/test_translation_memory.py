@@ -0,0 +1,100 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from app.engines.base import TranslationResult
+from app.dependencies import EngineConfig
+from app.services.translation.base import BaseTranslationService
+from app.translation_memory import TranslationMemory, minhash, normalize, shingles
+
+SOURCE = "Click the Save button to store your changes before closing the editor."
+EDITED = "Click the Save button to store all your changes before closing the editor."
+
+
+class _Engine:
+    default_model = "m"
+
+    def __init__(self):
+        self.calls: list[dict | None] = []
+
+    async def translate(self, text, source_lang, target_lang, options=None):
+        self.calls.append(options)
+        return TranslationResult(text=f"译:{text}", source_lang=source_lang, target_lang=target_lang)
+
+
+class TestTranslationMemory(unittest.TestCase):
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix=".sqlite3")
+        os.close(fd)
+
+    def tearDown(self):
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(self.path + suffix):
+                os.remove(self.path + suffix)
+
+    def test_signature_is_stable_and_similar_texts_agree(self):
+        a, b = minhash(shingles(normalize(SOURCE))), minhash(shingles(normalize(EDITED)))
+        self.assertEqual(a, minhash(shingles(normalize(SOURCE))))
+        self.assertGreater(sum(x == y for x, y in zip(a, b)) / len(a), 0.5)
+        self.assertEqual(len(minhash(shingles("ok"))), len(a))
+
+    def test_exact_and_fuzzy_lookup(self):
+        tm = TranslationMemory(self.path, fuzzy_threshold=0.8)
+        tm.add_sync(SOURCE, "点击保存", source_lang="en", target_lang="zh", fingerprint="f1", engine="openai:m")
+
+        exact = tm.lookup_sync(f"  {SOURCE}\n", source_lang="en", target_lang="zh", fingerprint="f1")
+        self.assertEqual(exact.exact.target, "点击保存")
+
+        # 指纹不同：不算精确命中，但仍可作为参考译文
+        other = tm.lookup_sync(SOURCE, source_lang="en", target_lang="zh", fingerprint="f2")
+        self.assertIsNone(other.exact)
+        self.assertEqual([m.similarity for m in other.matches], [1.0])
+
+        fuzzy = tm.lookup_sync(EDITED, source_lang="en", target_lang="zh", fingerprint="f1")
+        self.assertIsNone(fuzzy.exact)
+        self.assertEqual(fuzzy.references(), [(SOURCE, "点击保存")])
+
+        self.assertEqual(tm.lookup_sync(EDITED, source_lang="en", target_lang="ja", fingerprint="f1").matches, [])
+        unrelated = tm.lookup_sync(
+            "Completely unrelated sentence here.", source_lang="en", target_lang="zh", fingerprint="f1"
+        )
+        self.assertEqual(unrelated.matches, [])
+
+    def test_persists_and_overwrites(self):
+        tm = TranslationMemory(self.path)
+        tm.add_sync(SOURCE, "旧译文", source_lang="en", target_lang="zh", fingerprint="f", engine="e")
+        tm.add_sync(SOURCE, "新译文", source_lang="en", target_lang="zh", fingerprint="f", engine="e")
+
+        reopened = TranslationMemory(self.path)
+        self.assertEqual(reopened.snapshot()["segments"], 1)
+        lookup = reopened.lookup_sync(SOURCE, source_lang="en", target_lang="zh", fingerprint="f")
+        self.assertEqual(lookup.exact.target, "新译文")
+
+    def test_service_skips_engine_on_exact_hit_and_injects_references(self):
+        tm = TranslationMemory(self.path)
+        service = BaseTranslationService()
+        config = EngineConfig(api_key="k", base_url="", channel="openai")
+        common = dict(source_lang="en", target_lang="zh")
+
+        async def run():
+            engine = _Engine()
+            with mock.patch("app.services.translation.base.translation_memory", tm), mock.patch(
+                "app.services.translation.base.translation_cache", None
+            ):
+                first = await service.translate_with_cache(engine, config, text=SOURCE, **common)
+                again = await service.translate_with_cache(engine, config, text=SOURCE, **common)
+                await service.translate_with_cache(engine, config, text=EDITED, **common)
+            return engine.calls, first, again
+
+        calls, first, again = asyncio.run(run())
+        self.assertEqual(again.text, first.text)
+        self.assertEqual(len(calls), 2)
+        self.assertIsNone(calls[0])
+        self.assertEqual(calls[1]["references"], [(SOURCE, first.text)])
+        self.assertEqual(tm.stats.exact_hits, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,350 @@
+"""翻译记忆（Translation Memory）。
+
+持久化保存已完成的 (原文, 译文, 语言对, 引擎, 提示词指纹) 片段，翻译前先查询：
+- 精确命中（原文相同、语言对相同、提示词指纹相同）：直接复用译文，不调用上游
+- 模糊命中（相似度 ≥ `translation_memory_fuzzy_threshold`）：作为参考译文注入 system prompt
+
+模糊匹配使用字符 n-gram 的 MinHash + LSH 分桶索引，桶键与片段一起存放在 SQLite 中
+（`tm_bands` 为 WITHOUT ROWID 聚簇表），查询只需按桶键做几次索引查找，候选数量与库大小
+基本无关；候选再用 `difflib.SequenceMatcher` 计算相似度确认。
+提示词指纹取最终 system prompt 稳定前缀的哈希，因此不同蓝图/自定义提示词的译文不会被当作精确命中。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+import zlib
+from dataclasses import asdict, dataclass, field
+from difflib import SequenceMatcher
+from typing import Any
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# LSH 参数：签名共 BANDS * ROWS 个分量，每 ROWS 个分量组成一个桶键；Jaccard 相似度约
+# (1/BANDS)^(1/ROWS) ≈ 0.46 以上的片段大概率至少落入同一个桶
+SHINGLE_SIZE = 3
+BANDS = 10
+ROWS = 3
+SIGNATURE_SIZE = BANDS * ROWS
+
+_MASK64 = (1 << 64) - 1
+# 固定常数：哈希必须跨进程稳定，已写入的桶键才能继续使用
+_MULTIPLIER = 0x9E3779B97F4A7C15
+_EMPTY = 1 << 32
+
+
+def normalize(text: str) -> str:
+    """相似度计算用的规范化：小写并折叠空白"""
+    return " ".join(text.lower().split())
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> set[int]:
+    """字符 n-gram（对 CJK 与拼音文字同样适用）的 crc32 集合"""
+    if len(text) <= size:
+        return {zlib.crc32(text.encode("utf-8"))}
+    return {zlib.crc32(text[i : i + size].encode("utf-8")) for i in range(len(text) - size + 1)}
+
+
+def minhash(values: set[int]) -> list[int]:
+    """单次置换 MinHash（one permutation hashing + 轮转填充）
+
+    每个 n-gram 只哈希一次：高位决定落入哪个分量，低位参与取最小值，
+    开销与 n-gram 数量成正比，而不是 n-gram 数 × 签名长度。
+    空分量取其后第一个非空分量的值（加上距离偏移），保持两段文本的分量可比。
+    """
+    bins = [_EMPTY] * SIGNATURE_SIZE
+    for value in values:
+        mixed = (value * _MULTIPLIER) & _MASK64
+        index = (mixed >> 32) % SIGNATURE_SIZE
+        low = mixed & 0xFFFFFFFF
+        if low < bins[index]:
+            bins[index] = low
+    if _EMPTY in bins:
+        filled = [i for i, v in enumerate(bins) if v != _EMPTY]
+        for i in range(SIGNATURE_SIZE):
+            if bins[i] == _EMPTY:
+                distance = next(((j - i) % SIGNATURE_SIZE for j in filled if j > i), None)
+                if distance is None:
+                    distance = filled[0] + SIGNATURE_SIZE - i
+                bins[i] = bins[(i + distance) % SIGNATURE_SIZE] + distance * _EMPTY
+    return bins
+
+
+def band_keys(signature: list[int], source_lang: str, target_lang: str) -> list[int]:
+    """把签名切成 BANDS 段，每段连同语言对哈希成一个 64 位有符号整数桶键"""
+    keys = []
+    for band in range(BANDS):
+        rows = signature[band * ROWS : (band + 1) * ROWS]
+        raw = f"{source_lang}>{target_lang}|{band}|{','.join(map(str, rows))}".encode("utf-8")
+        keys.append(int.from_bytes(hashlib.blake2b(raw, digest_size=8).digest(), "big", signed=True))
+    return keys
+
+
+def memory_fingerprint(system_prompt: str) -> str:
+    """提示词指纹：最终 system prompt 稳定前缀的哈希"""
+    return hashlib.sha256(system_prompt.encode("utf-8")).hexdigest()[:16]
+
+
+@dataclass
+class MemoryMatch:
+    source: str
+    target: str
+    similarity: float
+    engine: str = ""
+
+
+@dataclass
+class MemoryLookup:
+    exact: MemoryMatch | None = None
+    matches: list[MemoryMatch] = field(default_factory=list)
+
+    def references(self) -> list[tuple[str, str]]:
+        """注入提示词的参考译文（原文, 译文）"""
+        matches = [self.exact] if self.exact else self.matches
+        return [(m.source, m.target) for m in matches]
+
+
+@dataclass
+class MemoryStats:
+    exact_hits: int = 0
+    fuzzy_hits: int = 0
+    misses: int = 0
+    stored: int = 0
+    errors: int = 0
+
+
+class TranslationMemory:
+    """SQLite 持久化的翻译记忆（读写放到线程池执行，不阻塞事件循环）"""
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        fuzzy_threshold: float = 0.75,
+        max_matches: int = 3,
+        max_chars: int = 4000,
+    ):
+        self._path = path
+        self._fuzzy_threshold = fuzzy_threshold
+        self._max_matches = max_matches
+        self._max_chars = max_chars
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS tm_segments ("
+                "id INTEGER PRIMARY KEY, source_hash TEXT NOT NULL, "
+                "source_lang TEXT NOT NULL, target_lang TEXT NOT NULL, fingerprint TEXT NOT NULL, "
+                "source TEXT NOT NULL, target TEXT NOT NULL, engine TEXT NOT NULL, created_at REAL NOT NULL, "
+                "UNIQUE (source_hash, source_lang, target_lang, fingerprint))"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS tm_bands ("
+                "band INTEGER NOT NULL, segment_id INTEGER NOT NULL, "
+                "PRIMARY KEY (band, segment_id)) WITHOUT ROWID"
+            )
+            self._conn.commit()
+            self._segments = self._conn.execute("SELECT COUNT(*) FROM tm_segments").fetchone()[0]
+        self.stats = MemoryStats()
+
+    def accepts(self, text: str) -> bool:
+        return 0 < len(text.strip()) <= self._max_chars
+
+    async def lookup(
+        self, text: str, *, source_lang: str, target_lang: str, fingerprint: str, fuzzy: bool = True
+    ) -> MemoryLookup:
+        result = await asyncio.to_thread(
+            self.lookup_sync,
+            text,
+            source_lang=source_lang,
+            target_lang=target_lang,
+            fingerprint=fingerprint,
+            fuzzy=fuzzy,
+        )
+        if result.exact is not None:
+            self.stats.exact_hits += 1
+        elif result.matches:
+            self.stats.fuzzy_hits += 1
+        else:
+            self.stats.misses += 1
+        return result
+
+    async def add(
+        self,
+        text: str,
+        translation: str,
+        *,
+        source_lang: str,
+        target_lang: str,
+        fingerprint: str,
+        engine: str,
+    ) -> None:
+        """写入一条译文；写入失败只记录日志，不影响已经得到的翻译结果"""
+        try:
+            await asyncio.to_thread(
+                self.add_sync,
+                text,
+                translation,
+                source_lang=source_lang,
+                target_lang=target_lang,
+                fingerprint=fingerprint,
+                engine=engine,
+            )
+        except sqlite3.Error:
+            self.stats.errors += 1
+            logger.exception("写入翻译记忆失败")
+            return
+        self.stats.stored += 1
+
+    def lookup_sync(
+        self, text: str, *, source_lang: str, target_lang: str, fingerprint: str, fuzzy: bool = True
+    ) -> MemoryLookup:
+        """先按原文哈希精确查找，未命中且 fuzzy 为真时再做相似查找"""
+        source = text.strip()
+        if not self.accepts(source):
+            return MemoryLookup()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT target, engine FROM tm_segments "
+                "WHERE source_hash = ? AND source_lang = ? AND target_lang = ? AND fingerprint = ?",
+                (_source_hash(source), source_lang, target_lang, fingerprint),
+            ).fetchone()
+        if row is not None:
+            return MemoryLookup(exact=MemoryMatch(source=source, target=row[0], similarity=1.0, engine=row[1]))
+        if not fuzzy or self._max_matches <= 0:
+            return MemoryLookup()
+
+        query = normalize(source)
+        keys = band_keys(minhash(shingles(query)), source_lang, target_lang)
+        with self._lock:
+            candidate_ids = [
+                r[0]
+                for r in self._conn.execute(
+                    f"SELECT segment_id FROM tm_bands WHERE band IN ({','.join('?' * len(keys))}) "
+                    "GROUP BY segment_id ORDER BY COUNT(*) DESC LIMIT ?",
+                    (*keys, self._max_matches * 2),
+                )
+            ]
+            if not candidate_ids:
+                return MemoryLookup()
+            rows = self._conn.execute(
+                f"SELECT source, target, engine FROM tm_segments WHERE id IN ({','.join('?' * len(candidate_ids))})",
+                candidate_ids,
+            ).fetchall()
+
+        # 查询文本作为 seq2 只建一次索引；先用两级上界快速排除，再计算精确相似度
+        matcher = SequenceMatcher(None, autojunk=False)
+        matcher.set_seq2(query)
+        matches: list[MemoryMatch] = []
+        for candidate_source, candidate_target, engine in rows:
+            matcher.set_seq1(normalize(candidate_source))
+            if (
+                matcher.real_quick_ratio() < self._fuzzy_threshold
+                or matcher.quick_ratio() < self._fuzzy_threshold
+            ):
+                continue
+            score = matcher.ratio()
+            if score >= self._fuzzy_threshold:
+                matches.append(MemoryMatch(candidate_source, candidate_target, score, engine))
+        matches.sort(key=lambda m: m.similarity, reverse=True)
+        return MemoryLookup(matches=matches[: self._max_matches])
+
+    def add_sync(
+        self,
+        text: str,
+        translation: str,
+        *,
+        source_lang: str,
+        target_lang: str,
+        fingerprint: str,
+        engine: str,
+    ) -> None:
+        self.add_many_sync(
+            [(text, translation)],
+            source_lang=source_lang,
+            target_lang=target_lang,
+            fingerprint=fingerprint,
+            engine=engine,
+        )
+
+    def add_many_sync(
+        self,
+        pairs: list[tuple[str, str]],
+        *,
+        source_lang: str,
+        target_lang: str,
+        fingerprint: str,
+        engine: str,
+    ) -> int:
+        """批量写入（原文相同则覆盖译文），返回写入条数；用于导入已有语料"""
+        rows = []
+        for text, translation in pairs:
+            source, target = text.strip(), translation.strip()
+            if not self.accepts(source) or not target:
+                continue
+            keys = band_keys(minhash(shingles(normalize(source))), source_lang, target_lang)
+            rows.append((source, target, keys))
+
+        now = time.time()
+        with self._lock:
+            for source, target, keys in rows:
+                identity = (_source_hash(source), source_lang, target_lang, fingerprint)
+                row = self._conn.execute(
+                    "SELECT id FROM tm_segments "
+                    "WHERE source_hash = ? AND source_lang = ? AND target_lang = ? AND fingerprint = ?",
+                    identity,
+                ).fetchone()
+                if row is not None:
+                    self._conn.execute(
+                        "UPDATE tm_segments SET target = ?, engine = ?, created_at = ? WHERE id = ?",
+                        (target, engine, now, row[0]),
+                    )
+                    continue
+                segment_id = self._conn.execute(
+                    "INSERT INTO tm_segments (source_hash, source_lang, target_lang, fingerprint, "
+                    "source, target, engine, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (*identity, source, target, engine, now),
+                ).lastrowid
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO tm_bands (band, segment_id) VALUES (?, ?)",
+                    [(key, segment_id) for key in keys],
+                )
+                self._segments += 1
+            self._conn.commit()
+        return len(rows)
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "path": self._path,
+            "segments": self._segments,
+            **asdict(self.stats),
+        }
+
+
+def _source_hash(source: str) -> str:
+    return hashlib.sha256(source.encode("utf-8")).hexdigest()
+
+
+def create_translation_memory() -> TranslationMemory | None:
+    """根据配置创建翻译记忆；未启用时返回 None"""
+    if not settings.translation_memory_enabled:
+        return None
+    return TranslationMemory(
+        settings.translation_memory_path,
+        fuzzy_threshold=settings.translation_memory_fuzzy_threshold,
+        max_matches=settings.translation_memory_max_references,
+        max_chars=settings.translation_memory_max_chars,
+    )
+
+
+# 全局翻译记忆实例（可能为 None）
+translation_memory = create_translation_memory()
@@ -0,0 +1 @@
+"""压测工具：本地模拟 LLM 服务与基准测试脚本"""
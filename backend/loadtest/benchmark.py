@@ -0,0 +1,426 @@
+"""端到端基准测试：以可配置并发驱动各翻译模式，输出 JSON 结果。
+
+默认在子进程中启动本地模拟 LLM 服务（`loadtest.mock_provider`）与后端（uvicorn），
+所有引擎的 baseUrl 指向模拟服务，因此走的是真实的引擎、客户端池、准入与重试路径。
+
+每个场景报告：
+- 吞吐量（req/s）、延迟 p50/p95/p99
+- SSE 场景的首个事件延迟（time-to-first-event）
+- 后端进程的内存峰值（VmHWM）与每请求 CPU 时间（读取 /proc，仅 Linux 可用）
+
+用法（在 backend 目录下）：
+
+    uv run python -m loadtest.benchmark --concurrency 16 --requests 200 --output bench.json
+    uv run python -m loadtest.benchmark --scenarios easy,vibe_stream --latency-ms 300
+
+结果中带有当前 git commit，便于跨提交比较。
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable
+
+import httpx
+
+from app.engines.latency import percentile
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+_SAMPLE_TEXT = (
+    "The committee reviewed the proposal in detail and agreed that the new schedule "
+    "should take effect next quarter. Several members raised concerns about the budget, "
+    "but the chair noted that the savings from the revised process would offset the cost."
+)
+
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    path: str
+    stream: bool
+    vibe: bool
+    build_body: Callable[[int], dict[str, Any]]
+
+
+def _text(i: int) -> str:
+    # 每个请求的原文不同，避免命中翻译/分析缓存
+    return f"[{i}] {_SAMPLE_TEXT}"
+
+
+def _spec_blueprint(i: int) -> dict[str, Any]:
+    return {
+        "theory": {
+            "configs": [
+                {"id": "equivalence", "enabled": True},
+                {
+                    "id": "dts",
+                    "enabled": True,
+                    "referenceSource": f"[{i}] The meeting was adjourned.",
+                    "referenceTranslation": "会议休会。",
+                },
+            ]
+        },
+        "context": "政府公文",
+    }
+
+
+SCENARIOS: dict[str, Scenario] = {
+    s.name: s
+    for s in [
+        Scenario(
+            "easy",
+            "/api/translate/easy",
+            stream=False,
+            vibe=False,
+            build_body=lambda i: {"text": _text(i), "source_lang": "en", "target_lang": "zh"},
+        ),
+        Scenario(
+            "vibe",
+            "/api/translate/vibe",
+            stream=False,
+            vibe=True,
+            build_body=lambda i: {
+                "text": _text(i),
+                "source_lang": "en",
+                "target_lang": "zh",
+                "intent": "正式、简洁",
+                "engines": ["openai", "anthropic"],
+            },
+        ),
+        Scenario(
+            "vibe_stream",
+            "/api/translate/vibe/stream",
+            stream=True,
+            vibe=True,
+            build_body=lambda i: {
+                "text": _text(i),
+                "source_lang": "en",
+                "target_lang": "zh",
+                "intent": "正式、简洁",
+                "engines": ["openai", "anthropic"],
+            },
+        ),
+        Scenario(
+            "spec",
+            "/api/translate/spec",
+            stream=False,
+            vibe=False,
+            build_body=lambda i: {
+                "text": _text(i),
+                "source_lang": "en",
+                "target_lang": "zh",
+                "blueprint": _spec_blueprint(i),
+            },
+        ),
+        Scenario(
+            "spec_blueprint",
+            "/api/translate/spec/blueprint",
+            stream=False,
+            vibe=False,
+            build_body=lambda i: {
+                "text": _text(i),
+                "source_lang": "en",
+                "target_lang": "zh",
+                "blueprint": _spec_blueprint(i),
+            },
+        ),
+    ]
+}
+
+
+class ProcessProbe:
+    """读取进程 CPU 时间与内存峰值（/proc，仅 Linux）"""
+
+    def __init__(self, pid: int | None):
+        self.pid = pid
+        self._clock_ticks = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+    @property
+    def available(self) -> bool:
+        return self.pid is not None and Path(f"/proc/{self.pid}/stat").exists()
+
+    def cpu_seconds(self) -> float | None:
+        if not self.available:
+            return None
+        # 进程名可能含空格，从最后一个 ")" 之后开始切分；utime/stime 为第 14/15 个字段
+        fields = Path(f"/proc/{self.pid}/stat").read_text().rsplit(")", 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / self._clock_ticks
+
+    def memory_mb(self) -> dict[str, float] | None:
+        if not self.available:
+            return None
+        values: dict[str, float] = {}
+        for line in Path(f"/proc/{self.pid}/status").read_text().splitlines():
+            key, _, value = line.partition(":")
+            if key in ("VmHWM", "VmRSS"):
+                values[key] = int(value.split()[0]) / 1024
+        return {"rss_mb": values.get("VmRSS", 0.0), "hwm_mb": values.get("VmHWM", 0.0)}
+
+
+def _summary(samples: list[float]) -> dict[str, float] | None:
+    if not samples:
+        return None
+    ms = [s * 1000 for s in samples]
+    return {
+        "p50": percentile(ms, 50),
+        "p95": percentile(ms, 95),
+        "p99": percentile(ms, 99),
+        "mean": sum(ms) / len(ms),
+        "max": max(ms),
+    }
+
+
+def _engine_headers(scenario: Scenario, mock_url: str, cache: bool) -> dict[str, str]:
+    openai_config = {"apiKey": "mock", "channel": "openai", "baseUrl": f"{mock_url}/v1", "model": "mock-gpt"}
+    anthropic_config = {"apiKey": "mock", "channel": "anthropic", "baseUrl": mock_url, "model": "mock-claude"}
+    headers = {} if cache else {"Cache-Control": "no-store"}
+    if scenario.vibe:
+        headers["X-Engine-Configs"] = json.dumps([openai_config, anthropic_config])
+        headers["X-Judge-Engine-Config"] = json.dumps(openai_config)
+    else:
+        headers["X-Engine-Config"] = json.dumps(openai_config)
+    return headers
+
+
+async def _send(
+    client: httpx.AsyncClient, scenario: Scenario, body: dict[str, Any], headers: dict[str, str]
+) -> tuple[bool, float, float | None]:
+    """发送一个请求，返回（是否成功, 总耗时, 首个 SSE 事件耗时）"""
+    started = time.perf_counter()
+    if not scenario.stream:
+        response = await client.post(scenario.path, json=body, headers=headers)
+        return response.status_code == 200, time.perf_counter() - started, None
+
+    first_event: float | None = None
+    ok = True
+    async with client.stream("POST", scenario.path, json=body, headers=headers) as response:
+        if response.status_code != 200:
+            await response.aread()
+            return False, time.perf_counter() - started, None
+        async for line in response.aiter_lines():
+            if not line.startswith("event:"):
+                continue
+            if first_event is None:
+                first_event = time.perf_counter() - started
+            if line == "event: error":
+                ok = False
+    return ok, time.perf_counter() - started, first_event
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    scenario: Scenario,
+    *,
+    requests: int,
+    concurrency: int,
+    mock_url: str,
+    cache: bool,
+    probe: ProcessProbe,
+) -> dict[str, Any]:
+    headers = _engine_headers(scenario, mock_url, cache)
+    latencies: list[float] = []
+    first_events: list[float] = []
+    errors = 0
+    next_index = 0
+
+    async def worker() -> None:
+        nonlocal errors, next_index
+        while next_index < requests:
+            i = next_index
+            next_index += 1
+            try:
+                ok, elapsed, first_event = await _send(client, scenario, scenario.build_body(i), headers)
+            except httpx.HTTPError:
+                ok, elapsed, first_event = False, 0.0, None
+            if not ok:
+                errors += 1
+                continue
+            latencies.append(elapsed)
+            if first_event is not None:
+                first_events.append(first_event)
+
+    cpu_before = probe.cpu_seconds()
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+    duration = time.perf_counter() - started
+    cpu_after = probe.cpu_seconds()
+
+    cpu_per_request = None
+    if cpu_before is not None and cpu_after is not None and requests:
+        cpu_per_request = (cpu_after - cpu_before) / requests * 1000
+
+    return {
+        "path": scenario.path,
+        "requests": requests,
+        "concurrency": concurrency,
+        "errors": errors,
+        "error_rate": errors / requests if requests else 0.0,
+        "duration_s": duration,
+        "throughput_rps": len(latencies) / duration if duration else 0.0,
+        "latency_ms": _summary(latencies),
+        "first_event_ms": _summary(first_events) if scenario.stream else None,
+        "cpu_ms_per_request": cpu_per_request,
+        "memory": probe.memory_mb(),
+    }
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def _wait_ready(url: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while True:
+            try:
+                await client.get(url)
+                return
+            except httpx.TransportError:
+                if time.monotonic() > deadline:
+                    raise RuntimeError(f"服务未能在 {timeout:g}s 内就绪：{url}")
+                await asyncio.sleep(0.2)
+
+
+def _spawn(args: list[str]) -> subprocess.Popen:
+    return subprocess.Popen([sys.executable, *args], cwd=BACKEND_DIR)
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "HEAD"], cwd=BACKEND_DIR, text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(args: argparse.Namespace) -> dict[str, Any]:
+    processes: list[subprocess.Popen] = []
+    try:
+        mock_url = args.mock_url
+        if mock_url is None:
+            port = _free_port()
+            mock_url = f"http://127.0.0.1:{port}"
+            processes.append(
+                _spawn(
+                    [
+                        "-m", "loadtest.mock_provider",
+                        "--port", str(port),
+                        "--latency", args.latency,
+                        "--latency-ms", str(args.latency_ms),
+                        "--tokens-per-second", str(args.tokens_per_second),
+                        "--error-rate", str(args.error_rate),
+                        "--rate-limit-rate", str(args.rate_limit_rate),
+                        "--seed", str(args.seed),
+                    ]
+                )
+            )
+            await _wait_ready(f"{mock_url}/stats")
+
+        backend_url = args.backend_url
+        backend_pid = args.backend_pid
+        if backend_url is None:
+            port = _free_port()
+            backend_url = f"http://127.0.0.1:{port}"
+            backend = _spawn(
+                ["-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"]
+            )
+            processes.append(backend)
+            backend_pid = backend.pid
+            await _wait_ready(f"{backend_url}/health")
+
+        probe = ProcessProbe(backend_pid)
+        limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+        results: dict[str, Any] = {}
+        async with httpx.AsyncClient(base_url=backend_url, timeout=args.timeout, limits=limits) as client:
+            for name in args.scenarios:
+                scenario = SCENARIOS[name]
+                if args.warmup:
+                    await run_scenario(
+                        client, scenario, requests=args.warmup, concurrency=args.concurrency,
+                        mock_url=mock_url, cache=args.cache, probe=ProcessProbe(None),
+                    )
+                results[name] = await run_scenario(
+                    client, scenario, requests=args.requests, concurrency=args.concurrency,
+                    mock_url=mock_url, cache=args.cache, probe=probe,
+                )
+                print(f"{name}: {results[name]['throughput_rps']:.1f} req/s", file=sys.stderr)
+            backend_stats = (await client.get("/api/stats")).json()
+
+        return {
+            "meta": {
+                "commit": _git_commit(),
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "config": {
+                    key: value
+                    for key, value in vars(args).items()
+                    if key not in ("output", "backend_url", "mock_url", "backend_pid")
+                },
+            },
+            "scenarios": results,
+            "backend_stats": backend_stats,
+        }
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="翻译后端端到端基准测试")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="逗号分隔：" + ", ".join(SCENARIOS))
+    parser.add_argument("--requests", type=int, default=100, help="每个场景的请求数")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--warmup", type=int, default=5, help="每个场景正式计时前的预热请求数")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--cache", action="store_true", help="允许命中翻译/分析缓存（默认 no-store）")
+    parser.add_argument("--output", help="结果写入文件（默认输出到 stdout）")
+    parser.add_argument("--backend-url", help="压测已运行的后端（不再自动启动）")
+    parser.add_argument("--backend-pid", type=int, help="已运行后端的进程号（用于采集 CPU/内存）")
+    parser.add_argument("--mock-url", help="使用已运行的模拟服务（不再自动启动）")
+    parser.add_argument("--latency", choices=["fixed", "uniform", "lognormal"], default="lognormal")
+    parser.add_argument("--latency-ms", type=float, default=200.0)
+    parser.add_argument("--tokens-per-second", type=float, default=200.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    args.scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = [name for name in args.scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"未知场景：{', '.join(unknown)}")
+    return args
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    report = asyncio.run(run(args))
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
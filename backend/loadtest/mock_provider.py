@@ -0,0 +1,408 @@
+"""本地模拟 LLM 服务（压测用）。
+
+同时实现 OpenAI Chat Completions（`POST /v1/chat/completions`）与 Anthropic Messages
+（`POST /v1/messages`）的请求/响应格式，含流式（SSE），不调用任何付费接口：
+
+- 首 token 延迟按可配置分布采样（fixed / uniform / lognormal），之后按 token 速率逐段输出
+- 可按比例注入 500、429（带 Retry-After）与挂起（不响应，用于触发超时重试）
+- Vibe 裁判请求返回固定结构的评分 JSON（按提示词中的候选 engine_id 生成）
+- 译文为原文的回显，输出 token 数与原文相当
+
+用法（在 backend 目录下）：
+
+    uv run python -m loadtest.mock_provider --port 9100 --latency lognormal --latency-ms 800
+
+然后把 X-Engine-Config 的 baseUrl 指向它：
+
+    {"apiKey": "mock", "channel": "openai", "baseUrl": "http://127.0.0.1:9100/v1"}
+    {"apiKey": "mock", "channel": "anthropic", "baseUrl": "http://127.0.0.1:9100"}
+
+运行统计见 `GET /stats`。
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import re
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from typing import Any, AsyncIterator
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from app.engines.base import estimate_tokens
+from app.prompts.vibe import build_vibe_judge_system_prompt
+
+_JUDGE_SYSTEM_PROMPT = build_vibe_judge_system_prompt()
+_CANDIDATE_LINE = re.compile(r"^- (\S+?): ", re.MULTILINE)
+_TOKEN_CHUNK = re.compile(r"\s*\S{1,4}|\s+", re.UNICODE)
+
+
+@dataclass
+class MockConfig:
+    """模拟服务配置（所有比例均为 0~1）"""
+
+    latency: str = "lognormal"  # fixed | uniform | lognormal
+    latency_ms: float = 500.0  # 首 token 延迟的中位数（uniform 为均值）
+    latency_spread: float = 0.5  # lognormal 的 sigma；uniform 为 ±比例
+    tokens_per_second: float = 60.0  # 0 表示不限速
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    retry_after: float = 1.0
+    hang_rate: float = 0.0
+    max_output_tokens: int = 4096
+    seed: int | None = None
+
+    def sample_latency(self, rng: random.Random) -> float:
+        """采样首 token 延迟（秒）"""
+        base = self.latency_ms / 1000
+        if self.latency == "fixed" or base <= 0:
+            return max(0.0, base)
+        if self.latency == "uniform":
+            return max(0.0, rng.uniform(base * (1 - self.latency_spread), base * (1 + self.latency_spread)))
+        return rng.lognormvariate(math.log(base), self.latency_spread)
+
+
+@dataclass
+class MockStats:
+    requests: int = 0
+    streams: int = 0
+    in_flight: int = 0
+    completed: int = 0
+    cancelled: int = 0
+    errors_injected: int = 0
+    rate_limited: int = 0
+    hung: int = 0
+    output_tokens: int = 0
+    by_api: dict[str, int] = field(default_factory=dict)
+
+    def snapshot(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+@dataclass
+class _Reply:
+    """一次调用的模拟输出"""
+
+    text: str
+    input_tokens: int
+    ttft: float
+
+    @property
+    def chunks(self) -> list[str]:
+        return _TOKEN_CHUNK.findall(self.text) or [self.text]
+
+    @property
+    def output_tokens(self) -> int:
+        return len(self.chunks)
+
+
+def _judge_reply(prompt: str) -> str:
+    """Vibe 裁判的固定评分 JSON：为提示词中的每个候选打分"""
+    engine_ids = _CANDIDATE_LINE.findall(prompt.split("候选译文如下", 1)[-1])
+    scores = [
+        {
+            "engine_id": engine_id,
+            "accuracy": 8,
+            "fluency": 8 - i % 3,
+            "style_match": 7,
+            "terminology": 8,
+            "comment": f"模拟评语：{engine_id} 的译文准确、通顺。",
+        }
+        for i, engine_id in enumerate(dict.fromkeys(engine_ids))
+    ]
+    final = {
+        "translation": "模拟综合译文。",
+        "comment": "模拟评语：综合了各候选的优点。",
+        "rationale": "模拟说明：取各候选用词与句式之长。",
+        "overall": 8.5,
+    }
+    return json.dumps({"scores": scores, "final": final}, ensure_ascii=False)
+
+
+class MockProvider:
+    def __init__(self, config: MockConfig):
+        self.config = config
+        self.stats = MockStats()
+        self._rng = random.Random(config.seed)
+
+    def reply(self, system: str, user: str, max_tokens: int | None) -> _Reply:
+        if system.strip() == _JUDGE_SYSTEM_PROMPT:
+            text = _judge_reply(user)
+        else:
+            text = user
+        limit = min(max_tokens or self.config.max_output_tokens, self.config.max_output_tokens)
+        reply = _Reply(
+            text=text,
+            input_tokens=estimate_tokens(system) + estimate_tokens(user),
+            ttft=self.config.sample_latency(self._rng),
+        )
+        chunks = reply.chunks
+        if len(chunks) > limit:
+            reply.text = "".join(chunks[:limit])
+        return reply
+
+    def injected_error(self, api: str) -> JSONResponse | None:
+        """按比例注入错误；返回 None 表示正常处理"""
+        roll = self._rng.random()
+        if roll < self.config.rate_limit_rate:
+            self.stats.rate_limited += 1
+            return JSONResponse(
+                _error_body(api, "rate_limit_error", "模拟限流"),
+                status_code=429,
+                headers={"retry-after": f"{self.config.retry_after:g}"},
+            )
+        roll -= self.config.rate_limit_rate
+        if roll < self.config.error_rate:
+            self.stats.errors_injected += 1
+            return JSONResponse(_error_body(api, "api_error", "模拟上游错误"), status_code=500)
+        return None
+
+    def should_hang(self) -> bool:
+        if self._rng.random() < self.config.hang_rate:
+            self.stats.hung += 1
+            return True
+        return False
+
+    async def pace(self, reply: _Reply) -> AsyncIterator[str]:
+        """先等首 token 延迟，再按 token 速率逐段产出"""
+        await asyncio.sleep(reply.ttft)
+        interval = 1 / self.config.tokens_per_second if self.config.tokens_per_second > 0 else 0.0
+        started = time.monotonic()
+        for i, chunk in enumerate(reply.chunks):
+            if i and interval:
+                await asyncio.sleep(max(0.0, started + i * interval - time.monotonic()))
+            yield chunk
+
+    async def generation_time(self, reply: _Reply) -> None:
+        """非流式调用：等待完整生成所需时间"""
+        rate = self.config.tokens_per_second
+        await asyncio.sleep(reply.ttft + (reply.output_tokens / rate if rate > 0 else 0.0))
+
+
+def _error_body(api: str, kind: str, message: str) -> dict[str, Any]:
+    if api == "anthropic":
+        return {"type": "error", "error": {"type": kind, "message": message}}
+    return {"error": {"message": message, "type": kind, "code": None}}
+
+
+def _sse(data: Any, event: str | None = None) -> bytes:
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data, ensure_ascii=False)}\n\n".encode("utf-8")
+
+
+def _text_of(content: Any) -> str:
+    """消息内容可能是字符串或内容块列表"""
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return "".join(block.get("text", "") for block in content if isinstance(block, dict))
+    return ""
+
+
+def create_app(config: MockConfig) -> FastAPI:
+    provider = MockProvider(config)
+    stats = provider.stats
+    app = FastAPI(title="Mock LLM Provider")
+
+    async def tracked(stream: AsyncIterator[bytes], output_tokens: int) -> AsyncIterator[bytes]:
+        stats.in_flight += 1
+        try:
+            async for chunk in stream:
+                yield chunk
+            stats.completed += 1
+            stats.output_tokens += output_tokens
+        except asyncio.CancelledError:
+            stats.cancelled += 1
+            raise
+        finally:
+            stats.in_flight -= 1
+
+    async def prologue(api: str) -> JSONResponse | None:
+        stats.requests += 1
+        stats.by_api[api] = stats.by_api.get(api, 0) + 1
+        error = provider.injected_error(api)
+        if error is None and provider.should_hang():
+            await asyncio.Event().wait()  # 直到客户端超时断开
+        return error
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        if error := await prologue("openai"):
+            return error
+
+        messages = body.get("messages", [])
+        system = "".join(_text_of(m.get("content")) for m in messages if m.get("role") == "system")
+        user = "".join(_text_of(m.get("content")) for m in messages if m.get("role") == "user")
+        reply = provider.reply(system, user, body.get("max_tokens") or body.get("max_completion_tokens"))
+        model = body.get("model", "mock")
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+        usage = {
+            "prompt_tokens": reply.input_tokens,
+            "completion_tokens": reply.output_tokens,
+            "total_tokens": reply.input_tokens + reply.output_tokens,
+        }
+
+        if not body.get("stream"):
+            stats.in_flight += 1
+            try:
+                await provider.generation_time(reply)
+            finally:
+                stats.in_flight -= 1
+            stats.completed += 1
+            stats.output_tokens += reply.output_tokens
+            return {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": reply.text},
+                        "finish_reason": "stop",
+                    }
+                ],
+                "usage": usage,
+            }
+
+        include_usage = bool((body.get("stream_options") or {}).get("include_usage"))
+
+        def chunk(delta: dict, finish_reason: str | None = None) -> dict:
+            return {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+            }
+
+        async def events() -> AsyncIterator[bytes]:
+            yield _sse(chunk({"role": "assistant", "content": ""}))
+            async for text in provider.pace(reply):
+                yield _sse(chunk({"content": text}))
+            yield _sse(chunk({}, "stop"))
+            if include_usage:
+                yield _sse({**chunk({}), "choices": [], "usage": usage})
+            yield b"data: [DONE]\n\n"
+
+        stats.streams += 1
+        return StreamingResponse(
+            tracked(events(), reply.output_tokens), media_type="text/event-stream"
+        )
+
+    @app.post("/v1/messages")
+    async def messages(request: Request):
+        body = await request.json()
+        if error := await prologue("anthropic"):
+            return error
+
+        system = _text_of(body.get("system", ""))
+        user = "".join(_text_of(m.get("content")) for m in body.get("messages", []) if m.get("role") == "user")
+        reply = provider.reply(system, user, body.get("max_tokens"))
+        message = {
+            "id": f"msg_{uuid.uuid4().hex[:24]}",
+            "type": "message",
+            "role": "assistant",
+            "model": body.get("model", "mock"),
+            "content": [],
+            "stop_reason": None,
+            "stop_sequence": None,
+            "usage": {"input_tokens": reply.input_tokens, "output_tokens": 0},
+        }
+
+        if not body.get("stream"):
+            stats.in_flight += 1
+            try:
+                await provider.generation_time(reply)
+            finally:
+                stats.in_flight -= 1
+            stats.completed += 1
+            stats.output_tokens += reply.output_tokens
+            return {
+                **message,
+                "content": [{"type": "text", "text": reply.text}],
+                "stop_reason": "end_turn",
+                "usage": {"input_tokens": reply.input_tokens, "output_tokens": reply.output_tokens},
+            }
+
+        async def events() -> AsyncIterator[bytes]:
+            yield _sse({"type": "message_start", "message": message}, "message_start")
+            yield _sse(
+                {"type": "content_block_start", "index": 0, "content_block": {"type": "text", "text": ""}},
+                "content_block_start",
+            )
+            async for text in provider.pace(reply):
+                yield _sse(
+                    {"type": "content_block_delta", "index": 0, "delta": {"type": "text_delta", "text": text}},
+                    "content_block_delta",
+                )
+            yield _sse({"type": "content_block_stop", "index": 0}, "content_block_stop")
+            yield _sse(
+                {
+                    "type": "message_delta",
+                    "delta": {"stop_reason": "end_turn", "stop_sequence": None},
+                    "usage": {"output_tokens": reply.output_tokens},
+                },
+                "message_delta",
+            )
+            yield _sse({"type": "message_stop"}, "message_stop")
+
+        stats.streams += 1
+        return StreamingResponse(
+            tracked(events(), reply.output_tokens), media_type="text/event-stream"
+        )
+
+    @app.get("/stats")
+    async def get_stats():
+        return {"config": asdict(config), **stats.snapshot()}
+
+    return app
+
+
+def parse_args(argv: list[str] | None = None) -> tuple[argparse.Namespace, MockConfig]:
+    defaults = MockConfig()
+    parser = argparse.ArgumentParser(description="本地模拟 LLM 服务（OpenAI / Anthropic 格式）")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency", choices=["fixed", "uniform", "lognormal"], default=defaults.latency)
+    parser.add_argument("--latency-ms", type=float, default=defaults.latency_ms, help="首 token 延迟中位数（毫秒）")
+    parser.add_argument("--latency-spread", type=float, default=defaults.latency_spread)
+    parser.add_argument("--tokens-per-second", type=float, default=defaults.tokens_per_second)
+    parser.add_argument("--error-rate", type=float, default=defaults.error_rate, help="注入 500 的比例")
+    parser.add_argument("--rate-limit-rate", type=float, default=defaults.rate_limit_rate, help="注入 429 的比例")
+    parser.add_argument("--retry-after", type=float, default=defaults.retry_after)
+    parser.add_argument("--hang-rate", type=float, default=defaults.hang_rate, help="不响应的比例")
+    parser.add_argument("--max-output-tokens", type=int, default=defaults.max_output_tokens)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+    config = MockConfig(
+        latency=args.latency,
+        latency_ms=args.latency_ms,
+        latency_spread=args.latency_spread,
+        tokens_per_second=args.tokens_per_second,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        retry_after=args.retry_after,
+        hang_rate=args.hang_rate,
+        max_output_tokens=args.max_output_tokens,
+        seed=args.seed,
+    )
+    return args, config
+
+
+def main(argv: list[str] | None = None) -> None:
+    args, config = parse_args(argv)
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -68,7 +68,15 @@ export interface SpecBlueprintRequest {
   blueprint: TranslationBlueprint;
 }
 
+export interface TheoryAnalysisError {
+  theory_id: TheoryId;
+  code: string;
+  message: string;
+  details?: unknown;
+}
+
 export interface SpecBlueprintResponse {
   blueprint: TranslationBlueprint;
+  errors?: TheoryAnalysisError[];
 }
 
@@ -1,5 +1,12 @@
-import { apiClient, type EngineConfig } from "./client";
-import type { SpecBlueprintRequest, SpecBlueprintResponse, TranslationBlueprint } from "./specBlueprint";
+import { apiClient, API_BASE_URL, type EngineConfig } from "./client";
+import type { TokenUsageInfo } from "./translation";
+import type {
+  SpecBlueprintRequest,
+  SpecBlueprintResponse,
+  TheoryAnalysisError,
+  TheoryId,
+  TranslationBlueprint,
+} from "./specBlueprint";
 
 export interface SpecTranslateRequest {
   text: string;
@@ -22,6 +29,7 @@ export interface SpecTranslateResponse {
   blueprint_applied: TranslationBlueprint;
   decisions?: TranslationDecision[];
   extracted_terms?: Record<string, string>[];
+  usage?: TokenUsageInfo | null;
 }
 
 export async function specTranslate(
@@ -38,3 +46,80 @@ export async function specGenerateBlueprint(
   return apiClient.post("/api/translate/spec/blueprint", request, { engineConfig });
 }
 
+
+export async function specGenerateBlueprintStream(
+  request: SpecBlueprintRequest,
+  engineConfig: EngineConfig,
+  handlers: {
+    onDelta?: (theoryId: TheoryId, delta: string) => void;
+    onAnalysis?: (theoryId: TheoryId, field: string, content: string) => void;
+    onTheoryError?: (error: TheoryAnalysisError) => void;
+    onFinal?: (final: SpecBlueprintResponse) => void;
+  } = {}
+): Promise<SpecBlueprintResponse> {
+  const res = await fetch(`${API_BASE_URL}/api/translate/spec/blueprint/stream`, {
+    method: "POST",
+    headers: {
+      "Content-Type": "application/json",
+      "X-Engine-Config": JSON.stringify(engineConfig),
+    },
+    body: JSON.stringify(request),
+  });
+
+  if (!res.ok) {
+    const err = await res.json().catch(() => ({}));
+    const message =
+      (err?.error?.message as string | undefined) ||
+      (err?.detail as string | undefined) ||
+      `HTTP error! status: ${res.status}`;
+    throw new Error(message);
+  }
+
+  const reader = res.body?.getReader();
+  if (!reader) {
+    throw new Error("浏览器不支持流式读取");
+  }
+
+  const decoder = new TextDecoder("utf-8");
+  let buffer = "";
+  let finalResponse: SpecBlueprintResponse | null = null;
+
+  while (true) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+
+    const parts = buffer.split("\n\n");
+    buffer = parts.pop() || "";
+
+    for (const part of parts) {
+      const lines = part.split("\n");
+      let event = "";
+      let data = "";
+      for (const line of lines) {
+        if (line.startsWith("event:")) event = line.slice(6).trim();
+        if (line.startsWith("data:")) data = line.slice(5).trim();
+      }
+      if (!event || !data) continue;
+
+      const parsed = JSON.parse(data);
+      if (event === "delta") {
+        handlers.onDelta?.(parsed.theory_id, parsed.delta);
+      } else if (event === "analysis") {
+        handlers.onAnalysis?.(parsed.theory_id, parsed.field, parsed.content);
+      } else if (event === "theory_error") {
+        handlers.onTheoryError?.(parsed as TheoryAnalysisError);
+      } else if (event === "final") {
+        finalResponse = parsed as SpecBlueprintResponse;
+        handlers.onFinal?.(finalResponse);
+      } else if (event === "error") {
+        throw new Error((parsed?.message as string | undefined) || "蓝图生成失败");
+      }
+    }
+  }
+
+  if (!finalResponse) {
+    throw new Error("未收到最终蓝图");
+  }
+  return finalResponse;
+}
@@ -7,6 +7,14 @@ export interface EasyTranslateRequest {
   target_lang: string;
   prompt?: string;
   engine?: string;
+  glossary?: string;
+}
+
+export interface TokenUsageInfo {
+  input_tokens: number;
+  output_tokens: number;
+  cache_read_tokens: number;
+  cache_write_tokens: number;
 }
 
 export interface EasyTranslateResponse {
@@ -14,6 +22,7 @@ export interface EasyTranslateResponse {
   source_lang: string;
   target_lang: string;
   engine: string;
+  usage?: TokenUsageInfo | null;
 }
 
 export interface VibeTranslateRequest {
@@ -22,6 +31,8 @@ export interface VibeTranslateRequest {
   target_lang: string;
   intent: string;
   engines: string[];
+  quorum?: number;
+  candidate_deadline?: number;
 }
 
 export interface TranslationScore {
@@ -39,6 +50,7 @@ export interface ScoredEngineResult {
   translated_text: string;
   success: boolean;
   error?: string;
+  timed_out?: boolean;
   score?: TranslationScore;
 }
 